@@ -221,11 +221,29 @@ DB_PATH = os.path.join(
     "../kommineni_automotive.duckdb"
 )
 
-@st.cache_resource
-def get_connection():
-    return duckdb.connect(DB_PATH, read_only=True)
+# ingestion/blue_green.py builds each new version into its own file
+# and swaps this pointer to it once the build is done
+DB_POINTER = os.path.join(
+    os.path.dirname(__file__),
+    "../kommineni_automotive.current"
+)
+
+def published_db_path():
+    if not os.path.exists(DB_POINTER):
+        return DB_PATH
+    with open(DB_POINTER) as pointer:
+        relative_path = pointer.read().strip()
+    return os.path.join(os.path.dirname(DB_POINTER), relative_path)
+
+# One connection per published version. Every rerun checks the
+# pointer, so a swap is picked up on the next click, while a session
+# already mid-run keeps the connection it started with.
+@st.cache_resource(max_entries=2)
+def get_connection(db_path):
+    return duckdb.connect(db_path, read_only=True)
 
-conn = get_connection()
+db_path = published_db_path()
+conn = get_connection(db_path)
 
 def query(sql):
     return conn.execute(sql).df()
@@ -268,7 +286,7 @@ CHARCOAL = "#1A1A1A"
 # ============================================================
 
 @st.cache_data
-def load_salespeople():
+def load_salespeople(db_path):
     return conn.execute("""
         SELECT employee_id, full_name, location_id
         FROM main_silver.stg_employees
@@ -306,7 +324,7 @@ USERS = {
                "employee_id": None, "city": "Seattle"},
 }
 
-sp_df = load_salespeople()
+sp_df = load_salespeople(db_path)
 for _, row in sp_df.iterrows():
     USERS[row["employee_id"]] = {
         "password": row["employee_id"],
@@ -385,8 +403,78 @@ def build_where(f, a="s"):
         parts.append(f"{a}.financing_approved = FALSE")
     if f.get("salesperson_id"):
         parts.append(f"{a}.employee_id = '{f['salesperson_id']}'")
+    if f.get("make"):
+        parts.append(f"{a}.make = '{f['make']}'")
+    return "WHERE " + " AND ".join(parts)
+
+def cube_where(f, a="c"):
+    """
+    The filters as a WHERE on main_gold.sales_cube, or None when the
+    cube has no grouping set for them (a salesperson, or a make at
+    one location) and the sales rows have to be read instead.
+    """
+    if f.get("salesperson_id") or (f.get("make") and f.get("location_id")):
+        return None
+    parts = [
+        f"{a}.sale_date >= '{f['start_date']}'",
+        f"{a}.sale_date <= '{f['end_date']}'"
+    ]
+    if f.get("make"):
+        parts.append(f"{a}.by_make AND {a}.make = '{f['make']}'")
+    else:
+        parts.append(f"NOT {a}.by_make")
+    if f.get("location_id"):
+        parts.append(f"{a}.by_location AND {a}.location_id = '{f['location_id']}'")
+    else:
+        parts.append(f"NOT {a}.by_location")
+    if f.get("sales_type") in ["Financed", "Cash"]:
+        financed = "TRUE" if f["sales_type"] == "Financed" else "FALSE"
+        parts.append(f"{a}.by_financing AND {a}.financing_approved = {financed}")
+    else:
+        parts.append(f"NOT {a}.by_financing")
     return "WHERE " + " AND ".join(parts)
 
+def sales_totals(f):
+    """
+    Revenue, deal count and financed deal count for the filters, from
+    the cube when it can.
+    """
+    cube = cube_where(f)
+    if cube:
+        totals = query(f"""
+            SELECT COALESCE(SUM(c.revenue), 0) as revenue,
+                   COALESCE(SUM(c.deals), 0) as units,
+                   COALESCE(SUM(c.financed_deals), 0) as financed
+            FROM main_gold.sales_cube c {cube}
+        """)
+    else:
+        totals = query(f"""
+            SELECT COALESCE(SUM(s.sale_price), 0) as revenue,
+                   COUNT(*) as units,
+                   COUNT_IF(s.financing_approved) as financed
+            FROM main_gold.fct_sales s {build_where(f)}
+        """)
+    return (
+        totals["revenue"].values[0],
+        int(totals["units"].values[0]),
+        int(totals["financed"].values[0])
+    )
+
+def daily_revenue(f):
+    """Revenue per day for the filters, from the cube when it can."""
+    cube = cube_where(f)
+    if cube:
+        return query(f"""
+            SELECT c.sale_date as dt, SUM(c.revenue) as revenue
+            FROM main_gold.sales_cube c {cube}
+            GROUP BY dt ORDER BY dt
+        """)
+    return query(f"""
+        SELECT s.sale_date_only as dt, SUM(s.sale_price) as revenue
+        FROM main_gold.fct_sales s {build_where(f)}
+        GROUP BY dt ORDER BY dt
+    """)
+
 # ============================================================
 # LOGIN
 # ============================================================
@@ -666,39 +754,22 @@ def show_executive(f):
     </div>
     """, unsafe_allow_html=True)
 
-    where = build_where(f)
-
-    rev = query(f"""
-        SELECT COALESCE(SUM(s.sale_price), 0) as v
-        FROM main_silver.stg_sales_transactions s {where}
-    """)["v"].values[0]
-
-    units = int(query(f"""
-        SELECT COUNT(*) as v
-        FROM main_silver.stg_sales_transactions s {where}
-    """)["v"].values[0])
+    rev, units, financed = sales_totals(f)
 
     avg_deal = (rev / units) if units > 0 else 0
 
-    financed = int(query(f"""
-        SELECT COUNT(*) as v
-        FROM main_silver.stg_sales_transactions s
-        WHERE s.sale_date_only >= '{f['start_date']}'
-        AND s.sale_date_only <= '{f['end_date']}'
-        {"AND s.location_id = '" + f['location_id'] + "'" if f.get('location_id') else ""}
-        AND s.financing_approved = TRUE
-    """)["v"].values[0])
-
     fin_rate = (financed / units * 100) if units > 0 else 0
 
-    on_track = int(query("""
+    on_track = int(query(f"""
         SELECT COUNT(*) as v FROM main_gold.revenue_vs_target
-        WHERE status = 'On Track'
+        WHERE target_month = DATE_TRUNC('month', DATE '{f['end_date']}')
+        AND status = 'On Track'
     """)["v"].values[0])
 
-    target_total = query("""
+    target_total = query(f"""
         SELECT COALESCE(SUM(monthly_target), 0) as v
         FROM main_gold.revenue_vs_target
+        WHERE target_month = DATE_TRUNC('month', DATE '{f['end_date']}')
     """)["v"].values[0]
 
     pct = (rev / target_total * 100) if target_total > 0 else 0
@@ -743,10 +814,11 @@ def show_executive(f):
                    COALESCE(SUM(s.sale_price), 0) as revenue,
                    l.monthly_target
             FROM main_silver.stg_locations l
-            LEFT JOIN main_silver.stg_sales_transactions s
+            LEFT JOIN main_gold.fct_sales s
                 ON l.location_id = s.location_id
                 AND s.sale_date_only >= '{f['start_date']}'
                 AND s.sale_date_only <= '{f['end_date']}'
+                {"AND s.make = '" + f['make'] + "'" if f.get('make') else ""}
                 {"AND l.location_id = '" + f['location_id'] + "'" if f.get('location_id') else ""}
             GROUP BY l.city, l.monthly_target
             ORDER BY revenue DESC
@@ -780,9 +852,10 @@ def show_executive(f):
 
     with col2:
         section_title("Target Achievement")
-        tgt = query("""
+        tgt = query(f"""
             SELECT city, pct_of_target, status
             FROM main_gold.revenue_vs_target
+            WHERE target_month = DATE_TRUNC('month', DATE '{f['end_date']}')
             ORDER BY pct_of_target DESC
         """)
         for _, row in tgt.iterrows():
@@ -814,11 +887,7 @@ def show_executive(f):
 
     # Trend
     section_title("Daily Revenue Trend")
-    trend = query(f"""
-        SELECT s.sale_date_only as dt, SUM(s.sale_price) as revenue
-        FROM main_silver.stg_sales_transactions s {where}
-        GROUP BY dt ORDER BY dt
-    """)
+    trend = daily_revenue(f)
     fig2 = go.Figure()
     fig2.add_scatter(
         x=trend["dt"],
@@ -846,7 +915,9 @@ def show_executive(f):
         if f.get("location_id"):
             sp_parts.append(f"s.location_id = '{f['location_id']}'")
         if f.get("salesperson_id"):
-            sp_parts.append(f"e.employee_id = '{f['salesperson_id']}'")
+            sp_parts.append(f"s.employee_id = '{f['salesperson_id']}'")
+        if f.get("make"):
+            sp_parts.append(f"s.make = '{f['make']}'")
         sp_where = "WHERE " + " AND ".join(sp_parts)
 
         board = query(f"""
@@ -854,20 +925,15 @@ def show_executive(f):
                 ROW_NUMBER() OVER (
                     ORDER BY SUM(s.sale_price) DESC
                 ) as Rank,
-                e.full_name as Name,
-                l.city as Branch,
+                s.salesperson_name as Name,
+                s.city as Branch,
                 COUNT(s.transaction_id) as Deals,
                 ROUND(SUM(s.sale_price), 0) as Revenue,
-                ROUND(SUM(s.sale_price) * e.commission_rate, 0) as Commission
-            FROM main_silver.stg_employees e
-            LEFT JOIN main_silver.stg_sales_transactions s
-                ON e.employee_id = s.employee_id
-            LEFT JOIN main_silver.stg_locations l
-                ON e.location_id = l.location_id
-            {sp_where} AND e.is_salesperson = TRUE
-            GROUP BY e.employee_id, e.full_name,
-                     l.city, e.commission_rate
-            HAVING COUNT(s.transaction_id) > 0
+                ROUND(SUM(s.sale_price) * s.commission_rate, 0) as Commission
+            FROM main_gold.fct_sales s
+            {sp_where}
+            GROUP BY s.employee_id, s.salesperson_name,
+                     s.city, s.commission_rate
             ORDER BY Revenue DESC
             LIMIT 10
         """)
@@ -875,11 +941,12 @@ def show_executive(f):
 
     with col2:
         section_title("Branch Status")
-        status_df = query("""
+        status_df = query(f"""
             SELECT city as Branch,
                    revenue_to_date as Revenue,
                    status as Status
             FROM main_gold.revenue_vs_target
+            WHERE target_month = DATE_TRUNC('month', DATE '{f['end_date']}')
             ORDER BY revenue_to_date DESC
         """)
         st.dataframe(
@@ -917,22 +984,13 @@ def show_branch_manager(user, f):
     </div>
     """, unsafe_allow_html=True)
 
-    where = build_where(f)
-
-    rev = query(f"""
-        SELECT COALESCE(SUM(s.sale_price), 0) as v
-        FROM main_silver.stg_sales_transactions s {where}
-    """)["v"].values[0]
-
-    units = int(query(f"""
-        SELECT COUNT(*) as v
-        FROM main_silver.stg_sales_transactions s {where}
-    """)["v"].values[0])
+    rev, units, _ = sales_totals(f)
 
     tgt_row = query(f"""
         SELECT monthly_target, pct_of_target, status
         FROM main_gold.revenue_vs_target
         WHERE location_id = '{location_id}'
+        AND target_month = DATE_TRUNC('month', DATE '{f['end_date']}')
     """)
 
     c1, c2, c3, c4 = st.columns(4)
@@ -968,11 +1026,7 @@ def show_branch_manager(user, f):
 
     with col1:
         section_title("Daily Revenue")
-        trend = query(f"""
-            SELECT s.sale_date_only as dt, SUM(s.sale_price) as revenue
-            FROM main_silver.stg_sales_transactions s {where}
-            GROUP BY dt ORDER BY dt
-        """)
+        trend = daily_revenue(f)
         fig = go.Figure()
         fig.add_bar(
             x=trend["dt"],
@@ -987,23 +1041,37 @@ def show_branch_manager(user, f):
         sp_parts = [
             f"s.sale_date_only >= '{f['start_date']}'",
             f"s.sale_date_only <= '{f['end_date']}'",
-            f"e.location_id = '{location_id}'"
+            f"s.location_id = '{location_id}'"
+        ]
+        if f.get("make"):
+            sp_parts.append(f"s.make = '{f['make']}'")
+        sp_where = "WHERE " + " AND ".join(sp_parts)
+
+        # Every salesperson of the branch, with or without sales
+        team_parts = [
+            f"e.location_id = '{location_id}'",
+            "e.is_salesperson = TRUE"
         ]
         if f.get("salesperson_id"):
-            sp_parts.append(
+            team_parts.append(
                 f"e.employee_id = '{f['salesperson_id']}'"
             )
-        sp_where = "WHERE " + " AND ".join(sp_parts)
+        team_where = "WHERE " + " AND ".join(team_parts)
 
         team = query(f"""
             SELECT e.full_name as Name,
-                   COUNT(s.transaction_id) as Deals,
-                   ROUND(COALESCE(SUM(s.sale_price), 0), 0) as Revenue
+                   COALESCE(s.deals, 0) as Deals,
+                   ROUND(COALESCE(s.revenue, 0), 0) as Revenue
             FROM main_silver.stg_employees e
-            LEFT JOIN main_silver.stg_sales_transactions s
-                ON e.employee_id = s.employee_id
-            {sp_where} AND e.is_salesperson = TRUE
-            GROUP BY e.employee_id, e.full_name
+            LEFT JOIN (
+                SELECT s.employee_id,
+                       COUNT(s.transaction_id) as deals,
+                       SUM(s.sale_price) as revenue
+                FROM main_gold.fct_sales s
+                {sp_where}
+                GROUP BY s.employee_id
+            ) s ON e.employee_id = s.employee_id
+            {team_where}
             ORDER BY Revenue DESC
         """)
         st.dataframe(team, use_container_width=True, hide_index=True)
@@ -1077,10 +1145,11 @@ def show_salesperson(user, f):
                COALESCE(SUM(sale_price), 0) as revenue,
                COALESCE(AVG(sale_price), 0) as avg_deal,
                COALESCE(MAX(sale_price), 0) as best_deal
-        FROM main_silver.stg_sales_transactions
+        FROM main_gold.fct_sales
         WHERE employee_id = '{employee_id}'
         AND sale_date_only >= '{f['start_date']}'
         AND sale_date_only <= '{f['end_date']}'
+        {"AND make = '" + f['make'] + "'" if f.get('make') else ""}
     """)
 
     emp = query(f"""
@@ -1121,20 +1190,24 @@ def show_salesperson(user, f):
     col1, col2 = st.columns([2, 3])
     with col1:
         section_title("Company Ranking")
+        # Every salesperson is ranked, with or without sales
         rank = query(f"""
             SELECT
                 RANK() OVER (
-                    ORDER BY SUM(s.sale_price) DESC
+                    ORDER BY COALESCE(s.revenue, 0) DESC
                 ) as Rank,
-                e2.full_name as Name,
-                ROUND(COALESCE(SUM(s.sale_price), 0), 0) as Revenue
-            FROM main_silver.stg_employees e2
-            LEFT JOIN main_silver.stg_sales_transactions s
-                ON e2.employee_id = s.employee_id
-                AND s.sale_date_only >= '{f['start_date']}'
+                e.full_name as Name,
+                ROUND(COALESCE(s.revenue, 0), 0) as Revenue
+            FROM main_silver.stg_employees e
+            LEFT JOIN (
+                SELECT s.employee_id, SUM(s.sale_price) as revenue
+                FROM main_gold.fct_sales s
+                WHERE s.sale_date_only >= '{f['start_date']}'
                 AND s.sale_date_only <= '{f['end_date']}'
-            WHERE e2.is_salesperson = TRUE
-            GROUP BY e2.employee_id, e2.full_name
+                {"AND s.make = '" + f['make'] + "'" if f.get('make') else ""}
+                GROUP BY s.employee_id
+            ) s ON e.employee_id = s.employee_id
+            WHERE e.is_salesperson = TRUE
             ORDER BY Revenue DESC
             LIMIT 10
         """)
@@ -1147,10 +1220,11 @@ def show_salesperson(user, f):
                    sale_date_only as Date,
                    ROUND(sale_price, 0) as Amount,
                    financing_approved as Financed
-            FROM main_silver.stg_sales_transactions
+            FROM main_gold.fct_sales
             WHERE employee_id = '{employee_id}'
             AND sale_date_only >= '{f['start_date']}'
             AND sale_date_only <= '{f['end_date']}'
+            {"AND make = '" + f['make'] + "'" if f.get('make') else ""}
             ORDER BY Date DESC
         """)
         if len(my_sales) > 0:
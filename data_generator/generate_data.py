@@ -4,21 +4,165 @@ Generates synthetic dealership data for local dev/testing.
 Run this once to populate data/raw/ with CSVs.
 """
 
+import argparse
+import glob
+import json
+import math
 import random
 import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
 from faker import Faker
+import duckdb
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Bronze table definitions live with the ingestion scripts, next door
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ingestion")
+)
+from bronze_schemas import declared_columns
+from ingest_bronze import create_bookkeeping_tables, working_db_path
+from ingest_frame import ingest_frame
 
 fake = Faker()
 random.seed(None)  # different data each run
 
+# ============================================================
+# SECTION 0: SCALE PROFILES
+# How big the synthetic dealership is. "small" is the original
+# 5-branch setup. Bigger profiles add branches, a few mega-stores
+# and realistic weekend and seasonal swings in sales volume.
+# ============================================================
+
+SCALE_PROFILES = {
+    "small": {
+        "locations": 5,
+        "salespeople": 4,
+        "technicians": 3,
+        "vehicles": 20,
+        "mega_stores": 0,
+        "mega_store_scale": 1,
+        "days_back": 30,
+        "sales_per_salesperson": (0.15, 0.4),
+        "jobs_per_technician": (1 / 3, 0.8),
+        "weekend_peak": False,
+        "seasonal": False
+    },
+    "regional": {
+        "locations": 40,
+        "salespeople": 6,
+        "technicians": 4,
+        "vehicles": 80,
+        "mega_stores": 4,
+        "mega_store_scale": 3,
+        "days_back": 365,
+        "sales_per_salesperson": (0.15, 0.4),
+        "jobs_per_technician": (1 / 3, 0.8),
+        "weekend_peak": True,
+        "seasonal": True
+    },
+    "national": {
+        "locations": 400,
+        "salespeople": 8,
+        "technicians": 5,
+        "vehicles": 150,
+        "mega_stores": 25,
+        "mega_store_scale": 4,
+        "days_back": 1095,
+        "sales_per_salesperson": (0.15, 0.4),
+        "jobs_per_technician": (1 / 3, 0.8),
+        "weekend_peak": True,
+        "seasonal": True
+    }
+}
+
+# Saturday is the big day on the lot, Monday first
+WEEKDAY_WEIGHTS = [0.85, 0.85, 0.9, 0.95, 1.1, 1.6, 0.75]
+
+# Slow winter, tax refund spring, year-end push, January first
+MONTH_WEIGHTS = [0.8, 0.85, 1.15, 1.0, 1.05, 1.0,
+                 1.0, 1.05, 0.95, 0.95, 1.0, 1.2]
+
+
+def plan_stores(profile):
+    """
+    Decide each branch's size. Most branches get the profile's base
+    headcount and inventory, a few mega-stores get a multiple of it.
+    """
+    mega_stores = set()
+    if profile["mega_stores"]:
+        mega_stores = set(random.sample(
+            range(profile["locations"]), profile["mega_stores"]
+        ))
+
+    stores = []
+    for store_num in range(profile["locations"]):
+        scale = profile["mega_store_scale"] if store_num in mega_stores else 1
+        stores.append({
+            "location_id": f"LOC{str(store_num + 1).zfill(3)}",
+            "scale": scale,
+            "salespeople": profile["salespeople"] * scale,
+            "technicians": profile["technicians"] * scale,
+            "vehicles": profile["vehicles"] * scale
+        })
+    return stores
+
+
+def profile_volumes(profile, employees_df):
+    """
+    Turn the profile's per-person daily rates into the keyword
+    arguments the sales and service job generators take.
+    The small profile works out to the original 3-8 sales and
+    5-12 service jobs a day.
+    """
+    roles = employees_df["role"].value_counts()
+    salespeople = roles.get("salesperson", 0)
+    technicians = roles.get("service_technician", 0)
+    low_sales, high_sales = profile["sales_per_salesperson"]
+    low_jobs, high_jobs = profile["jobs_per_technician"]
+
+    sales_volume = {
+        "sales_per_day": (
+            round(low_sales * salespeople), round(high_sales * salespeople)
+        ),
+        "weekend_peak": profile["weekend_peak"],
+        "seasonal": profile["seasonal"]
+    }
+    # The service bay does not get the Saturday rush
+    jobs_volume = {
+        "jobs_per_day": (
+            round(low_jobs * technicians), round(high_jobs * technicians)
+        ),
+        "weekend_peak": False,
+        "seasonal": profile["seasonal"]
+    }
+    return sales_volume, jobs_volume
+
+
+def day_weight(day, weekend_peak=False, seasonal=False):
+    """How busy a given day is compared to an average day."""
+    weight = 1.0
+    if weekend_peak:
+        weight *= WEEKDAY_WEIGHTS[day.weekday()]
+    if seasonal:
+        weight *= MONTH_WEIGHTS[day.month - 1]
+    return weight
+
+
 # ============================================================
 # SECTION 1: LOCATIONS
-# Kommineni Automotive has 5 branches across the US
+# Kommineni Automotive has 5 branches across the US,
+# bigger scale profiles add more
 # ============================================================
 
-def generate_locations():
+def generate_locations(stores=None, as_of=None):
     locations = [
         {
             "location_id": "LOC001",
@@ -61,6 +205,35 @@ def generate_locations():
             "opened_date": "2019-11-05"
         }
     ]
+
+    stores = stores if stores is not None else plan_stores(
+        SCALE_PROFILES["small"]
+    )
+
+    # Branches past the original five get made-up details
+    opened_from, opened_to = "-15y", "-1y"
+    if as_of is not None:
+        opened_from = as_of - timedelta(days=15 * 365)
+        opened_to = as_of - timedelta(days=365)
+
+    for store in stores[len(locations):]:
+        locations.append({
+            "location_id": store["location_id"],
+            "city": fake.city(),
+            "state": fake.state_abbr(),
+            "manager_name": fake.name(),
+            "monthly_target": random.randint(60, 95) * 10000,
+            "opened_date": fake.date_between(
+                start_date=opened_from,
+                end_date=opened_to
+            ).strftime("%Y-%m-%d")
+        })
+
+    # Mega-stores carry a target to match their bigger team
+    locations = locations[:len(stores)]
+    for location, store in zip(locations, stores):
+        location["monthly_target"] *= store["scale"]
+
     return pd.DataFrame(locations)
 
 
@@ -69,39 +242,50 @@ def generate_locations():
 # Each location has salespeople and service technicians
 # ============================================================
 
-def generate_employees():
+def generate_employees(as_of=None, stores=None):
     employees = []
     employee_id = 1
 
+    stores = stores if stores is not None else plan_stores(
+        SCALE_PROFILES["small"]
+    )
+
+    # Hire dates are relative to today unless we pin an as-of date
+    hired_from, hired_to = "-5y", "-6m"
+    if as_of is not None:
+        hired_from = as_of - timedelta(days=5 * 365)
+        hired_to = as_of - timedelta(days=182)
+
     # Each location gets 4 salespeople and 3 service technicians
-    for loc_num in range(1, 6):
-        location_id = f"LOC00{loc_num}"
+    # in the small profile, mega-stores get a multiple of that
+    for store in stores:
+        location_id = store["location_id"]
 
-        # Generate 4 salespeople per location
-        for _ in range(4):
+        # Generate the salespeople for this location
+        for _ in range(store["salespeople"]):
             employees.append({
                 "employee_id": f"EMP{str(employee_id).zfill(3)}",
                 "full_name": fake.name(),
                 "role": "salesperson",
                 "location_id": location_id,
                 "hire_date": fake.date_between(
-                    start_date="-5y",
-                    end_date="-6m"
+                    start_date=hired_from,
+                    end_date=hired_to
                 ).strftime("%Y-%m-%d"),
                 "commission_rate": round(random.uniform(0.02, 0.05), 3)
             })
             employee_id += 1
 
-        # Generate 3 service technicians per location
-        for _ in range(3):
+        # Generate the service technicians for this location
+        for _ in range(store["technicians"]):
             employees.append({
                 "employee_id": f"EMP{str(employee_id).zfill(3)}",
                 "full_name": fake.name(),
                 "role": "service_technician",
                 "location_id": location_id,
                 "hire_date": fake.date_between(
-                    start_date="-5y",
-                    end_date="-6m"
+                    start_date=hired_from,
+                    end_date=hired_to
                 ).strftime("%Y-%m-%d"),
                 "commission_rate": 0.0
             })
@@ -115,47 +299,325 @@ def generate_employees():
 # Each location has inventory of cars to sell
 # ============================================================
 
-def generate_vehicles():
-    vehicles = []
-
-    makes_models = [
-        ("Toyota", "Camry", 28000),
-        ("Toyota", "RAV4", 35000),
-        ("Ford", "F-150", 45000),
-        ("Ford", "Explorer", 38000),
-        ("Honda", "Civic", 25000),
-        ("Honda", "CR-V", 33000),
-        ("BMW", "3 Series", 55000),
-        ("BMW", "X5", 72000),
-        ("Chevrolet", "Silverado", 42000),
-        ("Chevrolet", "Equinox", 30000)
+# (make, model, base list price)
+MAKES_MODELS = [
+    ("Toyota", "Camry", 28000),
+    ("Toyota", "RAV4", 35000),
+    ("Ford", "F-150", 45000),
+    ("Ford", "Explorer", 38000),
+    ("Honda", "Civic", 25000),
+    ("Honda", "CR-V", 33000),
+    ("BMW", "3 Series", 55000),
+    ("BMW", "X5", 72000),
+    ("Chevrolet", "Silverado", 42000),
+    ("Chevrolet", "Equinox", 30000)
+]
+
+MODEL_YEARS = [2022, 2023, 2024, 2025]
+
+VEHICLE_COLUMNS = [
+    "vehicle_id", "make", "model", "year", "list_price", "status",
+    "location_id"
+]
+
+# Make and model of each MAKES_MODELS entry as category codes, so a
+# car can be kept as its MAKES_MODELS index instead of two strings
+MAKE_CODES, MAKES = pd.factorize(np.array([car[0] for car in MAKES_MODELS]))
+MODEL_CODES, MODELS = pd.factorize(np.array([car[1] for car in MAKES_MODELS]))
+BASE_PRICES = np.array([car[2] for car in MAKES_MODELS])
+
+
+def new_vehicle(vehicle_number, location_index, day):
+    """
+    One new car for the row engine, as lot columns (see
+    open_inventory), arriving on day. Some arrivals are put on
+    hold by a customer right away.
+    """
+    model_index = random.randrange(len(MAKES_MODELS))
+    # Add some price variation around the base price
+    price = BASE_PRICES[model_index] + random.randint(-2000, 5000)
+
+    return {
+        "vehicle_number": vehicle_number,
+        "model_index": model_index,
+        "year": random.choice(MODEL_YEARS),
+        "list_price": price,
+        "location_index": location_index,
+        "available_from": day + (
+            HOLD_DAYS if random.random() < RESERVED_SHARE else 0
+        )
+    }
+
+
+def new_vehicles(rng, first_number, location_index, day):
+    """
+    Batch version of new_vehicle: one new car per entry of
+    location_index, numbered from first_number.
+    """
+    count = len(location_index)
+    model_index = rng.integers(0, len(MAKES_MODELS), size=count)
+    held = rng.random(count) < RESERVED_SHARE
+    return {
+        "vehicle_number": np.arange(first_number, first_number + count),
+        "model_index": model_index,
+        "year": np.array(MODEL_YEARS)[
+            rng.integers(0, len(MODEL_YEARS), size=count)
+        ],
+        "list_price": BASE_PRICES[model_index] + rng.integers(
+            -2000, 5001, size=count
+        ),
+        "location_index": location_index,
+        "available_from": day + np.where(held, HOLD_DAYS, 0)
+    }
+
+
+def generate_vehicles(stores=None, rng=None):
+    stores = stores if stores is not None else plan_stores(
+        SCALE_PROFILES["small"]
+    )
+    # Drawn from random so a seeded run still gives the same cars
+    rng = rng if rng is not None else np.random.default_rng(
+        random.getrandbits(64)
+    )
+
+    # Each location gets 20 vehicles in inventory in the small profile
+    locations = np.array([store["location_id"] for store in stores])
+    location_index = np.repeat(
+        np.arange(len(stores)), [store["vehicles"] for store in stores]
+    )
+    # Day 0 stands for "when the history starts", some cars are
+    # already on hold then
+    vehicles = new_vehicles(rng, 1, location_index, 0)
+    return vehicle_rows(vehicles, hold_statuses(vehicles, 0), locations)
+
+
+# ------------------------------------------------------------
+# Inventory lifecycle
+# A car sells once. When it does, it leaves the lot and a fresh
+# arrival takes its parking spot, so every branch keeps the same
+# lot size and the vehicles table ends up with one "sold" row per
+# sale plus whatever is still on the lot.
+#
+# Each location owns a contiguous run of slots in a few flat
+# arrays, so picking a car and restocking its spot is O(1) and
+# never scans the vehicle table. The arrays hold numbers only (the
+# vehicle number, its MAKES_MODELS index, its location's index);
+# vehicle_rows turns them into ids and names once rows go out.
+#
+# A customer puts a share of the new arrivals on hold. A held car
+# stays on the lot but cannot be sold until its hold runs out:
+# available_from in the lot arrays is the first day (a date
+# ordinal) it can go, and a sale that lands on a held car looks
+# for another one. "reserved" in the vehicles table means the car
+# was still on hold when the lot was written.
+# ------------------------------------------------------------
+
+RESERVED_SHARE = 0.25
+HOLD_DAYS = 7
+
+# How often a sale looks for a car it may take, before the
+# customer walks away. Only matters for lots that are mostly held.
+PICK_ROUNDS = 10
+
+def open_inventory(vehicles_df, next_vehicle_id=None, opened_on=None):
+    """
+    Park every vehicle in vehicles_df on its location's lot.
+    Arrivals are numbered from next_vehicle_id, which defaults to
+    the first id after the opening stock.
+
+    Holds come from an available_from column when vehicles_df has
+    one (the emitter's saved lot). Otherwise reserved cars are held
+    for HOLD_DAYS from opened_on, the first day sales are made
+    (a date ordinal, today by default).
+    """
+    if opened_on is None:
+        opened_on = datetime.now().toordinal()
+    location_ids = vehicles_df["location_id"].to_numpy(dtype=str)
+    lot = vehicles_df.iloc[np.argsort(location_ids, kind="stable")]
+    locations, first_slot, slot_count = np.unique(
+        location_ids, return_index=True, return_counts=True
+    )
+
+    if next_vehicle_id is None:
+        next_vehicle_id = len(vehicles_df) + 1
+
+    catalog = pd.Index([f"{make}|{model}" for make, model, _ in MAKES_MODELS])
+    return {
+        "locations": locations,
+        "first_slot": first_slot,
+        "slot_count": slot_count,
+        "slots": {
+            "vehicle_number": lot["vehicle_id"].astype(str).str[3:]
+                .astype(np.int64).to_numpy(copy=True),
+            "model_index": catalog.get_indexer(
+                lot["make"].astype(str) + "|" + lot["model"].astype(str)
+            ),
+            "year": lot["year"].to_numpy(dtype=np.int64, copy=True),
+            "list_price": lot["list_price"].to_numpy(dtype=np.int64, copy=True),
+            "location_index": np.repeat(np.arange(len(locations)), slot_count),
+            "available_from": (
+                lot["available_from"].to_numpy(dtype=np.int64, copy=True)
+                if "available_from" in lot.columns
+                else np.where(
+                    lot["status"].to_numpy(dtype=str) == "reserved",
+                    opened_on + HOLD_DAYS, opened_on
+                )
+            )
+        },
+        "next_vehicle_id": next_vehicle_id,
+        "sold": []
+    }
+
+
+def find_lots(inventory, location_ids):
+    """
+    Where each location's slots start and how many it has.
+    Locations with no cars at all come back with has_lot False.
+    """
+    location_ids = np.asarray(location_ids, dtype=str)
+    locations = inventory["locations"]
+
+    if len(locations) == 0:
+        empty = np.zeros(len(location_ids), dtype=np.int64)
+        return empty, empty, np.zeros(len(location_ids), dtype=bool)
+
+    position = np.searchsorted(locations, location_ids)
+    position = np.clip(position, 0, len(locations) - 1)
+    has_lot = locations[position] == location_ids
+    return (
+        inventory["first_slot"][position],
+        inventory["slot_count"][position],
+        has_lot
+    )
+
+
+def free_slots(inventory, first_slot, slot_count, day):
+    """The slots of one lot whose car can be sold on day."""
+    held_until = inventory["slots"]["available_from"][
+        first_slot:first_slot + slot_count
     ]
+    return first_slot + np.flatnonzero(held_until <= day)
 
-    vehicle_id = 1
-
-    for loc_num in range(1, 6):
-        location_id = f"LOC00{loc_num}"
-
-        # Each location gets 20 vehicles in inventory
-        for _ in range(20):
-            make, model, base_price = random.choice(makes_models)
-            # Add some price variation around the base price
-            price = base_price + random.randint(-2000, 5000)
-
-            vehicles.append({
-                "vehicle_id": f"VEH{str(vehicle_id).zfill(4)}",
-                "make": make,
-                "model": model,
-                "year": random.choice([2022, 2023, 2024, 2025]),
-                "list_price": price,
-                "status": random.choice(
-                    ["available", "available", "available", "reserved"]
-                ),
-                "location_id": location_id
-            })
-            vehicle_id += 1
 
-    return pd.DataFrame(vehicles)
+def sell_from_slot(inventory, slot, day):
+    """Sell the car in one slot on day and park a new arrival in its place."""
+    slots = inventory["slots"]
+    sold = {column: values[slot] for column, values in slots.items()}
+
+    arrival = new_vehicle(
+        inventory["next_vehicle_id"], sold["location_index"], day
+    )
+    inventory["next_vehicle_id"] += 1
+    for column, values in slots.items():
+        values[slot] = arrival[column]
+
+    return sold
+
+
+def sell_from_lots(inventory, first_slot, slot_count, days, rng):
+    """
+    Batch version of sell_from_slot. Sale i takes a random car off
+    the lot starting at first_slot[i] with slot_count[i] slots, on
+    day days[i] (date ordinals, in order).
+
+    One day at a time, every sale still looking draws a slot. A
+    draw on a held car, or on a car another sale of the same round
+    drew first, is made again in the next round. The others sell,
+    and the arrivals that take their spots can sell the same day
+    unless they come in on hold. A sale that has not found a car
+    after PICK_ROUNDS rounds is dropped.
+
+    Returns the sold cars as a dict of lot column arrays, and which
+    of the sales went through as a boolean array.
+    """
+    lot = inventory["slots"]
+    num_sales = len(days)
+    sold = {
+        column: np.empty(num_sales, dtype=values.dtype)
+        for column, values in lot.items()
+    }
+    kept = np.zeros(num_sales, dtype=bool)
+
+    sale_days, day_starts = np.unique(days, return_index=True)
+    day_ends = np.append(day_starts[1:], num_sales)
+    for day, start, end in zip(sale_days, day_starts, day_ends):
+        looking = np.arange(start, end)
+        for _ in range(PICK_ROUNDS):
+            if len(looking) == 0:
+                break
+            slots = first_slot[looking] + (
+                rng.random(len(looking)) * slot_count[looking]
+            ).astype(np.int64)
+
+            # Free cars only, and the first sale to draw a car gets it
+            free = np.flatnonzero(lot["available_from"][slots] <= day)
+            _, first_draw = np.unique(slots[free], return_index=True)
+            won = free[np.sort(first_draw)]
+            won_slots = slots[won]
+
+            for column, values in lot.items():
+                sold[column][looking[won]] = values[won_slots]
+            kept[looking[won]] = True
+
+            # Every sale brings in one new car
+            arrivals = new_vehicles(
+                rng, inventory["next_vehicle_id"],
+                lot["location_index"][won_slots], day
+            )
+            inventory["next_vehicle_id"] += len(won_slots)
+            for column, values in lot.items():
+                values[won_slots] = arrivals[column]
+
+            looking = np.delete(looking, won)
+
+    return {column: values[kept] for column, values in sold.items()}, kept
+
+
+def hold_statuses(columns, day):
+    """reserved for the cars still on hold on day, available for the rest."""
+    return np.where(
+        columns["available_from"] > day, "reserved", "available"
+    )
+
+
+def vehicle_rows(columns, status, locations):
+    """
+    Turn lot columns into vehicles table rows with the given status.
+    locations are the location ids location_index points into.
+    """
+    return pd.DataFrame({
+        "vehicle_id": format_ids("VEH", columns["vehicle_number"], 4),
+        "make": pd.Categorical.from_codes(
+            MAKE_CODES[columns["model_index"]], MAKES
+        ),
+        "model": pd.Categorical.from_codes(
+            MODEL_CODES[columns["model_index"]], MODELS
+        ),
+        "year": columns["year"],
+        "list_price": columns["list_price"],
+        "status": status,
+        "location_id": pd.Categorical.from_codes(
+            columns["location_index"], locations
+        )
+    })
+
+
+def take_sold_vehicles(inventory):
+    """Hand over the cars sold since the last call."""
+    sold = inventory["sold"]
+    inventory["sold"] = []
+    if not sold:
+        return pd.DataFrame(columns=VEHICLE_COLUMNS)
+    return pd.concat(sold, ignore_index=True)
+
+
+def close_inventory(inventory, day):
+    """
+    The cars still on the lot at the end of the run, reserved if
+    they are still on hold on day (the last day of the history).
+    """
+    lot = inventory["slots"]
+    return vehicle_rows(lot, hold_statuses(lot, day), inventory["locations"])
 
 
 # ============================================================
@@ -163,8 +625,11 @@ def generate_vehicles():
 # These are the actual car sales happening daily
 # ============================================================
 
-def generate_sales(employees_df, vehicles_df, days_back=30):
+def generate_sales(employees_df, vehicles_df, days_back=30,
+                   sales_per_day=(3, 8), weekend_peak=False, seasonal=False,
+                   inventory=None, now=None):
     sales = []
+    sold_vehicles = []
     transaction_id = 1
 
     # Get only salespeople (not technicians)
@@ -172,38 +637,49 @@ def generate_sales(employees_df, vehicles_df, days_back=30):
         employees_df["role"] == "salesperson"
     ].copy()
 
-    # Get available vehicles
-    available_vehicles = vehicles_df[
-        vehicles_df["status"] == "available"
-    ].copy()
+    # Every car in vehicles_df starts on its lot, unless the caller
+    # is already tracking what is left from an earlier run
+    inventory = inventory if inventory is not None else open_inventory(
+        vehicles_df, opened_on=day_number(days_back, now)
+    )
 
     # Generate sales for each of the past 30 days
-    for day in range(days_back, 0, -1):
-        sale_date = datetime.now() - timedelta(days=day)
+    for sale_date in day_range(days_back, now=now):
+        day = sale_date.toordinal()
 
-        # Each day generates 3 to 8 sales across all locations
-        num_sales = random.randint(3, 8)
+        # Each day generates 3 to 8 sales across all locations,
+        # scaled up or down for busy weekends and months
+        num_sales = round(
+            random.randint(*sales_per_day)
+            * day_weight(sale_date, weekend_peak, seasonal)
+        )
 
         for _ in range(num_sales):
             # Pick a random salesperson
             salesperson = salespeople.sample(1).iloc[0]
 
-            # Pick a random available vehicle from same location
-            location_vehicles = available_vehicles[
-                available_vehicles["location_id"] == salesperson["location_id"]
-            ]
+            # Find the lot at the salesperson's location
+            first_slot, slot_count, has_lot = find_lots(
+                inventory, [salesperson["location_id"]]
+            )
 
-            if len(location_vehicles) == 0:
+            if not has_lot[0]:
                 continue
 
-            vehicle = location_vehicles.sample(1).iloc[0]
+            # Sell a random car off that lot, one that is not on
+            # hold, and a new one takes its spot
+            free = free_slots(inventory, first_slot[0], slot_count[0], day)
+            if len(free) == 0:
+                continue
+            vehicle = sell_from_slot(inventory, random.choice(free), day)
+            sold_vehicles.append(vehicle)
 
             # Sale price is usually slightly below list price (negotiation)
             sale_price = vehicle["list_price"] * random.uniform(0.92, 1.02)
 
             sales.append({
                 "transaction_id": f"TXN{str(transaction_id).zfill(5)}",
-                "vehicle_id": vehicle["vehicle_id"],
+                "vehicle_id": f"VEH{str(vehicle['vehicle_number']).zfill(4)}",
                 "employee_id": salesperson["employee_id"],
                 "location_id": salesperson["location_id"],
                 "sale_price": round(sale_price, 2),
@@ -212,6 +688,11 @@ def generate_sales(employees_df, vehicles_df, days_back=30):
             })
             transaction_id += 1
 
+    if sold_vehicles:
+        inventory["sold"].append(vehicle_rows(
+            pd.DataFrame(sold_vehicles), "sold", inventory["locations"]
+        ))
+
     return pd.DataFrame(sales)
 
 
@@ -220,7 +701,21 @@ def generate_sales(employees_df, vehicles_df, days_back=30):
 # Cars coming in for oil changes, repairs etc
 # ============================================================
 
-def generate_service_jobs(employees_df, vehicles_df, days_back=30):
+# (job type, estimated hours, labor rate per hour)
+JOB_TYPES = [
+    ("oil_change", 1.0, 89),
+    ("tire_rotation", 0.5, 49),
+    ("brake_replacement", 3.0, 350),
+    ("engine_repair", 8.0, 950),
+    ("transmission_service", 5.0, 650),
+    ("ac_repair", 4.0, 480),
+    ("battery_replacement", 1.0, 220)
+]
+
+
+def generate_service_jobs(employees_df, vehicles_df, days_back=30,
+                          jobs_per_day=(5, 12), weekend_peak=False,
+                          seasonal=False, now=None):
     jobs = []
     job_id = 1
 
@@ -229,26 +724,18 @@ def generate_service_jobs(employees_df, vehicles_df, days_back=30):
         employees_df["role"] == "service_technician"
     ].copy()
 
-    job_types = [
-        ("oil_change", 1.0, 89),
-        ("tire_rotation", 0.5, 49),
-        ("brake_replacement", 3.0, 350),
-        ("engine_repair", 8.0, 950),
-        ("transmission_service", 5.0, 650),
-        ("ac_repair", 4.0, 480),
-        ("battery_replacement", 1.0, 220)
-    ]
-
-    for day in range(days_back, 0, -1):
-        job_date = datetime.now() - timedelta(days=day)
+    for job_date in day_range(days_back, now=now):
 
         # Each day generates 5 to 12 service jobs
-        num_jobs = random.randint(5, 12)
+        num_jobs = round(
+            random.randint(*jobs_per_day)
+            * day_weight(job_date, weekend_peak, seasonal)
+        )
 
         for _ in range(num_jobs):
             technician = technicians.sample(1).iloc[0]
             vehicle = vehicles_df.sample(1).iloc[0]
-            job_type, est_hours, labor_rate = random.choice(job_types)
+            job_type, est_hours, labor_rate = random.choice(JOB_TYPES)
 
             # Sometimes jobs take longer than estimated (realistic!)
             actual_hours = est_hours * random.uniform(0.8, 1.4)
@@ -269,50 +756,1204 @@ def generate_service_jobs(employees_df, vehicles_df, days_back=30):
     return pd.DataFrame(jobs)
 
 
+# ============================================================
+# SECTION 6: BATCH ENGINE
+# Same tables as sections 4 and 5, but every random draw for the
+# whole day range happens at once as a NumPy array. No Python loop
+# per row, so millions of rows take seconds instead of minutes.
+# ============================================================
+
+def day_timestamps(days_back, num_days=None, now=None):
+    """
+    Format the timestamp for each day once, oldest day first.
+    Rows then pick their timestamp by index instead of calling
+    strftime once per row.
+
+    num_days limits the range to the oldest num_days days,
+    which is how the streaming mode asks for one chunk at a time.
+    now pins the reference time so seeded runs are repeatable.
+    """
+    return [
+        day.strftime("%Y-%m-%d %H:%M:%S")
+        for day in day_range(days_back, num_days, now)
+    ]
+
+
+def day_range(days_back, num_days=None, now=None):
+    """The datetime of each day in the range, oldest day first."""
+    num_days = days_back if num_days is None else num_days
+    now = now if now is not None else datetime.now()
+    return [
+        now - timedelta(days=day)
+        for day in range(days_back, days_back - num_days, -1)
+    ]
+
+
+def day_number(days_back, now=None):
+    """
+    The date ordinal of the day days_back days before now, the
+    unit lot holds are counted in (see open_inventory).
+    """
+    now = now if now is not None else datetime.now()
+    return (now - timedelta(days=days_back)).toordinal()
+
+
+def day_weights(days_back, num_days=None, now=None,
+                weekend_peak=False, seasonal=False):
+    """day_weight for every day in the range, as an array."""
+    return np.array([
+        day_weight(day, weekend_peak, seasonal)
+        for day in day_range(days_back, num_days, now)
+    ])
+
+
+def lookup(values, index):
+    """
+    Take values[index] as a pandas Categorical.
+    Ids, cities and dates repeat millions of times in a big batch,
+    so each row stores a small integer code instead of a string.
+    A small batch from a large table (the emitter picking a few
+    vehicles) only turns the values it picked into categories; a
+    big one codes the whole table once and gathers, no sort.
+    """
+    values = np.asarray(values)
+    if len(index) >= len(values):
+        codes, uniques = pd.factorize(values)
+        return pd.Categorical.from_codes(codes[index], uniques)
+
+    picked, picked_codes = np.unique(index, return_inverse=True)
+    codes, uniques = pd.factorize(values[picked])
+    return pd.Categorical.from_codes(codes[picked_codes], uniques)
+
+
+def format_ids(prefix, numbers, width):
+    """
+    Format numbers as ids like TXN00001, zero-padded to width digits
+    (a longer number keeps all of its digits, like str.zfill).
+    Every id is written as one row of a byte matrix, a few array
+    operations per digit instead of a Python string per id, and the
+    bytes become an Arrow string array as they are.
+    Returns an Arrow-backed pandas array.
+    """
+    numbers = np.asarray(numbers, dtype=np.int64)
+    prefix = np.frombuffer(prefix.encode(), dtype=np.uint8)
+
+    # How many digits each id gets
+    digits = np.maximum(width, np.searchsorted(
+        10 ** np.arange(1, 19, dtype=np.int64), numbers, side="right"
+    ) + 1)
+    longest = int(digits.max()) if len(numbers) else width
+
+    # Write every id at the longest length, ones digit last
+    ids = np.empty((len(numbers), len(prefix) + longest), dtype=np.uint8)
+    ids[:, :len(prefix)] = prefix
+    remaining = numbers.copy()
+    for place in range(longest):
+        ids[:, -1 - place] = remaining % 10 + 48
+        remaining //= 10
+
+    # Then drop the extra leading zeros of the shorter ones
+    if (digits < longest).any():
+        keep = np.arange(ids.shape[1]) - len(prefix) >= (
+            longest - digits
+        )[:, None]
+        keep[:, :len(prefix)] = True
+        data = ids[keep]
+    else:
+        data = ids.reshape(-1)
+
+    offsets = np.zeros(len(numbers) + 1, dtype=np.int64)
+    np.cumsum(len(prefix) + digits, out=offsets[1:])
+    return pd.arrays.ArrowExtensionArray(pa.LargeStringArray.from_buffers(
+        len(numbers), pa.py_buffer(offsets), pa.py_buffer(data)
+    ))
+
+
+def make_ids(prefix, start, count, width):
+    """Build sequential ids like TXN00001 for a whole batch."""
+    return format_ids(prefix, np.arange(start, start + count), width)
+
+
+def generate_sales_batch(employees_df, vehicles_df, days_back=30,
+                         sales_per_day=(3, 8), rng=None,
+                         num_days=None, start_id=1, now=None,
+                         daily_counts=None, weekend_peak=False,
+                         seasonal=False, inventory=None):
+    rng = rng if rng is not None else np.random.default_rng()
+    num_days = days_back if num_days is None else num_days
+
+    salespeople = employees_df[employees_df["role"] == "salesperson"]
+
+    # Streaming and sharded runs pass the same inventory to every
+    # chunk so a car sold in one chunk is gone in the next
+    inventory = inventory if inventory is not None else open_inventory(
+        vehicles_df, opened_on=day_number(days_back, now)
+    )
+
+    # Each day generates 3 to 8 sales across all locations by default.
+    # Sharded runs decide the counts up front and pass them in.
+    if daily_counts is None:
+        daily_counts = rng.integers(
+            sales_per_day[0], sales_per_day[1] + 1, size=num_days
+        )
+        daily_counts = np.rint(daily_counts * day_weights(
+            days_back, num_days, now, weekend_peak, seasonal
+        )).astype(np.int64)
+    day_index = np.repeat(np.arange(num_days), daily_counts)
+
+    # Pick a random salesperson for every sale at once
+    salesperson_index = rng.integers(0, len(salespeople), size=len(day_index))
+
+    # Look up the lot each salesperson's location owns.
+    # Locations with an empty lot make no sale.
+    first_slot, slot_count, has_lot = find_lots(
+        inventory, salespeople["location_id"].to_numpy(dtype=str)
+    )
+
+    keep = has_lot[salesperson_index]
+    day_index = day_index[keep]
+    salesperson_index = salesperson_index[keep]
+
+    # Sell a random car off each lot, in day order, skipping cars on
+    # hold. A sale that finds nothing to sell is dropped.
+    sold, sold_kept = sell_from_lots(
+        inventory,
+        first_slot[salesperson_index],
+        slot_count[salesperson_index],
+        day_number(days_back, now) + day_index,
+        rng
+    )
+    day_index = day_index[sold_kept]
+    salesperson_index = salesperson_index[sold_kept]
+    num_sales = len(day_index)
+    sold_rows = vehicle_rows(sold, "sold", inventory["locations"])
+    inventory["sold"].append(sold_rows)
+
+    # Sale price is usually slightly below list price (negotiation)
+    sale_prices = sold["list_price"] * rng.uniform(0.92, 1.02, size=num_sales)
+
+    return pd.DataFrame({
+        "transaction_id": make_ids("TXN", start_id, num_sales, 5),
+        "vehicle_id": sold_rows["vehicle_id"].array,
+        "employee_id": lookup(salespeople["employee_id"], salesperson_index),
+        "location_id": lookup(salespeople["location_id"], salesperson_index),
+        "sale_price": np.round(sale_prices, 2),
+        "sale_date": lookup(
+            day_timestamps(days_back, num_days, now), day_index
+        ),
+        "financing_approved": rng.integers(0, 3, size=num_sales) < 2
+    })
+
+
+def generate_service_jobs_batch(employees_df, vehicles_df, days_back=30,
+                                jobs_per_day=(5, 12), rng=None,
+                                num_days=None, start_id=1, now=None,
+                                daily_counts=None, weekend_peak=False,
+                                seasonal=False):
+    rng = rng if rng is not None else np.random.default_rng()
+    num_days = days_back if num_days is None else num_days
+
+    technicians = employees_df[employees_df["role"] == "service_technician"]
+
+    # Each day generates 5 to 12 service jobs by default
+    if daily_counts is None:
+        daily_counts = rng.integers(
+            jobs_per_day[0], jobs_per_day[1] + 1, size=num_days
+        )
+        daily_counts = np.rint(daily_counts * day_weights(
+            days_back, num_days, now, weekend_peak, seasonal
+        )).astype(np.int64)
+    day_index = np.repeat(np.arange(num_days), daily_counts)
+    num_jobs = len(day_index)
+
+    technician_index = rng.integers(0, len(technicians), size=num_jobs)
+    vehicle_index = rng.integers(0, len(vehicles_df), size=num_jobs)
+    job_index = rng.integers(0, len(JOB_TYPES), size=num_jobs)
+
+    est_hours = np.array([job[1] for job in JOB_TYPES])[job_index]
+    labor_rates = np.array([job[2] for job in JOB_TYPES])[job_index]
+
+    # Sometimes jobs take longer than estimated (realistic!)
+    actual_hours = est_hours * rng.uniform(0.8, 1.4, size=num_jobs)
+
+    return pd.DataFrame({
+        "job_id": make_ids("JOB", start_id, num_jobs, 5),
+        "vehicle_id": lookup(vehicles_df["vehicle_id"], vehicle_index),
+        "technician_id": lookup(technicians["employee_id"], technician_index),
+        "location_id": lookup(technicians["location_id"], technician_index),
+        "job_type": lookup([job[0] for job in JOB_TYPES], job_index),
+        "estimated_hours": est_hours,
+        "actual_hours": np.round(actual_hours, 2),
+        "labor_revenue": np.round(actual_hours * labor_rates, 2),
+        "job_date": lookup(
+            day_timestamps(days_back, num_days, now), day_index
+        )
+    })
+
+
+# ============================================================
+# SECTION 7: STREAMING OUTPUT
+# Generate a few days at a time and write each chunk to disk
+# before making the next one. Memory stays flat no matter
+# how many years of history we ask for.
+# ============================================================
+
+def generate_in_chunks(employees_df, vehicles_df, days_back=30,
+                       chunk_days=30, rng=None, sales_volume=None,
+                       jobs_volume=None, inventory=None, now=None):
+    """
+    Yield (sales, service_jobs, vehicles) DataFrames one chunk of
+    days at a time, oldest chunk first.
+    Transaction and job ids keep counting across chunks so
+    they stay unique for the whole run.
+    vehicles holds the cars sold during the chunk, and the last
+    chunk also carries whatever is still on the lot at the end.
+    sales_volume / jobs_volume come from profile_volumes.
+    now pins the end of the history, like in plan_shards.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    sales_volume = sales_volume or {}
+    jobs_volume = jobs_volume or {}
+    inventory = inventory if inventory is not None else open_inventory(
+        vehicles_df, opened_on=day_number(days_back, now)
+    )
+    next_transaction_id = 1
+    next_job_id = 1
+
+    for chunk_start in range(days_back, 0, -chunk_days):
+        num_days = min(chunk_days, chunk_start)
+
+        sales = generate_sales_batch(
+            employees_df, vehicles_df, chunk_start,
+            rng=rng, num_days=num_days, start_id=next_transaction_id,
+            now=now, inventory=inventory, **sales_volume
+        )
+        service_jobs = generate_service_jobs_batch(
+            employees_df, vehicles_df, chunk_start,
+            rng=rng, num_days=num_days, start_id=next_job_id,
+            now=now, **jobs_volume
+        )
+
+        vehicles = take_sold_vehicles(inventory)
+        if chunk_start == num_days:
+            vehicles = pd.concat(
+                [vehicles, close_inventory(inventory, day_number(1, now))],
+                ignore_index=True
+            )
+
+        next_transaction_id += len(sales)
+        next_job_id += len(service_jobs)
+        yield sales, service_jobs, vehicles
+
+
+def write_partitioned(df, output_path, table_name, date_column,
+                      part, file_format="parquet"):
+    """
+    Write one chunk as Hive-style date partitions, e.g.
+    sales_transactions/sale_date=2025-01-31/part-0.parquet
+
+    The full timestamp column stays inside each file, so a file
+    still makes sense on its own without the folder name.
+    """
+    days = df[date_column].astype(str).str[:10]
+    groups = days.groupby(days, observed=True, sort=False).indices
+
+    # With many shards a day's file holds a handful of rows, so the
+    # chunk is converted to Arrow once and each day is a slice of it
+    if file_format == "parquet":
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+    for day, positions in groups.items():
+        partition_path = os.path.join(
+            output_path, table_name, f"{date_column}={day}"
+        )
+        os.makedirs(partition_path, exist_ok=True)
+        file_path = os.path.join(partition_path, f"part-{part}.{file_format}")
+        if file_format == "parquet":
+            write_file(table.take(positions), file_path, file_format)
+        else:
+            write_file(df.iloc[positions], file_path, file_format)
+
+    return len(df)
+
+
+def write_file(df, file_path, file_format="parquet"):
+    """
+    Write to a temporary name first and then rename, so anything
+    watching the folder never picks up a half-written file.
+    df can also be an Arrow table when the format is Parquet.
+    """
+    temp_path = f"{file_path}.tmp"
+    if file_format == "parquet":
+        if isinstance(df, pd.DataFrame):
+            df = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(df, temp_path, compression="zstd")
+    else:
+        df.to_csv(temp_path, index=False)
+    os.replace(temp_path, file_path)
+
+
+def clear_history(output_path):
+    """
+    Remove the sales and service job files an earlier run left in
+    output_path, as a single file or as partitions, before writing
+    a new history. Ingestion reads both layouts, so leftovers would
+    be loaded next to the new files: ids start again at TXN00001
+    and collide, and a shorter run would keep the old run's later
+    days. The emitter's state goes too, it continued the old files,
+    and so do the change files in cdc/: the emitter's vehicle
+    changes, and any corrections, are keyed on ids of the old run.
+    Vehicle spills a failed sharded run left behind go as well.
+    """
+    for table_name in ["sales_transactions", "service_jobs"]:
+        for extension in [".csv", ".csv.gz", ".csv.zst", ".parquet"]:
+            file_path = os.path.join(output_path, table_name + extension)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        shutil.rmtree(
+            os.path.join(output_path, table_name), ignore_errors=True
+        )
+    shutil.rmtree(os.path.join(output_path, "cdc"), ignore_errors=True)
+    shutil.rmtree(
+        os.path.join(output_path, VEHICLE_SPILL_DIR), ignore_errors=True
+    )
+
+    for file_name in [EMITTER_STATE_FILE, EMITTER_LOT_FILE]:
+        file_path = os.path.join(output_path, file_name)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+def append_csv(df, file_path, first):
+    """Start the file with a header on the first piece, then append."""
+    df.to_csv(
+        file_path, mode="w" if first else "a", header=first, index=False
+    )
+    return len(df)
+
+
+# ============================================================
+# SECTION 8: SHARDED GENERATION
+# Split the work into blocks of locations and run them on a
+# process pool. A block walks through every day chunk in order so
+# its lots carry over from one chunk to the next. Each block gets
+# its own seed derived from the run seed, and the block grid does
+# not depend on how many workers there are, so the same seed gives
+# the same files.
+# ============================================================
+
+# Blocks hold about the square root of the location count, so a
+# bigger profile gets both more shards to spread across cores and
+# more locations per shard: small is cut into 2 shards, regional
+# into 6 and national into 20. Every shard writes its own file per
+# day, finer blocks would mean thousands of files of a few rows.
+def shard_size(location_count):
+    """How many locations go into one shard."""
+    return max(1, math.ceil(math.sqrt(location_count)))
+
+
+def split_daily_counts(rng, per_day, num_days, shares, weights):
+    """
+    Draw each day's company-wide count, then split it across
+    shards in proportion to their headcount.
+    Picking a shard by headcount and then a person inside it is
+    the same as picking any person at random, like the row engine.
+    Shares may add up to less than 1, the rest is simply dropped.
+    Returns an array shaped (num_days, num_shares).
+    """
+    totals = rng.integers(per_day[0], per_day[1] + 1, size=num_days)
+    totals = np.rint(totals * weights).astype(np.int64)
+    dropped = max(1.0 - shares.sum(), 0.0)
+    return rng.multinomial(totals, np.append(shares, dropped))[:, :-1]
+
+
+def plan_shards(employees_df, vehicles_df, days_back, chunk_days, seed, now,
+                sales_volume, jobs_volume):
+    """
+    Decide every shard's day chunks, row counts and first ids
+    before any worker starts. Ids then come out the same however
+    the shards are spread across processes.
+    """
+    location_ids = sorted(employees_df["location_id"].unique())
+    per_block = shard_size(len(location_ids))
+    blocks = [
+        location_ids[start:start + per_block]
+        for start in range(0, len(location_ids), per_block)
+    ]
+
+    salespeople = employees_df[employees_df["role"] == "salesperson"]
+    technicians = employees_df[employees_df["role"] == "service_technician"]
+
+    # A salesperson with an empty lot makes no sale, so their
+    # share of the day's sales is dropped rather than given to a shard
+    sellers = salespeople[
+        salespeople["location_id"].isin(vehicles_df["location_id"])
+    ]
+    sales_shares = np.array([
+        sellers["location_id"].isin(block).sum() for block in blocks
+    ]) / len(salespeople)
+    jobs_shares = np.array([
+        technicians["location_id"].isin(block).sum() for block in blocks
+    ]) / len(technicians)
+
+    shards = [
+        {
+            "part": block_number,
+            "seed": [seed, 1, block_number],
+            "location_ids": block,
+            "now": now,
+            "chunks": []
+        }
+        for block_number, block in enumerate(blocks)
+    ]
+    next_transaction_id = 1
+    next_job_id = 1
+
+    chunk_starts = range(days_back, 0, -chunk_days)
+    for chunk_number, chunk_start in enumerate(chunk_starts):
+        num_days = min(chunk_days, chunk_start)
+
+        counts_rng = np.random.default_rng([seed, 0, chunk_number])
+        sales_counts = split_daily_counts(
+            counts_rng, sales_volume["sales_per_day"], num_days, sales_shares,
+            day_weights(
+                chunk_start, num_days, now,
+                sales_volume["weekend_peak"], sales_volume["seasonal"]
+            )
+        )
+        jobs_counts = split_daily_counts(
+            counts_rng, jobs_volume["jobs_per_day"], num_days, jobs_shares,
+            day_weights(
+                chunk_start, num_days, now,
+                jobs_volume["weekend_peak"], jobs_volume["seasonal"]
+            )
+        )
+
+        for block_number, shard in enumerate(shards):
+            shard["chunks"].append({
+                "days_back": chunk_start,
+                "num_days": num_days,
+                "sales_counts": sales_counts[:, block_number],
+                "jobs_counts": jobs_counts[:, block_number],
+                "first_transaction_id": next_transaction_id,
+                "first_job_id": next_job_id
+            })
+            next_transaction_id += int(sales_counts[:, block_number].sum())
+            next_job_id += int(jobs_counts[:, block_number].sum())
+
+    # Every sale brings in one new car, so each block numbers its
+    # arrivals after the opening stock and the blocks before it
+    next_vehicle_id = len(vehicles_df) + 1
+    for shard in shards:
+        shard["first_vehicle_id"] = next_vehicle_id
+        next_vehicle_id += sum(
+            int(chunk["sales_counts"].sum()) for chunk in shard["chunks"]
+        )
+
+    return shards
+
+
+# Employees and vehicles for the shards running in this process.
+# Sent once per worker instead of once per shard.
+SHARD_TABLES = {}
+
+# Shards writing files append their sold and closing vehicles here,
+# one CSV per shard, and main merges them into vehicles.csv
+VEHICLE_SPILL_DIR = "_vehicles_spill"
+
+
+def load_shard_tables(employees_df, vehicles_df):
+    SHARD_TABLES["employees"] = employees_df
+    SHARD_TABLES["vehicles"] = vehicles_df
+
+
+def generate_shard(shard, output_path=None, file_format="parquet"):
+    """
+    Generate one block of locations' sales and service jobs, one
+    day chunk after another with a single batch call per table.
+    Returns a (sales, service_jobs, vehicles) result per chunk, the
+    last one carrying the block's final lot.
+    With an output_path the shard writes its own partition files,
+    appends its vehicles to a spill file (see merge_vehicle_spills)
+    and returns only row counts, so what the parent holds does not
+    grow with the history. Otherwise it returns the DataFrames.
+    """
+    employees_df = SHARD_TABLES["employees"]
+    vehicles_df = SHARD_TABLES["vehicles"]
+    rng = np.random.default_rng(shard["seed"])
+
+    staff = employees_df[employees_df["location_id"].isin(shard["location_ids"])]
+    lot = vehicles_df[vehicles_df["location_id"].isin(shard["location_ids"])]
+    inventory = open_inventory(
+        lot, shard["first_vehicle_id"],
+        day_number(shard["chunks"][0]["days_back"], shard["now"])
+    )
+
+    # plan_shards already left out salespeople with nothing to sell
+    sellers = staff[staff["location_id"].isin(lot["location_id"])]
+
+    if output_path is not None:
+        os.makedirs(os.path.join(output_path, VEHICLE_SPILL_DIR), exist_ok=True)
+
+    results = []
+    for chunk_number, chunk in enumerate(shard["chunks"]):
+        sales = generate_sales_batch(
+            sellers, lot, chunk["days_back"],
+            rng=rng,
+            num_days=chunk["num_days"],
+            start_id=chunk["first_transaction_id"],
+            now=shard["now"],
+            daily_counts=chunk["sales_counts"],
+            inventory=inventory
+        )
+
+        # Any vehicle can come in for service, not just this branch's stock
+        service_jobs = generate_service_jobs_batch(
+            staff, vehicles_df, chunk["days_back"],
+            rng=rng,
+            num_days=chunk["num_days"],
+            start_id=chunk["first_job_id"],
+            now=shard["now"],
+            daily_counts=chunk["jobs_counts"]
+        )
+
+        vehicles = take_sold_vehicles(inventory)
+        if chunk_number == len(shard["chunks"]) - 1:
+            last_day = day_number(
+                chunk["days_back"] - chunk["num_days"] + 1, shard["now"]
+            )
+            vehicles = pd.concat(
+                [vehicles, close_inventory(inventory, last_day)],
+                ignore_index=True
+            )
+
+        if output_path is not None:
+            write_partitioned(
+                sales, output_path, "sales_transactions",
+                "sale_date", shard["part"], file_format
+            )
+            write_partitioned(
+                service_jobs, output_path, "service_jobs",
+                "job_date", shard["part"], file_format
+            )
+            spill_path = os.path.join(
+                output_path, VEHICLE_SPILL_DIR, f"part-{shard['part']}.csv"
+            )
+            vehicles = append_csv(vehicles, spill_path, chunk_number == 0)
+            sales, service_jobs = len(sales), len(service_jobs)
+
+        results.append((sales, service_jobs, vehicles))
+
+    return results
+
+
+def merge_vehicle_spills(output_path, file_path):
+    """
+    Concatenate the shards' vehicle spill files into one CSV in
+    shard order, the same order the rows would have come back in,
+    keeping only the first header. The spill folder goes after.
+    """
+    spill_dir = os.path.join(output_path, VEHICLE_SPILL_DIR)
+    spill_files = sorted(
+        glob.glob(os.path.join(spill_dir, "part-*.csv")),
+        key=lambda spill_file: int(
+            os.path.basename(spill_file)[len("part-"):-len(".csv")]
+        )
+    )
+
+    with open(file_path, "wb") as merged:
+        for number, spill_file in enumerate(spill_files):
+            with open(spill_file, "rb") as spill:
+                header = spill.readline()
+                if number == 0:
+                    merged.write(header)
+                shutil.copyfileobj(spill, merged)
+    shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+def run_shards(shards, employees_df, vehicles_df, workers=1,
+               output_path=None, file_format="parquet"):
+    """
+    Run every shard, in parallel when workers > 1.
+    Yields each shard's chunk results in shard order either way.
+    """
+    run_one = partial(
+        generate_shard,
+        output_path=output_path,
+        file_format=file_format
+    )
+
+    if workers <= 1:
+        load_shard_tables(employees_df, vehicles_df)
+        for results in map(run_one, shards):
+            yield from results
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=load_shard_tables,
+        initargs=(employees_df, vehicles_df)
+    ) as pool:
+        for results in pool.map(run_one, shards):
+            yield from results
+
+
+# ============================================================
+# SECTION 9: DIRECT TO DUCKDB
+# Skip CSV entirely. Each DataFrame is handed to
+# ingestion/ingest_frame.py, which appends it to bronze from
+# memory with the same casts, rejects and audit columns as a
+# file load (see main).
+# ============================================================
+
+# ============================================================
+# SECTION 10: LIVE EMITTER
+# Keep the dealership "open": every few seconds write a small
+# append-only batch of brand new sales and service jobs, stamped
+# with the current time, at a steady events-per-second rate.
+# Useful for load testing incremental ingestion and dashboard
+# freshness against a stream instead of a one-off backfill.
+# ============================================================
+
+# Where the emitter remembers its next ids and what is on the lot,
+# so a restarted emitter carries on instead of reusing ids
+EMITTER_STATE_FILE = "_emitter_state.json"
+EMITTER_LOT_FILE = "_emitter_lot.parquet"
+
+
+def highest_id(conn, output_path, table_name, id_column):
+    """
+    The largest numeric id already written for a table, in any of
+    the layouts generate_data.py writes (single CSV or partitions).
+    """
+    highest = 0
+    for reader, extension in [("read_csv_auto", "csv"),
+                              ("read_parquet", "parquet")]:
+        files = glob.glob(
+            os.path.join(output_path, f"{table_name}.{extension}")
+        ) + glob.glob(
+            os.path.join(output_path, table_name, "**", f"*.{extension}"),
+            recursive=True
+        )
+        if not files:
+            continue
+        found = conn.execute(
+            f"SELECT MAX(CAST(SUBSTR({id_column}, 4) AS BIGINT)) "
+            f"FROM {reader}(?)",
+            [files]
+        ).fetchone()[0]
+        highest = max(highest, found or 0)
+    return highest
+
+
+def load_emitter_state(output_path, emit_dir, vehicles_df):
+    """
+    Pick up where the last emitter run stopped, or where the
+    backfill in output_path ends if this is the first run.
+    """
+    state_path = os.path.join(emit_dir, EMITTER_STATE_FILE)
+    if os.path.exists(state_path):
+        with open(state_path) as state_file:
+            state = json.load(state_file)
+        lot = pd.read_parquet(os.path.join(emit_dir, EMITTER_LOT_FILE))
+        return state, open_inventory(lot, state["next_vehicle_id"])
+
+    conn = duckdb.connect()
+    state = {
+        "next_transaction_id": highest_id(
+            conn, output_path, "sales_transactions", "transaction_id"
+        ) + 1,
+        "next_job_id": highest_id(
+            conn, output_path, "service_jobs", "job_id"
+        ) + 1,
+        "next_vehicle_id": int(
+            vehicles_df["vehicle_id"].str[3:].astype(int).max()
+        ) + 1
+    }
+    conn.close()
+
+    # Anything not sold yet is still on the lot. How long a reserved
+    # car had left on hold is not in the file, its hold starts over
+    lot = vehicles_df[vehicles_df["status"] != "sold"]
+    return state, open_inventory(lot, state["next_vehicle_id"])
+
+
+def save_emitter_state(emit_dir, state, inventory, day):
+    """
+    Save the next ids and the lot, holds included, for the next
+    run. day is today, for the cars' status.
+    """
+    lot = inventory["slots"]
+    write_file(
+        vehicle_rows(lot, hold_statuses(lot, day), inventory["locations"])
+            .assign(available_from=lot["available_from"]),
+        os.path.join(emit_dir, EMITTER_LOT_FILE)
+    )
+    state_path = os.path.join(emit_dir, EMITTER_STATE_FILE)
+    with open(f"{state_path}.tmp", "w") as state_file:
+        json.dump(state, state_file)
+    os.replace(f"{state_path}.tmp", state_path)
+
+
+def emit_live(employees_df, vehicles_df, output_path, emit_dir,
+              events_per_second=5.0, batch_seconds=5.0, duration=None,
+              file_format="parquet", sales_volume=None, jobs_volume=None,
+              rng=None):
+    """
+    Write a micro-batch of new events every batch_seconds until
+    duration seconds have passed, or forever when duration is None.
+
+    Each batch holds however many events are due to keep the run at
+    events_per_second overall, so a slow batch is made up in the
+    next one. Events split between sales and service jobs in the
+    same ratio as the profile's daily volumes.
+
+    Files land in emit_dir as
+        sales_transactions/sale_date=YYYY-MM-DD/part-<stamp>.parquet
+        service_jobs/job_date=YYYY-MM-DD/part-<stamp>.parquet
+        cdc/vehicles/part-<stamp>.parquet
+    where the vehicles change file updates the cars sold in the
+    batch to status sold (_op U) and inserts the new arrivals that
+    took their place (_op I). ingest_bronze.py applies it by key.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    sales_volume = sales_volume or {"sales_per_day": (3, 8)}
+    jobs_volume = jobs_volume or {"jobs_per_day": (5, 12)}
+    os.makedirs(os.path.join(emit_dir, "cdc", "vehicles"), exist_ok=True)
+
+    sales_share = np.mean(sales_volume["sales_per_day"]) / (
+        np.mean(sales_volume["sales_per_day"])
+        + np.mean(jobs_volume["jobs_per_day"])
+    )
+    state, inventory = load_emitter_state(output_path, emit_dir, vehicles_df)
+
+    started = time.monotonic()
+    events_emitted = 0
+    batch_number = 0
+
+    while duration is None or time.monotonic() - started < duration:
+        batch_number += 1
+        time.sleep(max(started + batch_number * batch_seconds
+                       - time.monotonic(), 0))
+
+        elapsed = time.monotonic() - started
+        events_due = int(events_per_second * elapsed) - events_emitted
+        num_sales = rng.binomial(events_due, sales_share)
+        num_jobs = events_due - num_sales
+
+        now = datetime.now().replace(microsecond=0)
+        stamp = f"{now.strftime('%Y%m%dT%H%M%S')}-{batch_number:06d}"
+        first_arrival = inventory["next_vehicle_id"]
+
+        # days_back=0 with one day is "right now"
+        sales = generate_sales_batch(
+            employees_df, vehicles_df, 0,
+            rng=rng, num_days=1, start_id=state["next_transaction_id"],
+            now=now, daily_counts=[num_sales], inventory=inventory
+        )
+        service_jobs = generate_service_jobs_batch(
+            employees_df, vehicles_df, 0,
+            rng=rng, num_days=1, start_id=state["next_job_id"],
+            now=now, daily_counts=[num_jobs]
+        )
+
+        # Arrivals that were not sold again in the same batch, some
+        # of them on hold
+        lot = vehicle_rows(
+            inventory["slots"],
+            hold_statuses(inventory["slots"], now.toordinal()),
+            inventory["locations"]
+        )
+        arrivals = lot[lot["vehicle_id"].isin(make_ids(
+            "VEH", first_arrival,
+            inventory["next_vehicle_id"] - first_arrival, 4
+        ))]
+        vehicle_changes = pd.concat([
+            take_sold_vehicles(inventory).assign(_op="U"),
+            arrivals.assign(_op="I")
+        ], ignore_index=True)
+        vehicle_changes = vehicle_changes[
+            ["_op"] + list(vehicle_changes.columns[:-1])
+        ]
+
+        write_partitioned(
+            sales, emit_dir, "sales_transactions", "sale_date",
+            stamp, file_format
+        )
+        write_partitioned(
+            service_jobs, emit_dir, "service_jobs", "job_date",
+            stamp, file_format
+        )
+        if len(vehicle_changes) > 0:
+            write_file(
+                vehicle_changes,
+                os.path.join(
+                    emit_dir, "cdc", "vehicles", f"part-{stamp}.{file_format}"
+                ),
+                file_format
+            )
+
+        state["next_transaction_id"] += len(sales)
+        state["next_job_id"] += len(service_jobs)
+        state["next_vehicle_id"] = inventory["next_vehicle_id"]
+        save_emitter_state(emit_dir, state, inventory, now.toordinal())
+
+        events_emitted += events_due
+        print(
+            f"[{now.strftime('%H:%M:%S')}] batch {batch_number}: "
+            f"{len(sales)} sales, {len(service_jobs)} service jobs "
+            f"({events_emitted / elapsed:.1f} events/sec)"
+        )
+
+    return events_emitted
+
+
 # ============================================================
 # MAIN FUNCTION
-# This runs everything and saves CSV files
+# This runs everything and saves the files
 # ============================================================
 
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic Kommineni Automotive data."
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["row", "batch"],
+        default="row",
+        help="row = one sale at a time, batch = NumPy arrays per day range"
+    )
+    parser.add_argument(
+        "--profile",
+        choices=list(SCALE_PROFILES),
+        default="small",
+        help="Dealership size: branches, headcount, inventory, history"
+    )
+    parser.add_argument(
+        "--days-back",
+        type=int,
+        default=None,
+        help="How many days of sales and service history to generate "
+             "(defaults to the profile's history length)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write sales and service jobs chunk by chunk into "
+             "date-partitioned folders (uses the batch engine)"
+    )
+    parser.add_argument(
+        "--chunk-days",
+        type=int,
+        default=30,
+        help="Days generated per chunk in --stream mode"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["parquet", "csv"],
+        default="parquet",
+        help="File format for partitioned output in --stream mode"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes for sharded generation (by location and day chunk)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Run seed. The same seed gives the same output for any "
+             "number of workers"
+    )
+    parser.add_argument(
+        "--as-of",
+        default=None,
+        help="Generate history up to this date (YYYY-MM-DD) instead of "
+             "today, so seeded runs repeat on any day"
+    )
+    parser.add_argument(
+        "--to-duckdb",
+        action="store_true",
+        help="Append straight into the bronze tables instead of writing files"
+    )
+    parser.add_argument(
+        "--db-path",
+        default=None,
+        help="DuckDB file used with --to-duckdb (default "
+             "../kommineni_automotive.duckdb, refused once blue_green.py "
+             "has published a version)"
+    )
+    parser.add_argument(
+        "--emit",
+        action="store_true",
+        help="Keep running and write small batches of new sales and "
+             "service jobs on top of an existing backfill"
+    )
+    parser.add_argument(
+        "--events-per-second",
+        type=float,
+        default=5.0,
+        help="Sales plus service jobs per second in --emit mode"
+    )
+    parser.add_argument(
+        "--batch-seconds",
+        type=float,
+        default=5.0,
+        help="Seconds between batches in --emit mode"
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=None,
+        help="Stop --emit mode after this many seconds (default: run "
+             "until Ctrl+C)"
+    )
+    parser.add_argument(
+        "--emit-dir",
+        default=None,
+        help="Where --emit mode writes its batches, e.g. a queue folder "
+             "(defaults to data/raw)"
+    )
+    return parser.parse_args()
+
+
+def run_emitter(args, output_path):
+    """
+    --emit mode: stream new events on top of the reference tables
+    a normal run already wrote to output_path.
+    """
+    if not os.path.exists(f"{output_path}/vehicles.csv"):
+        raise SystemExit(
+            f"No data in {output_path}/ yet, run generate_data.py once "
+            f"without --emit first"
+        )
+
+    employees = pd.read_csv(f"{output_path}/employees.csv")
+    vehicles = pd.read_csv(f"{output_path}/vehicles.csv")
+    sales_volume, jobs_volume = profile_volumes(
+        SCALE_PROFILES[args.profile], employees
+    )
+    emit_dir = args.emit_dir or output_path
+    rng = np.random.default_rng(args.seed)
+
+    print(
+        f"Emitting {args.events_per_second:g} events/sec in "
+        f"{args.batch_seconds:g}s batches to {emit_dir}/ "
+        f"(Ctrl+C to stop)..."
+    )
+    try:
+        emit_live(
+            employees, vehicles, output_path, emit_dir,
+            args.events_per_second, args.batch_seconds, args.duration,
+            args.format, sales_volume, jobs_volume, rng
+        )
+    except KeyboardInterrupt:
+        print("Emitter stopped.")
+
+
 def main():
+    args = parse_args()
     print("Kommineni Automotive - Generating data...")
 
     # Create output folder if it does not exist
     output_path = "../data/raw"
     os.makedirs(output_path, exist_ok=True)
 
+    if args.emit:
+        run_emitter(args, output_path)
+        return
+
+    # Sharded mode kicks in when we ask for more cores or a fixed seed
+    sharded = args.workers > 1 or args.seed is not None
+    as_of = None
+    if args.as_of:
+        as_of = datetime.strptime(args.as_of, "%Y-%m-%d")
+    elif sharded:
+        as_of = datetime.combine(datetime.now().date(), datetime.min.time())
+
+    if sharded:
+        seed = args.seed
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        print(f"Seed: {seed}")
+        random.seed(seed)
+        fake.seed_instance(seed)
+
+    profile = SCALE_PROFILES[args.profile]
+    days_back = args.days_back or profile["days_back"]
+    stores = plan_stores(profile)
+    print(f"Profile: {args.profile} ({len(stores)} branches, {days_back} days)")
+
     # Generate all datasets
     print("Generating locations...")
-    locations = generate_locations()
+    locations = generate_locations(stores, as_of)
 
     print("Generating employees...")
-    employees = generate_employees()
+    employees = generate_employees(as_of, stores)
 
     print("Generating vehicles...")
-    vehicles = generate_vehicles()
+    vehicles = generate_vehicles(stores)
+
+    sales_volume, jobs_volume = profile_volumes(profile, employees)
+
+    # Work out where sales and service jobs come from: one batch,
+    # a stream of day chunks, or a pool of shards. Each yields
+    # (sales, service_jobs, vehicles) in order, where vehicles are
+    # the cars sold in that piece plus, at the end, what is left on
+    # the lot.
+    shards_write_files = sharded and args.stream and not args.to_duckdb
+    if not args.to_duckdb:
+        clear_history(output_path)
+    if sharded:
+        shards = plan_shards(
+            employees, vehicles, days_back, args.chunk_days, seed, as_of,
+            sales_volume, jobs_volume
+        )
+        print(
+            f"Generating sales and service jobs in {len(shards)} shards "
+            f"on {args.workers} worker(s)..."
+        )
+        chunks = run_shards(
+            shards, employees, vehicles, args.workers,
+            output_path if shards_write_files else None, args.format
+        )
+    elif args.stream:
+        print(
+            f"Streaming sales and service jobs in "
+            f"{args.chunk_days}-day chunks..."
+        )
+        chunks = generate_in_chunks(
+            employees, vehicles, days_back, args.chunk_days,
+            sales_volume=sales_volume, jobs_volume=jobs_volume, now=as_of
+        )
+    else:
+        inventory = open_inventory(
+            vehicles, opened_on=day_number(days_back, as_of)
+        )
+
+        print(f"Generating sales transactions ({args.engine} engine)...")
+        if args.engine == "batch":
+            sales = generate_sales_batch(
+                employees, vehicles, days_back, inventory=inventory,
+                now=as_of, **sales_volume
+            )
+        else:
+            sales = generate_sales(
+                employees, vehicles, days_back, inventory=inventory,
+                now=as_of, **sales_volume
+            )
+
+        print(f"Generating service jobs ({args.engine} engine)...")
+        if args.engine == "batch":
+            service_jobs = generate_service_jobs_batch(
+                employees, vehicles, days_back, now=as_of, **jobs_volume
+            )
+        else:
+            service_jobs = generate_service_jobs(
+                employees, vehicles, days_back, now=as_of, **jobs_volume
+            )
+
+        settled_vehicles = pd.concat(
+            [
+                take_sold_vehicles(inventory),
+                close_inventory(inventory, day_number(1, as_of))
+            ],
+            ignore_index=True
+        )
+        chunks = [(sales, service_jobs, settled_vehicles)]
+
+    sales_count = 0
+    service_jobs_count = 0
+    vehicles_count = 0
+
+    if args.to_duckdb:
+        # Straight into bronze, no CSV in between
+        db_path = working_db_path(args.db_path)
+        conn = duckdb.connect(db_path)
+        # The manifest, rejects and deleted rows next to the data,
+        # dbt's incremental models read them like after an ingest.
+        # ingest_frame casts, checks and stamps each DataFrame
+        create_bookkeeping_tables(conn)
+        ingested_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        for table_name, df in [
+            ("locations", locations),
+            ("employees", employees)
+        ]:
+            ingest_frame(
+                conn, table_name, df, "generate_data.py", ingested_at,
+                replace=True
+            )
 
-    print("Generating sales transactions...")
-    sales = generate_sales(employees, vehicles)
+        for part, (sales, service_jobs, settled_vehicles) in enumerate(chunks):
+            sales_count += ingest_frame(
+                conn, "sales_transactions", sales, "generate_data.py",
+                ingested_at, replace=part == 0
+            )[0]
+            service_jobs_count += ingest_frame(
+                conn, "service_jobs", service_jobs, "generate_data.py",
+                ingested_at, replace=part == 0
+            )[0]
+            vehicles_count += ingest_frame(
+                conn, "vehicles", settled_vehicles, "generate_data.py",
+                ingested_at, replace=part == 0
+            )[0]
+        conn.close()
+    else:
+        # Reference tables are small, they always go out as single CSVs
+        locations.to_csv(f"{output_path}/locations.csv", index=False)
+        employees.to_csv(f"{output_path}/employees.csv", index=False)
 
-    print("Generating service jobs...")
-    service_jobs = generate_service_jobs(employees, vehicles)
+        # Vehicles settle piece by piece as cars sell
+        vehicles_file = f"{output_path}/vehicles.csv"
 
-    # Save everything as CSV files
-    locations.to_csv(f"{output_path}/locations.csv", index=False)
-    employees.to_csv(f"{output_path}/employees.csv", index=False)
-    vehicles.to_csv(f"{output_path}/vehicles.csv", index=False)
-    sales.to_csv(f"{output_path}/sales_transactions.csv", index=False)
-    service_jobs.to_csv(f"{output_path}/service_jobs.csv", index=False)
+        if shards_write_files:
+            # Shards already wrote their own files and vehicle
+            # spills, we just get counts
+            for shard_sales, shard_jobs, settled in chunks:
+                sales_count += shard_sales
+                service_jobs_count += shard_jobs
+                vehicles_count += settled
+            merge_vehicle_spills(output_path, vehicles_file)
+        elif args.stream:
+            for part, (sales, service_jobs, settled_vehicles) in enumerate(chunks):
+                sales_count += write_partitioned(
+                    sales, output_path, "sales_transactions",
+                    "sale_date", part, args.format
+                )
+                service_jobs_count += write_partitioned(
+                    service_jobs, output_path, "service_jobs",
+                    "job_date", part, args.format
+                )
+                vehicles_count += append_csv(
+                    settled_vehicles, vehicles_file, part == 0
+                )
+        else:
+            chunks = list(chunks)
+            sales = pd.concat([sales for sales, _, _ in chunks])
+            service_jobs = pd.concat([jobs for _, jobs, _ in chunks])
+            settled_vehicles = pd.concat([cars for _, _, cars in chunks])
+            sales.to_csv(f"{output_path}/sales_transactions.csv", index=False)
+            service_jobs.to_csv(f"{output_path}/service_jobs.csv", index=False)
+            settled_vehicles.to_csv(vehicles_file, index=False)
+            sales_count = len(sales)
+            service_jobs_count = len(service_jobs)
+            vehicles_count = len(settled_vehicles)
 
     print("")
     print("Data generation complete!")
     print(f"  Locations:    {len(locations)} rows")
     print(f"  Employees:    {len(employees)} rows")
-    print(f"  Vehicles:     {len(vehicles)} rows")
-    print(f"  Sales:        {len(sales)} rows")
-    print(f"  Service Jobs: {len(service_jobs)} rows")
+    print(f"  Vehicles:     {vehicles_count} rows")
+    print(f"  Sales:        {sales_count} rows")
+    print(f"  Service Jobs: {service_jobs_count} rows")
     print("")
-    print(f"Files saved to: {output_path}/")
+    if args.to_duckdb:
+        print(f"Loaded into bronze schema of: {db_path}")
+    else:
+        print(f"Files saved to: {output_path}/")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,13 @@
+-- ============================================================
+-- as_of_date: the day the gold marts are built as of
+-- Today unless set, e.g. to rebuild history as it looked then:
+--   dbt run --full-refresh --vars '{as_of_date: 2025-06-30}'
+-- ============================================================
+
+{% macro as_of_date() %}
+    {%- if var('as_of_date') -%}
+        CAST('{{ var("as_of_date") }}' AS DATE)
+    {%- else -%}
+        CURRENT_DATE
+    {%- endif -%}
+{% endmacro %}
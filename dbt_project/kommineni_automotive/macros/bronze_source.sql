@@ -0,0 +1,36 @@
+-- ============================================================
+-- bronze_source: where a staging model reads its bronze table
+-- Sales and service jobs can live as month-partitioned Parquet
+-- (ingest_bronze.py --storage parquet). Run with
+--   dbt run --vars '{bronze_storage: parquet}'
+-- to read them from there instead of the DuckDB tables.
+--
+-- Parquet bronze keeps every version of a reloaded file's rows.
+-- The ones a later load replaced are logged in bronze._deletes
+-- and left out here, the same way parquet_rows in ingest_bronze.py
+-- reads them.
+-- ============================================================
+
+{% macro bronze_source(table_name) %}
+    {%- set parquet_keys = {
+        'sales_transactions': 'transaction_id',
+        'service_jobs': 'job_id'
+    } -%}
+    {%- if var('bronze_storage') == 'parquet'
+        and table_name in parquet_keys -%}
+        (
+            SELECT *
+            FROM {{ source('bronze_parquet', table_name) }} bronze_row
+            WHERE NOT EXISTS (
+                SELECT 1
+                FROM {{ source('bronze', '_deletes') }} deleted
+                WHERE deleted.table_name = '{{ table_name }}'
+                AND deleted.key_value = bronze_row.{{ parquet_keys[table_name] }}
+                AND deleted._source_file = bronze_row._source_file
+                AND deleted._ingested_at > bronze_row._ingested_at
+            )
+        ) AS current_{{ table_name }}
+    {%- else -%}
+        {{ source('bronze', table_name) }}
+    {%- endif -%}
+{% endmacro %}
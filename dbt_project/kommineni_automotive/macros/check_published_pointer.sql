@@ -0,0 +1,27 @@
+-- ============================================================
+-- check_published_pointer: stops a plain dbt run from building
+-- a database the dashboard no longer reads
+-- Without KOMMINENI_DB_PATH, profiles.yml points dbt at
+-- kommineni_automotive.duckdb. Once blue_green.py has published
+-- a version (kommineni_automotive.current exists) the dashboard
+-- reads that version instead, so the run would look fine and
+-- change nothing anyone sees. Runs at the start of every dbt
+-- command (see on-run-start in dbt_project.yml) and fails it.
+-- ============================================================
+
+{% macro check_published_pointer() %}
+    {%- set pointer = '../../kommineni_automotive.current' -%}
+
+    {%- if execute and env_var('KOMMINENI_DB_PATH', '') == '' -%}
+        {#- DuckDB's glob() lists the pointer file if it is there -#}
+        {%- set found = run_query("SELECT file FROM glob('" ~ pointer ~ "')") -%}
+        {%- if found.rows | length > 0 -%}
+            {{ exceptions.raise_compiler_error(
+                pointer ~ ' exists: the dashboard reads the version '
+                ~ 'blue_green.py published, not the database this run '
+                ~ 'would build. Build with ingestion/blue_green.py, or set '
+                ~ 'KOMMINENI_DB_PATH to the database file to use.'
+            ) }}
+        {%- endif -%}
+    {%- endif -%}
+{% endmacro %}
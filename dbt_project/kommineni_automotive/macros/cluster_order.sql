@@ -0,0 +1,17 @@
+-- ============================================================
+-- cluster_order: the order a model's rows are written in
+-- A model sets cluster_by in its config, e.g.
+--   {{ config(cluster_by=['sale_date_only', 'location_id']) }}
+-- and ends with {{ cluster_order() }}. DuckDB keeps min/max
+-- stats per row group, so rows written in date order let a
+-- date range query skip every row group outside the range.
+-- Incremental runs append their batch sorted; late rows for old
+-- dates blur the tail a little until the next --full-refresh.
+-- ============================================================
+
+{% macro cluster_order() %}
+    {%- set columns = config.get('cluster_by') -%}
+    {%- if columns -%}
+        ORDER BY {{ columns | join(', ') }}
+    {%- endif -%}
+{% endmacro %}
@@ -0,0 +1,44 @@
+-- ============================================================
+-- drop_outdated_marts: one-time migration for marts that went
+-- from a plain table to incremental, or gained a column since
+-- An incremental model only builds from scratch when its table
+-- does not exist yet. A table left by the old version lacks the
+-- column the incremental run reads (MAX(target_month) etc.) or
+-- writes (sales_cube.financed_deals), so the run would fail. Runs
+-- at the start of every dbt run (see on-run-start in
+-- dbt_project.yml) and drops such a table, and the model builds it
+-- in full. Only marts the run selects are dropped: a table left out
+-- of --select would be gone until the next run that builds it.
+-- Afterwards it finds nothing to do.
+-- ============================================================
+
+{% macro drop_outdated_marts() %}
+    {#- mart: a column only its current version has -#}
+    {%- set marts = {
+        'daily_sales_by_location': '_last_ingested_at',
+        'revenue_vs_target': 'target_month',
+        'sales_cube': 'financed_deals',
+        'salesperson_leaderboard': 'week_start',
+        'service_center_utilization': 'week_start'
+    } -%}
+
+    {%- if execute -%}
+        {%- for mart, column in marts.items()
+            if ('model.' ~ project_name ~ '.' ~ mart) in selected_resources -%}
+            {%- set relation = adapter.get_relation(
+                database=target.database,
+                schema=generate_schema_name('gold', none),
+                identifier=mart
+            ) -%}
+            {%- if relation is not none -%}
+                {%- set columns = adapter.get_columns_in_relation(relation)
+                    | map(attribute='name') | map('lower') | list -%}
+                {%- if column not in columns -%}
+                    {{ log('Dropping ' ~ relation ~ ', it has no ' ~ column
+                        ~ ' yet and is rebuilt in full', info=true) }}
+                    {%- do adapter.drop_relation(relation) -%}
+                {%- endif -%}
+            {%- endif -%}
+        {%- endfor -%}
+    {%- endif -%}
+{% endmacro %}
@@ -0,0 +1,13 @@
+-- ============================================================
+-- unique_combination: no two rows share the same values across
+-- several columns, e.g. one row per location per month
+-- ============================================================
+
+{% test unique_combination(model, columns) %}
+
+    SELECT {{ columns | join(', ') }}
+    FROM {{ model }}
+    GROUP BY {{ columns | join(', ') }}
+    HAVING COUNT(*) > 1
+
+{% endtest %}
@@ -4,9 +4,59 @@
 -- This is what the CEO looks at every morning
 -- ============================================================
 
-WITH sales AS (
+-- Incremental: each run only regroups the (sale_date, location_id)
+-- pairs that new, corrected or deleted sales touched, and swaps
+-- those rows in. A group left with no sales is removed afterwards.
+{{ config(
+    materialized='incremental',
+    unique_key=['sale_date', 'location_id'],
+    cluster_by=['sale_date', 'location_id'],
+    incremental_strategy='delete+insert',
+    post_hook="
+        {% if is_incremental() %}
+        DELETE FROM {{ this }} WHERE units_sold = 0
+        {% endif %}
+    "
+) }}
+
+WITH
+
+{% if is_incremental() %}
+-- Groups with sales ingested since the last run, plus the groups
+-- that replaced or deleted sales used to belong to. From the last
+-- run's second on (>=), as in the staging models: a group regrouped
+-- twice comes out the same
+touched AS (
+
+    SELECT sale_date_only AS sale_date, location_id
+    FROM {{ ref('stg_sales_transactions') }}
+    WHERE _ingested_at >= (
+        SELECT COALESCE(MAX(_last_ingested_at), '') FROM {{ this }}
+    )
+
+    UNION
 
-    SELECT * FROM {{ ref('stg_sales_transactions') }}
+    SELECT
+        CAST(CAST(old_row ->> 'sale_date' AS TIMESTAMP) AS DATE),
+        old_row ->> 'location_id'
+    FROM {{ source('bronze', '_deletes') }}
+    WHERE table_name = 'sales_transactions'
+    AND _ingested_at >= (
+        SELECT COALESCE(MAX(_last_ingested_at), '') FROM {{ this }}
+    )
+
+),
+{% endif %}
+
+sales AS (
+
+    SELECT s.*
+    FROM {{ ref('stg_sales_transactions') }} s
+    {% if is_incremental() %}
+    JOIN touched t
+        ON s.sale_date_only = t.sale_date
+        AND s.location_id = t.location_id
+    {% endif %}
 
 ),
 
@@ -39,7 +89,11 @@ daily_summary AS (
         SUM(CASE WHEN s.financing_approved THEN 1 ELSE 0 END) AS financed_deals,
 
         -- High value sales count
-        SUM(CASE WHEN s.is_high_value_sale THEN 1 ELSE 0 END) AS high_value_sales
+        SUM(CASE WHEN s.is_high_value_sale THEN 1 ELSE 0 END) AS high_value_sales,
+
+        -- Newest row behind this group, the high-water mark for the
+        -- next incremental run
+        MAX(s._ingested_at) AS _last_ingested_at
 
     FROM sales s
     LEFT JOIN locations l ON s.location_id = l.location_id
@@ -54,5 +108,41 @@ daily_summary AS (
 
 )
 
+{% if is_incremental() %}
+-- Touched groups that no longer have any sales come through with
+-- units_sold = 0, so the swap removes the old row; the post-hook
+-- then drops them
+, emptied AS (
+
+    SELECT
+        t.sale_date,
+        t.location_id,
+        l.city,
+        l.state,
+        l.monthly_target,
+        l.manager_name,
+        0 AS units_sold,
+        0 AS daily_revenue,
+        NULL AS avg_sale_price,
+        0 AS financed_deals,
+        0 AS high_value_sales,
+        NULL AS _last_ingested_at
+
+    FROM touched t
+    LEFT JOIN locations l ON t.location_id = l.location_id
+
+    WHERE NOT EXISTS (
+        SELECT 1 FROM daily_summary d
+        WHERE d.sale_date = t.sale_date
+        AND d.location_id = t.location_id
+    )
+
+)
+
+SELECT * FROM daily_summary
+UNION ALL BY NAME
+SELECT * FROM emptied
+{% else %}
 SELECT * FROM daily_summary
-ORDER BY sale_date DESC, daily_revenue DESC
\ No newline at end of file
+{% endif %}
+{{ cluster_order() }}
\ No newline at end of file
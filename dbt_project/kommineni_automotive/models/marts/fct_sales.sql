@@ -0,0 +1,80 @@
+-- ============================================================
+-- Gold Layer: fct_sales
+-- Answers: Every sale with the vehicle, salesperson and location
+-- details the dashboard filters and labels on, in one table
+-- ============================================================
+
+-- Sales only carry ids, so filtering on make or showing a name
+-- meant a join in every dashboard query. Here the joins happen
+-- once per build. Rebuilt in full each run (a few seconds), so a
+-- renamed salesperson or corrected vehicle shows up on every sale,
+-- and the rows stay sorted by date and location, which lets DuckDB
+-- skip row groups outside the dashboard's date range.
+{{ config(
+    cluster_by=['sale_date_only', 'location_id']
+) }}
+
+WITH sales AS (
+
+    SELECT * FROM {{ ref('stg_sales_transactions') }}
+
+),
+
+vehicles AS (
+
+    SELECT * FROM {{ ref('stg_vehicles') }}
+
+),
+
+employees AS (
+
+    SELECT * FROM {{ ref('stg_employees') }}
+
+),
+
+locations AS (
+
+    SELECT * FROM {{ ref('stg_locations') }}
+
+),
+
+wide AS (
+
+    SELECT
+        s.transaction_id,
+        s.sale_date,
+        s.sale_date_only,
+        s.sale_month,
+        s.day_of_week,
+        s.location_id,
+        l.city,
+        l.state,
+
+        -- Vehicle sold
+        s.vehicle_id,
+        v.make,
+        v.model,
+        v.year AS vehicle_year,
+        v.is_premium,
+
+        -- Who sold it
+        s.employee_id,
+        e.full_name AS salesperson_name,
+        e.commission_rate,
+
+        s.sale_price,
+        s.financing_approved,
+        s.is_high_value_sale,
+        ROUND(s.sale_price * e.commission_rate, 2) AS commission,
+
+        s._ingested_at
+
+    FROM sales s
+    LEFT JOIN vehicles v ON s.vehicle_id = v.vehicle_id
+    LEFT JOIN employees e ON s.employee_id = e.employee_id
+    LEFT JOIN locations l ON s.location_id = l.location_id
+
+)
+
+SELECT * FROM wide
+{{ cluster_order() }}
@@ -1,11 +1,26 @@
 -- ============================================================
 -- Gold Layer: revenue_vs_target
 -- Answers: How close is each location to hitting monthly target?
+-- One row per location per month, up to the as_of_date var
 -- ============================================================
 
+-- Incremental: closed months are built once and kept. Each run
+-- only recomputes the newest month already in the table (it may
+-- have been open last time) and adds any months after it.
+{{ config(
+    materialized='incremental',
+    unique_key=['location_id', 'target_month'],
+    cluster_by=['target_month', 'location_id'],
+    incremental_strategy='delete+insert'
+) }}
+
 WITH sales AS (
 
     SELECT * FROM {{ ref('stg_sales_transactions') }}
+    WHERE sale_date_only <= {{ as_of_date() }}
+    {% if is_incremental() %}
+    AND sale_month >= (SELECT MAX(target_month) FROM {{ this }})
+    {% endif %}
 
 ),
 
@@ -15,11 +30,34 @@ locations AS (
 
 ),
 
--- Get only this month's sales
+-- Every month to build, up to the one the as-of date falls in
+-- (just that one on a first build with no sales before it)
+months AS (
+
+    SELECT CAST(UNNEST(GENERATE_SERIES(
+        {% if is_incremental() %}
+        (SELECT MAX(target_month) FROM {{ this }}),
+        {% else %}
+        (SELECT CAST(COALESCE(
+            MIN(sale_month), DATE_TRUNC('month', {{ as_of_date() }})
+        ) AS DATE) FROM sales),
+        {% endif %}
+        CAST(DATE_TRUNC('month', {{ as_of_date() }}) AS DATE),
+        INTERVAL '1 month'
+    )) AS DATE) AS target_month
+
+),
+
 monthly_sales AS (
 
-    SELECT * FROM sales
-    WHERE sale_month = DATE_TRUNC('month', CURRENT_DATE)
+    SELECT
+        location_id,
+        CAST(sale_month AS DATE) AS target_month,
+        SUM(sale_price) AS revenue
+
+    FROM sales
+
+    GROUP BY location_id, sale_month
 
 ),
 
@@ -31,27 +69,34 @@ location_revenue AS (
         l.state,
         l.manager_name,
         l.monthly_target,
+        m.target_month,
 
-        -- Total revenue so far this month
-        ROUND(COALESCE(SUM(s.sale_price), 0), 2) AS revenue_to_date,
-
-        -- How many days into the month are we
-        EXTRACT(DAY FROM CURRENT_DATE) AS days_elapsed,
+        -- Total revenue in the month, up to the as-of date
+        ROUND(COALESCE(s.revenue, 0), 2) AS revenue_to_date,
 
         -- How many total days in this month
-        EXTRACT(DAY FROM 
-            (DATE_TRUNC('month', CURRENT_DATE) + INTERVAL '1 month' - INTERVAL '1 day')
-        ) AS days_in_month
+        EXTRACT(DAY FROM
+            (m.target_month + INTERVAL '1 month' - INTERVAL '1 day')
+        ) AS days_in_month,
 
-    FROM locations l
-    LEFT JOIN monthly_sales s ON l.location_id = s.location_id
+        -- How many days into the month are we (all of them once
+        -- the month is over)
+        CASE
+            WHEN m.target_month = DATE_TRUNC('month', {{ as_of_date() }})
+            THEN EXTRACT(DAY FROM {{ as_of_date() }})
+            ELSE EXTRACT(DAY FROM
+                (m.target_month + INTERVAL '1 month' - INTERVAL '1 day')
+            )
+        END AS days_elapsed,
 
-    GROUP BY
-        l.location_id,
-        l.city,
-        l.state,
-        l.manager_name,
-        l.monthly_target
+        m.target_month < DATE_TRUNC('month', {{ as_of_date() }})
+            AS is_month_closed
+
+    FROM locations l
+    CROSS JOIN months m
+    LEFT JOIN monthly_sales s
+        ON l.location_id = s.location_id
+        AND m.target_month = s.target_month
 
 ),
 
@@ -68,13 +113,13 @@ final AS (
 
         -- Daily run rate needed to hit target
         ROUND(
-            (monthly_target - revenue_to_date) / 
+            (monthly_target - revenue_to_date) /
             NULLIF(days_in_month - days_elapsed, 0),
         2) AS daily_rate_needed,
 
         -- Are they on track?
         CASE
-            WHEN (revenue_to_date / monthly_target) * 100 >= 
+            WHEN (revenue_to_date / monthly_target) * 100 >=
                  (days_elapsed::FLOAT / days_in_month * 100)
             THEN 'On Track'
             ELSE 'Behind'
@@ -85,4 +130,4 @@ final AS (
 )
 
 SELECT * FROM final
-ORDER BY pct_of_target DESC
\ No newline at end of file
+{{ cluster_order() }}
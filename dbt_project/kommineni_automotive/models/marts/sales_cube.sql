@@ -0,0 +1,151 @@
+-- ============================================================
+-- Gold Layer: sales_cube
+-- Answers: Revenue, deals, financed deals, best sale and commission
+-- per day for any mix of the dashboard's location, make and sale type filters
+-- One row per day per grouping set; a by_* flag that is FALSE
+-- means that column is rolled up ("all"), not NULL in the data
+-- ============================================================
+
+-- Grouping sets: company-wide by make and/or financing, and per
+-- location with or without financing. Per salesperson, or per
+-- location and make, a day holds about one sale per group, so
+-- those are left to the sales rows themselves.
+
+-- Incremental: each run regroups only the days that new, corrected
+-- or deleted sales touched and swaps all of their rows in. A day
+-- left with no sales is removed afterwards. Commission uses the
+-- current rate, run with --full-refresh after rates change.
+{{ config(
+    materialized='incremental',
+    unique_key='sale_date',
+    cluster_by=['sale_date', 'location_id'],
+    incremental_strategy='delete+insert',
+    post_hook="
+        {% if is_incremental() %}
+        DELETE FROM {{ this }} WHERE deals = 0
+        {% endif %}
+    "
+) }}
+
+WITH
+
+{% if is_incremental() %}
+-- Days with sales ingested since the last run, plus the days that
+-- replaced or deleted sales used to fall on. From the last run's
+-- second on (>=), as in the staging models: a day regrouped twice
+-- comes out the same
+touched AS (
+
+    SELECT sale_date_only AS sale_date
+    FROM {{ ref('stg_sales_transactions') }}
+    WHERE _ingested_at >= (
+        SELECT COALESCE(MAX(_last_ingested_at), '') FROM {{ this }}
+    )
+
+    UNION
+
+    SELECT CAST(CAST(old_row ->> 'sale_date' AS TIMESTAMP) AS DATE)
+    FROM {{ source('bronze', '_deletes') }}
+    WHERE table_name = 'sales_transactions'
+    AND _ingested_at >= (
+        SELECT COALESCE(MAX(_last_ingested_at), '') FROM {{ this }}
+    )
+
+),
+{% endif %}
+
+sales AS (
+
+    SELECT s.*
+    FROM {{ ref('stg_sales_transactions') }} s
+    {% if is_incremental() %}
+    JOIN touched t ON s.sale_date_only = t.sale_date
+    {% endif %}
+
+),
+
+vehicles AS (
+
+    SELECT * FROM {{ ref('stg_vehicles') }}
+
+),
+
+employees AS (
+
+    SELECT * FROM {{ ref('stg_employees') }}
+
+),
+
+cube AS (
+
+    SELECT
+        s.sale_date_only AS sale_date,
+        s.location_id,
+        v.make,
+        s.financing_approved,
+
+        GROUPING(s.location_id) = 0 AS by_location,
+        GROUPING(v.make) = 0 AS by_make,
+        GROUPING(s.financing_approved) = 0 AS by_financing,
+
+        COUNT(s.transaction_id) AS deals,
+        COUNT_IF(s.financing_approved) AS financed_deals,
+        ROUND(SUM(s.sale_price), 2) AS revenue,
+        ROUND(MAX(s.sale_price), 2) AS best_sale,
+        ROUND(SUM(s.sale_price * e.commission_rate), 2) AS commission,
+
+        -- Newest row behind this group, the high-water mark for the
+        -- next incremental run
+        MAX(s._ingested_at) AS _last_ingested_at
+
+    FROM sales s
+    LEFT JOIN vehicles v ON s.vehicle_id = v.vehicle_id
+    LEFT JOIN employees e ON s.employee_id = e.employee_id
+
+    GROUP BY GROUPING SETS (
+        (s.sale_date_only),
+        (s.sale_date_only, v.make),
+        (s.sale_date_only, s.financing_approved),
+        (s.sale_date_only, v.make, s.financing_approved),
+        (s.sale_date_only, s.location_id),
+        (s.sale_date_only, s.location_id, s.financing_approved)
+    )
+
+)
+
+{% if is_incremental() %}
+-- Touched days that no longer have any sales come through as one
+-- deals = 0 row, so the swap removes the old rows; the post-hook
+-- then drops it
+, emptied AS (
+
+    SELECT
+        t.sale_date,
+        NULL AS location_id,
+        NULL AS make,
+        NULL AS financing_approved,
+        FALSE AS by_location,
+        FALSE AS by_make,
+        FALSE AS by_financing,
+        0 AS deals,
+        0 AS financed_deals,
+        0 AS revenue,
+        NULL AS best_sale,
+        0 AS commission,
+        NULL AS _last_ingested_at
+
+    FROM touched t
+
+    WHERE NOT EXISTS (
+        SELECT 1 FROM cube c WHERE c.sale_date = t.sale_date
+    )
+
+)
+
+SELECT * FROM cube
+UNION ALL BY NAME
+SELECT * FROM emptied
+{% else %}
+SELECT * FROM cube
+{% endif %}
+{{ cluster_order() }}
@@ -1,11 +1,27 @@
 -- ============================================================
 -- Gold Layer: salesperson_leaderboard
--- Answers: Who are the top performers this week?
+-- Answers: Who are the top performers each week?
+-- One row per salesperson per week (weeks start on Monday),
+-- up to the as_of_date var
 -- ============================================================
 
+-- Incremental: closed weeks are built once and kept. Each run
+-- only recomputes the newest week already in the table and adds
+-- any weeks after it.
+{{ config(
+    materialized='incremental',
+    unique_key=['employee_id', 'week_start'],
+    cluster_by=['week_start', 'location_id'],
+    incremental_strategy='delete+insert'
+) }}
+
 WITH sales AS (
 
     SELECT * FROM {{ ref('stg_sales_transactions') }}
+    WHERE sale_date_only <= {{ as_of_date() }}
+    {% if is_incremental() %}
+    AND sale_date_only >= (SELECT MAX(week_start) FROM {{ this }})
+    {% endif %}
 
 ),
 
@@ -21,11 +37,30 @@ locations AS (
 
 ),
 
--- Get sales from the last 7 days only
-recent_sales AS (
+-- Every week to build, up to the one the as-of date falls in
+-- (just that one on a first build with no data before it)
+weeks AS (
+
+    SELECT CAST(UNNEST(GENERATE_SERIES(
+        {% if is_incremental() %}
+        (SELECT MAX(week_start) FROM {{ this }}),
+        {% else %}
+        (SELECT CAST(DATE_TRUNC('week', COALESCE(
+            MIN(sale_date_only), {{ as_of_date() }}
+        )) AS DATE) FROM sales),
+        {% endif %}
+        CAST(DATE_TRUNC('week', {{ as_of_date() }}) AS DATE),
+        INTERVAL '7 days'
+    )) AS DATE) AS week_start
+
+),
+
+weekly_sales AS (
 
-    SELECT * FROM sales
-    WHERE sale_date_only >= CURRENT_DATE - INTERVAL '7 days'
+    SELECT
+        *,
+        CAST(DATE_TRUNC('week', sale_date_only) AS DATE) AS week_start
+    FROM sales
 
 ),
 
@@ -37,14 +72,15 @@ performance AS (
         e.location_id,
         l.city,
         e.commission_rate,
+        w.week_start,
 
-        -- Deals closed this week
+        -- Deals closed in the week
         COUNT(s.transaction_id) AS deals_closed,
 
-        -- Total revenue generated this week
+        -- Total revenue generated in the week
         ROUND(SUM(s.sale_price), 2) AS revenue_generated,
 
-        -- Commission earned this week
+        -- Commission earned in the week
         ROUND(SUM(s.sale_price) * e.commission_rate, 2) AS commission_earned,
 
         -- Average deal size
@@ -54,7 +90,10 @@ performance AS (
         ROUND(MAX(s.sale_price), 2) AS best_single_sale
 
     FROM employees e
-    LEFT JOIN recent_sales s ON e.employee_id = s.employee_id
+    CROSS JOIN weeks w
+    LEFT JOIN weekly_sales s
+        ON e.employee_id = s.employee_id
+        AND w.week_start = s.week_start
     LEFT JOIN locations l ON e.location_id = l.location_id
 
     WHERE e.is_salesperson = TRUE
@@ -64,7 +103,8 @@ performance AS (
         e.full_name,
         e.location_id,
         l.city,
-        e.commission_rate
+        e.commission_rate,
+        w.week_start
 
 ),
 
@@ -73,20 +113,24 @@ ranked AS (
     SELECT
         *,
 
-        -- Rank within their own location
+        -- Rank within their own location that week
         RANK() OVER (
-            PARTITION BY location_id
+            PARTITION BY week_start, location_id
             ORDER BY deals_closed DESC, revenue_generated DESC
         ) AS location_rank,
 
-        -- Rank across the entire company
+        -- Rank across the entire company that week
         RANK() OVER (
+            PARTITION BY week_start
             ORDER BY deals_closed DESC, revenue_generated DESC
-        ) AS company_rank
+        ) AS company_rank,
+
+        week_start + INTERVAL '7 days' <= {{ as_of_date() }}
+            AS is_week_closed
 
     FROM performance
 
 )
 
 SELECT * FROM ranked
-ORDER BY company_rank
\ No newline at end of file
+{{ cluster_order() }}
@@ -1,11 +1,27 @@
 -- ============================================================
 -- Gold Layer: service_center_utilization
--- Answers: How efficient is each service center this week?
+-- Answers: How efficient is each service center each week?
+-- One row per technician per week (weeks start on Monday),
+-- up to the as_of_date var
 -- ============================================================
 
+-- Incremental: closed weeks are built once and kept. Each run
+-- only recomputes the newest week already in the table and adds
+-- any weeks after it.
+{{ config(
+    materialized='incremental',
+    unique_key=['technician_id', 'week_start'],
+    cluster_by=['week_start', 'location_id'],
+    incremental_strategy='delete+insert'
+) }}
+
 WITH jobs AS (
 
     SELECT * FROM {{ ref('stg_service_jobs') }}
+    WHERE job_date_only <= {{ as_of_date() }}
+    {% if is_incremental() %}
+    AND job_date_only >= (SELECT MAX(week_start) FROM {{ this }})
+    {% endif %}
 
 ),
 
@@ -21,10 +37,30 @@ locations AS (
 
 ),
 
-recent_jobs AS (
+-- Every week to build, up to the one the as-of date falls in
+-- (just that one on a first build with no data before it)
+weeks AS (
+
+    SELECT CAST(UNNEST(GENERATE_SERIES(
+        {% if is_incremental() %}
+        (SELECT MAX(week_start) FROM {{ this }}),
+        {% else %}
+        (SELECT CAST(DATE_TRUNC('week', COALESCE(
+            MIN(job_date_only), {{ as_of_date() }}
+        )) AS DATE) FROM jobs),
+        {% endif %}
+        CAST(DATE_TRUNC('week', {{ as_of_date() }}) AS DATE),
+        INTERVAL '7 days'
+    )) AS DATE) AS week_start
+
+),
 
-    SELECT * FROM jobs
-    WHERE job_date_only >= CURRENT_DATE - INTERVAL '7 days'
+weekly_jobs AS (
+
+    SELECT
+        *,
+        CAST(DATE_TRUNC('week', job_date_only) AS DATE) AS week_start
+    FROM jobs
 
 ),
 
@@ -35,15 +71,22 @@ technician_performance AS (
         e.full_name AS technician_name,
         e.location_id,
         l.city,
+        w.week_start,
 
         COUNT(j.job_id) AS jobs_completed,
         ROUND(SUM(j.labor_revenue), 2) AS total_revenue,
         ROUND(AVG(j.efficiency_ratio), 2) AS avg_efficiency,
         SUM(CASE WHEN j.is_overrun THEN 1 ELSE 0 END) AS overrun_jobs,
-        ROUND(AVG(j.actual_hours), 2) AS avg_job_hours
+        ROUND(AVG(j.actual_hours), 2) AS avg_job_hours,
+
+        w.week_start + INTERVAL '7 days' <= {{ as_of_date() }}
+            AS is_week_closed
 
     FROM employees e
-    LEFT JOIN recent_jobs j ON e.employee_id = j.technician_id
+    CROSS JOIN weeks w
+    LEFT JOIN weekly_jobs j
+        ON e.employee_id = j.technician_id
+        AND w.week_start = j.week_start
     LEFT JOIN locations l ON e.location_id = l.location_id
 
     WHERE e.is_salesperson = FALSE
@@ -52,9 +95,10 @@ technician_performance AS (
         e.employee_id,
         e.full_name,
         e.location_id,
-        l.city
+        l.city,
+        w.week_start
 
 )
 
 SELECT * FROM technician_performance
-ORDER BY total_revenue DESC
\ No newline at end of file
+{{ cluster_order() }}
@@ -3,9 +3,51 @@
 -- Cleans and standardizes the raw sales transactions table
 -- ============================================================
 
+-- Incremental: each run only reads rows ingested since the last
+-- one and replaces them by transaction_id, so a late correction
+-- overwrites the old version. Keys a change file deleted or replaced are
+-- dropped first. dbt run --full-refresh rebuilds from scratch.
+{{ config(
+    materialized='incremental',
+    unique_key='transaction_id',
+    cluster_by=['sale_date_only', 'location_id'],
+    incremental_strategy='delete+insert',
+    pre_hook="
+        {% if is_incremental() %}
+        DELETE FROM {{ this }}
+        WHERE transaction_id IN (
+            SELECT key_value
+            FROM {{ source('bronze', '_deletes') }}
+            WHERE table_name = 'sales_transactions'
+            AND _ingested_at >= (
+                SELECT COALESCE(MAX(_ingested_at), '') FROM {{ this }}
+            )
+        )
+        {% endif %}
+    "
+) }}
+
 WITH source AS (
 
-    SELECT * FROM {{ source('bronze', 'sales_transactions') }}
+    SELECT * FROM {{ bronze_source('sales_transactions') }}
+
+    {% if is_incremental() %}
+    -- Only rows ingested since the last run (the high-water mark).
+    -- _ingested_at is to the second, so the last run's second is read
+    -- again: a batch that landed in that same second after the run
+    -- would be skipped for good with >. Rows read twice replace
+    -- themselves by key, the QUALIFY below keeps one per key
+    WHERE _ingested_at >= (
+        SELECT COALESCE(MAX(_ingested_at), '') FROM {{ this }}
+    )
+    {% endif %}
+
+    -- The same transaction_id can arrive twice (a corrected file, or
+    -- Parquet bronze which keeps every version), keep the newest
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY transaction_id
+        ORDER BY _ingested_at DESC
+    ) = 1
 
 ),
 
@@ -58,4 +100,5 @@ final AS (
 
 )
 
-SELECT * FROM final
\ No newline at end of file
+SELECT * FROM final
+{{ cluster_order() }}
@@ -2,9 +2,51 @@
 -- Silver Layer: stg_service_jobs
 -- ============================================================
 
+-- Incremental: each run only reads rows ingested since the last
+-- one and replaces them by job_id, so a late correction
+-- overwrites the old version. Keys a change file deleted or replaced are
+-- dropped first. dbt run --full-refresh rebuilds from scratch.
+{{ config(
+    materialized='incremental',
+    unique_key='job_id',
+    cluster_by=['job_date_only', 'location_id'],
+    incremental_strategy='delete+insert',
+    pre_hook="
+        {% if is_incremental() %}
+        DELETE FROM {{ this }}
+        WHERE job_id IN (
+            SELECT key_value
+            FROM {{ source('bronze', '_deletes') }}
+            WHERE table_name = 'service_jobs'
+            AND _ingested_at >= (
+                SELECT COALESCE(MAX(_ingested_at), '') FROM {{ this }}
+            )
+        )
+        {% endif %}
+    "
+) }}
+
 WITH source AS (
 
-    SELECT * FROM {{ source('bronze', 'service_jobs') }}
+    SELECT * FROM {{ bronze_source('service_jobs') }}
+
+    {% if is_incremental() %}
+    -- Only rows ingested since the last run (the high-water mark).
+    -- _ingested_at is to the second, so the last run's second is read
+    -- again: a batch that landed in that same second after the run
+    -- would be skipped for good with >. Rows read twice replace
+    -- themselves by key, the QUALIFY below keeps one per key
+    WHERE _ingested_at >= (
+        SELECT COALESCE(MAX(_ingested_at), '') FROM {{ this }}
+    )
+    {% endif %}
+
+    -- The same job_id can arrive twice (a corrected file, or
+    -- Parquet bronze which keeps every version), keep the newest
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY job_id
+        ORDER BY _ingested_at DESC
+    ) = 1
 
 ),
 
@@ -44,4 +86,5 @@ cleaned AS (
 
 )
 
-SELECT * FROM cleaned
\ No newline at end of file
+SELECT * FROM cleaned
+{{ cluster_order() }}
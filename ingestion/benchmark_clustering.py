@@ -0,0 +1,216 @@
+"""
+benchmark_clustering.py
+How much of the silver fact tables a "last 7 days" dashboard query
+has to read, with rows clustered by date and location (the
+cluster_by config on the dbt models) versus the orders they had
+without it.
+
+DuckDB keeps min/max stats for every row group (about 122k rows)
+and skips the groups whose date range misses the filter. That only
+works when rows with nearby dates sit together. The layouts:
+  arrival   - the order bronze received the rows in (its rowid),
+              what a table appended straight from bronze looks like
+  rebuild   - the staging model without cluster_order: the same
+              newest-row-per-key window, written in whatever order
+              the window hands rows back
+  clustered - sorted by date, then location
+
+The published database may only hold a year or so of sales, so the
+rows are copied --years times, each copy shifted back a year, to
+get multi-year tables. Older copies count as having arrived first.
+Every layout is written to a scratch database, the published one is
+only read.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+import duckdb
+import pandas as pd
+from blue_green import published_db_path
+
+# Silver table: (date column, key column, measure the query sums)
+TABLES = {
+    "stg_sales_transactions": ("sale_date_only", "transaction_id", "sale_price"),
+    "stg_service_jobs": ("job_date_only", "job_id", "labor_revenue")
+}
+
+LAYOUTS = ["arrival", "rebuild", "clustered"]
+
+
+def build_layouts(conn, table_name, years):
+    """Write the multi-year copy of a silver table once per layout."""
+    date_column, key_column, _ = TABLES[table_name]
+    bronze_table = table_name[len("stg_"):]
+
+    # Where each key's row sits in bronze. Parquet bronze has no
+    # table, then files in load order is as close as we get.
+    has_bronze = conn.execute("""
+        SELECT COUNT(*) FROM information_schema.tables
+        WHERE table_catalog = 'src'
+        AND table_schema = 'bronze'
+        AND table_name = ?
+    """, [bronze_table]).fetchone()[0]
+    if has_bronze:
+        arrival = f"""(
+            SELECT {key_column}, MAX(rowid) AS _arrival
+            FROM src.bronze.{bronze_table}
+            GROUP BY {key_column}
+        )"""
+    else:
+        arrival = f"(SELECT NULL AS {key_column}, NULL AS _arrival)"
+
+    history = " UNION ALL ".join(
+        f"""
+        SELECT s.* REPLACE (
+            CAST(s.{date_column} - INTERVAL {copy} YEAR AS DATE) AS {date_column}
+        ), {copy} AS _copy, b._arrival
+        FROM src.main_silver.{table_name} s
+        LEFT JOIN {arrival} b ON s.{key_column} = b.{key_column}
+        """
+        for copy in range(years)
+    )
+    conn.execute(f"CREATE OR REPLACE TEMP TABLE history AS {history}")
+
+    conn.execute(f"""
+        CREATE OR REPLACE TABLE {table_name}_arrival AS
+        SELECT * FROM history
+        ORDER BY _copy DESC, _ingested_at, _source_file, _arrival
+    """)
+    conn.execute(f"""
+        CREATE OR REPLACE TABLE {table_name}_rebuild AS
+        SELECT * FROM history
+        QUALIFY ROW_NUMBER() OVER (
+            PARTITION BY {key_column}, _copy
+            ORDER BY _ingested_at DESC
+        ) = 1
+    """)
+    conn.execute(f"""
+        CREATE OR REPLACE TABLE {table_name}_clustered AS
+        SELECT * FROM history
+        ORDER BY {date_column}, location_id
+    """)
+    conn.execute("DROP TABLE history")
+    conn.execute("CHECKPOINT")
+
+
+def row_groups(conn, table, date_column, start, end):
+    """
+    Row groups in the table, and how many of them have a date range
+    that overlaps [start, end] and so cannot be skipped.
+    """
+    return conn.execute(f"""
+        WITH zones AS (
+            SELECT
+                row_group_id,
+                CAST(regexp_extract(stats, 'Min: ([0-9-]+)', 1) AS DATE) AS lo,
+                CAST(regexp_extract(stats, 'Max: ([0-9-]+)', 1) AS DATE) AS hi
+            FROM pragma_storage_info('{table}')
+            WHERE column_name = '{date_column}'
+            AND segment_type <> 'VALIDITY'
+        )
+        SELECT
+            COUNT(DISTINCT row_group_id),
+            COUNT(DISTINCT row_group_id) FILTER (
+                WHERE lo <= DATE '{end}' AND hi >= DATE '{start}'
+            )
+        FROM zones
+    """).fetchone()
+
+
+def time_query(conn, table, date_column, measure, start, end, repeats=5):
+    """Median milliseconds for the dashboard's date range query."""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        conn.execute(f"""
+            SELECT COUNT(*), SUM({measure})
+            FROM {table}
+            WHERE {date_column} >= '{start}'
+            AND {date_column} <= '{end}'
+        """).fetchall()
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1000, 2)
+
+
+def run_benchmark(db_path, years=3, days=7):
+    scratch_dir = tempfile.mkdtemp(prefix="clustering-")
+    conn = duckdb.connect(os.path.join(scratch_dir, "benchmark.duckdb"))
+    results = []
+
+    try:
+        conn.execute(f"ATTACH '{db_path}' AS src (READ_ONLY)")
+        for table_name, (date_column, _, measure) in TABLES.items():
+            build_layouts(conn, table_name, years)
+            end = conn.execute(
+                f"SELECT MAX({date_column}) FROM {table_name}_clustered"
+            ).fetchone()[0]
+            start = end - timedelta(days=days)
+
+            for layout in LAYOUTS:
+                table = f"{table_name}_{layout}"
+                total, scanned = row_groups(
+                    conn, table, date_column, start, end
+                )
+                results.append({
+                    "table_name": table_name,
+                    "layout": layout,
+                    "rows": conn.execute(
+                        f"SELECT COUNT(*) FROM {table}"
+                    ).fetchone()[0],
+                    "row_groups": total,
+                    "row_groups_scanned": scanned,
+                    "median_ms": time_query(
+                        conn, table, date_column, measure, start, end
+                    )
+                })
+    finally:
+        conn.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    return pd.DataFrame(results)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare row groups scanned by a date range query "
+                    "on unclustered and clustered silver tables."
+    )
+    parser.add_argument(
+        "--years",
+        type=int,
+        default=3,
+        help="How many years of history to build from the current data"
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=7,
+        help="Length of the date range the query filters on"
+    )
+    parser.add_argument(
+        "--db-path",
+        default=None,
+        help="Database to read silver from (default: the published one)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    db_path = args.db_path or published_db_path()
+    results = run_benchmark(db_path, args.years, args.days)
+
+    with pd.option_context("display.width", 200,
+                           "display.max_columns", None):
+        print(f"Last {args.days} days over {args.years} years ({db_path})")
+        print("-" * 40)
+        print(results.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+blue_green.py
+Builds the warehouse into a new versioned DuckDB file and
+publishes it with an atomic pointer swap.
+
+The dashboard keeps a read-only connection open for as long as it
+runs. Writing into that same file means lock conflicts, or readers
+stuck on old data until a restart. Instead every build goes into
+its own file under db_versions/, and only once bronze, silver and
+gold are all done do we point kommineni_automotive.current at it.
+The dashboard watches the pointer and reopens on the new version.
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import subprocess
+from datetime import datetime
+from ingest_bronze import DB_PATH, POINTER_PATH, run_ingestion
+
+VERSIONS_DIR = "../db_versions"
+DBT_PROJECT_DIR = "../dbt_project/kommineni_automotive"
+
+# Old versions are kept for a little while so a dashboard session
+# that is mid-query on one is not pulled out from under it
+KEEP_VERSIONS = 3
+
+
+def published_db_path():
+    """
+    The database file readers should use right now.
+    Falls back to the plain DB_PATH until the first publish.
+    """
+    if not os.path.exists(POINTER_PATH):
+        return DB_PATH
+    with open(POINTER_PATH) as pointer:
+        relative_path = pointer.read().strip()
+    return os.path.join(os.path.dirname(POINTER_PATH), relative_path)
+
+
+def start_version():
+    """
+    Create the next versioned database file.
+
+    It starts as a copy of the published one, so the manifest and
+    everything already in bronze carry over and the build stays
+    incremental. Readers only ever open the published file
+    read-only, so copying it is safe.
+    """
+    os.makedirs(VERSIONS_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    version_path = os.path.join(
+        VERSIONS_DIR, f"kommineni_automotive-{stamp}.duckdb"
+    )
+
+    current_path = published_db_path()
+    if os.path.exists(current_path):
+        shutil.copyfile(current_path, version_path)
+    return version_path
+
+
+def run_dbt(db_path, *dbt_args, storage="table"):
+    """
+    Run a dbt command against db_path. profiles.yml in the dbt
+    project reads the path from KOMMINENI_DB_PATH.
+    """
+    subprocess.run(
+        ["dbt", *dbt_args, "--vars", f"{{bronze_storage: {storage}}}"],
+        cwd=DBT_PROJECT_DIR,
+        env={**os.environ, "KOMMINENI_DB_PATH": os.path.abspath(db_path)},
+        check=True
+    )
+
+
+def publish(version_path):
+    """
+    Point readers at version_path.
+
+    The new pointer is written to a temporary file and renamed
+    over the old one. A rename is atomic, so a reader sees either
+    the old version or the new one, never a half-written pointer.
+    """
+    relative_path = os.path.relpath(
+        version_path, os.path.dirname(POINTER_PATH)
+    )
+    with open(f"{POINTER_PATH}.tmp", "w") as pointer:
+        pointer.write(relative_path)
+    os.replace(f"{POINTER_PATH}.tmp", POINTER_PATH)
+    print(f"Published: {relative_path}")
+
+
+def prune_versions(keep=KEEP_VERSIONS):
+    """Delete all but the newest few versions, never the published one."""
+    published = os.path.abspath(published_db_path())
+    versions = sorted(glob.glob(
+        os.path.join(VERSIONS_DIR, "kommineni_automotive-*.duckdb")
+    ))
+    for version_path in versions[:-keep]:
+        if os.path.abspath(version_path) != published:
+            os.remove(version_path)
+
+
+def build_and_publish(full_refresh=False, parallelism=4, run_models=True,
+                      keep=KEEP_VERSIONS, storage="table"):
+    """
+    Build a new version end to end and publish it. If any step
+    fails the half-built file is removed and readers stay on the
+    version they already have.
+    """
+    version_path = start_version()
+    print(f"Building: {version_path}")
+
+    try:
+        run_ingestion(version_path, full_refresh, parallelism, storage)
+        if run_models:
+            run_dbt(version_path, "run", storage=storage)
+            run_dbt(version_path, "test", storage=storage)
+    except BaseException:
+        if os.path.exists(version_path):
+            os.remove(version_path)
+        raise
+
+    publish(version_path)
+    prune_versions(keep)
+    return version_path
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Build a new warehouse version and swap readers onto it."
+    )
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="Rebuild bronze from scratch instead of incrementally"
+    )
+    parser.add_argument(
+        "--parallelism",
+        type=int,
+        default=4,
+        help="How many bronze tables to load at the same time"
+    )
+    parser.add_argument(
+        "--skip-dbt",
+        action="store_true",
+        help="Publish after ingestion without running dbt"
+    )
+    parser.add_argument(
+        "--keep",
+        type=int,
+        default=KEEP_VERSIONS,
+        help="How many database versions to keep on disk"
+    )
+    parser.add_argument(
+        "--storage",
+        choices=["table", "parquet"],
+        default="table",
+        help="Bronze storage for sales and service jobs (see ingest_bronze)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    build_and_publish(
+        args.full_refresh, args.parallelism, not args.skip_dbt, args.keep,
+        args.storage
+    )
+
+
+if __name__ == "__main__":
+    main()
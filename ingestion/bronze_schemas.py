@@ -0,0 +1,137 @@
+"""
+bronze_schemas.py
+Declared column types for every bronze table.
+
+read_csv_auto guesses types by sampling each file, which costs
+time on big files and can guess differently from one run to the
+next. These schemas are handed to read_csv instead, with sniffing
+turned off, so bronze types only change when we change them here.
+"""
+
+DATE_FORMAT = "%Y-%m-%d"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Each table lists (column name, DuckDB type, nullable) in file
+# order, plus the formats its DATE / TIMESTAMP columns are written in.
+# Rows that break a type or leave a non-nullable column empty go to
+# bronze._rejects instead of failing the load. Every table names
+# its primary key, which change files (CDC_SOURCES in
+# ingest_bronze.py) are matched on and the quality profile counts.
+BRONZE_SCHEMAS = {
+    "locations": {
+        "columns": [
+            ("location_id", "VARCHAR", False),
+            ("city", "VARCHAR", True),
+            ("state", "VARCHAR", True),
+            ("manager_name", "VARCHAR", True),
+            ("monthly_target", "BIGINT", True),
+            ("opened_date", "DATE", True)
+        ],
+        "dateformat": DATE_FORMAT,
+        "key": "location_id"
+    },
+    "employees": {
+        "columns": [
+            ("employee_id", "VARCHAR", False),
+            ("full_name", "VARCHAR", True),
+            ("role", "VARCHAR", True),
+            ("location_id", "VARCHAR", False),
+            ("hire_date", "DATE", True),
+            ("commission_rate", "DOUBLE", True)
+        ],
+        "dateformat": DATE_FORMAT,
+        "key": "employee_id"
+    },
+    "vehicles": {
+        "columns": [
+            ("vehicle_id", "VARCHAR", False),
+            ("make", "VARCHAR", True),
+            ("model", "VARCHAR", True),
+            ("year", "BIGINT", True),
+            ("list_price", "BIGINT", True),
+            ("status", "VARCHAR", True),
+            ("location_id", "VARCHAR", False)
+        ],
+        "key": "vehicle_id"
+    },
+    "sales_transactions": {
+        "columns": [
+            ("transaction_id", "VARCHAR", False),
+            ("vehicle_id", "VARCHAR", False),
+            ("employee_id", "VARCHAR", False),
+            ("location_id", "VARCHAR", False),
+            ("sale_price", "DOUBLE", True),
+            ("sale_date", "TIMESTAMP", False),
+            ("financing_approved", "BOOLEAN", True)
+        ],
+        "timestampformat": TIMESTAMP_FORMAT,
+        "key": "transaction_id"
+    },
+    "service_jobs": {
+        "columns": [
+            ("job_id", "VARCHAR", False),
+            ("vehicle_id", "VARCHAR", False),
+            ("technician_id", "VARCHAR", False),
+            ("location_id", "VARCHAR", False),
+            ("job_type", "VARCHAR", True),
+            ("estimated_hours", "DOUBLE", True),
+            ("actual_hours", "DOUBLE", True),
+            ("labor_revenue", "DOUBLE", True),
+            ("job_date", "TIMESTAMP", False)
+        ],
+        "timestampformat": TIMESTAMP_FORMAT,
+        "key": "job_id"
+    }
+}
+
+# Change files carry one extra leading column, the operation:
+# I (insert), U (update) or D (delete). A delete only needs the key.
+CHANGE_OPERATIONS = ["I", "U", "D"]
+
+
+def read_csv_options(table_name, changes=False):
+    """
+    The read_csv arguments for a table, as a SQL snippet:
+    declared columns, fixed formats and no sniffing.
+    """
+    schema = BRONZE_SCHEMAS[table_name]
+    columns = ", ".join(
+        f"'{column}': '{duck_type}'"
+        for column, duck_type in declared_columns(table_name, changes)
+    )
+    options = [
+        f"columns = {{{columns}}}",
+        "header = true",
+        "delim = ','",
+        "quote = '\"'",
+        "auto_detect = false"
+    ]
+    for option in ["dateformat", "timestampformat"]:
+        if option in schema:
+            options.append(f"{option} = '{schema[option]}'")
+    return ", ".join(options)
+
+
+def declared_columns(table_name, changes=False):
+    """(column, DuckDB type) pairs in file order."""
+    columns = [
+        (column, duck_type)
+        for column, duck_type, _ in BRONZE_SCHEMAS[table_name]["columns"]
+    ]
+    if changes:
+        columns.insert(0, ("_op", "VARCHAR"))
+    return columns
+
+
+def required_columns(table_name):
+    """Columns that must not be empty."""
+    return [
+        column
+        for column, _, nullable in BRONZE_SCHEMAS[table_name]["columns"]
+        if not nullable
+    ]
+
+
+def primary_key(table_name):
+    """The column that identifies a row."""
+    return BRONZE_SCHEMAS[table_name]["key"]
@@ -1,29 +1,128 @@
-#"""
+"""
 ingest_bronze.py
 Loads raw CSVs into DuckDB bronze layer.
 No transforms here - just raw data + audit metadata.
 """
 
+import argparse
+import glob
+import hashlib
+import json
 import duckdb
+import gzip
 import pandas as pd
 import os
+import resource
+import shutil
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from bronze_schemas import (
+    CHANGE_OPERATIONS, declared_columns, primary_key, read_csv_options,
+    required_columns
+)
 
 DB_PATH = "../kommineni_automotive.duckdb"
 RAW_DATA_PATH = "../data/raw"
 
+# Written by blue_green.py when it publishes a version, it holds the
+# version's path relative to itself. From then on readers open that
+# version, and DB_PATH is left behind
+POINTER_PATH = "../kommineni_automotive.current"
+
+# Every run also appends one JSON line here, outside the database,
+# so the history survives a rebuilt or pruned database file
+RUN_LEDGER_PATH = "../logs/ingest_runs.jsonl"
+
+# Optional Parquet storage for the two big fact tables: zstd files
+# partitioned by month, e.g. sales_transactions/sale_month=2025-01/.
+# dbt reads them as external sources (bronze_parquet in sources.yml).
+# A load writes into _staging/ first, see create_parquet_files.
+BRONZE_PARQUET_PATH = "../data/bronze"
+PARQUET_STAGING_PATH = os.path.join(BRONZE_PARQUET_PATH, "_staging")
+PARQUET_PARTITIONS = {
+    "sales_transactions": ("sale_date", "sale_month"),
+    "service_jobs": ("job_date", "job_month")
+}
+
+# Which files feed each bronze table, as globs under RAW_DATA_PATH.
+# A table can arrive as one big CSV, as date-partitioned drop files
+# from generate_data.py --stream, or as live batches from --emit.
+# DataFrames staged with ingest_frame.stage_frame land as Parquet
+# files in frames/<table>/.
+# A .csv pattern also matches gzip and zstd compressed CSVs, which
+# DuckDB reads as they are, without unpacking them to disk first.
+CSV_EXTENSIONS = [".csv", ".csv.gz", ".csv.zst"]
+TABLE_SOURCES = {
+    "locations": ["locations.csv", "frames/locations/*.parquet"],
+    "employees": ["employees.csv", "frames/employees/*.parquet"],
+    "vehicles": ["vehicles.csv", "frames/vehicles/*.parquet"],
+    "sales_transactions": [
+        "sales_transactions.csv",
+        "sales_transactions/**/*.csv",
+        "sales_transactions/**/*.parquet",
+        "frames/sales_transactions/*.parquet"
+    ],
+    "service_jobs": [
+        "service_jobs.csv",
+        "service_jobs/**/*.csv",
+        "service_jobs/**/*.parquet",
+        "frames/service_jobs/*.parquet"
+    ]
+}
+
+# Change files (CDC) for the tables with a key in bronze_schemas.py.
+# Each line inserts, updates or deletes one row by key instead of
+# adding a new one: a corrected sale price, cancelled financing,
+# a car that was sold. generate_data.py --emit writes its vehicle
+# status changes here.
+CDC_SOURCES = {
+    "vehicles": [
+        "cdc/vehicles/**/*.csv",
+        "cdc/vehicles/**/*.parquet"
+    ],
+    "sales_transactions": [
+        "cdc/sales_transactions/**/*.csv",
+        "cdc/sales_transactions/**/*.parquet"
+    ],
+    "service_jobs": [
+        "cdc/service_jobs/**/*.csv",
+        "cdc/service_jobs/**/*.parquet"
+    ]
+}
+
 
-def get_connection():
-    """Connect to DuckDB, creates file if missing."""
-def get_connection():
+def get_connection(db_path=DB_PATH):
     """Connect to DuckDB. Creates the file if it does not exist."""
-    return duckdb.connect(DB_PATH)
+    return duckdb.connect(db_path)
+
+
+def working_db_path(db_path=None):
+    """
+    The database file a run from the command line writes to:
+    db_path if given, else DB_PATH.
+
+    Once blue_green.py has published a version, the dashboard reads
+    that version and nothing written to DB_PATH reaches it any more.
+    So without an explicit db_path this raises SystemExit instead.
+    """
+    if db_path is not None:
+        return db_path
+    if os.path.exists(POINTER_PATH):
+        raise SystemExit(
+            f"{POINTER_PATH} exists: the dashboard reads the version "
+            f"blue_green.py published, not {DB_PATH}. Build with "
+            f"blue_green.py, or pass --db-path to write to a file anyway."
+        )
+    return DB_PATH
 
 
 def create_bronze_schema(conn):
     """
     Create the bronze schema if it does not exist.
-    
+
     A schema is like a folder inside the database.
     We have three schemas: bronze, silver, gold.
     Bronze = raw data exactly as it came from source.
@@ -32,104 +131,1632 @@ def create_bronze_schema(conn):
     print("Bronze schema ready.")
 
 
-def load_table(conn, table_name, csv_file):
+def create_manifest(conn):
+    """
+    Create the file manifest if it does not exist.
+
+    The manifest remembers every source file we have loaded:
+    its path, size, modified time and a hash of its contents.
+    Next run we compare against it and skip files that have
+    not changed, so ingest time tracks new data instead of
+    growing with the whole history.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS bronze._manifest (
+            table_name VARCHAR,
+            file_path VARCHAR,
+            file_size BIGINT,
+            file_mtime DOUBLE,
+            content_hash VARCHAR,
+            row_count BIGINT,
+            ingested_at TIMESTAMP
+        )
+    """)
+    # Added later, older databases get it on their next run
+    conn.execute("""
+        ALTER TABLE bronze._manifest
+        ADD COLUMN IF NOT EXISTS uncompressed_size BIGINT
+    """)
+
+
+def create_rejects_table(conn):
+    """
+    Create the rejects table if it does not exist.
+
+    Rows that do not match the declared schema in bronze_schemas.py
+    (a value that will not cast, an empty required column) land here
+    with the reason, instead of failing the whole load.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS bronze._rejects (
+            table_name VARCHAR,
+            source_file VARCHAR,
+            line BIGINT,
+            column_name VARCHAR,
+            error_type VARCHAR,
+            csv_line VARCHAR,
+            error_message VARCHAR,
+            ingested_at TIMESTAMP
+        )
+    """)
+
+
+def create_deletes_table(conn):
+    """
+    Create the log of deleted rows if it does not exist.
+
+    A change file deletes a row from bronze, or replaces it with a
+    new version. Either way the old row is gone, and an incremental
+    dbt model that only looks at new rows never hears about it.
+    Every row a change file removes is kept here as JSON, with the
+    run it happened in, so silver can drop the key and gold can
+    recompute the groups the old row used to count towards.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS bronze._deletes (
+            table_name VARCHAR,
+            key_value VARCHAR,
+            old_row VARCHAR,
+            _source_file VARCHAR,
+            _ingested_at VARCHAR
+        )
+    """)
+
+
+def create_quality_profile(conn):
+    """
+    Create the quality profile if it does not exist.
+
+    After every load each bronze table gets one row per column:
+    nulls, min and max, plus the table's row count, distinct keys
+    and rejects from this run. Rows are only ever added, so a bad
+    load shows up as a break from the runs before it, before dbt
+    spends time building on top of it.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS bronze._quality_profile (
+            profiled_at TIMESTAMP,
+            table_name VARCHAR,
+            column_name VARCHAR,
+            row_count BIGINT,
+            null_count BIGINT,
+            distinct_keys BIGINT,
+            min_value VARCHAR,
+            max_value VARCHAR,
+            rejected_rows BIGINT
+        )
+    """)
+
+
+def create_run_ledger(conn):
+    """
+    Create the run ledger if it does not exist.
+
+    One row per table per run: how much was read and loaded, how
+    long it took and how much memory the process had used by then.
+    ingest_report.py reads it to show whether ingest is slowing
+    down as history grows.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS bronze._ingest_runs (
+            run_id VARCHAR,
+            started_at TIMESTAMP,
+            table_name VARCHAR,
+            full_refresh BOOLEAN,
+            storage VARCHAR,
+            rows BIGINT,
+            files BIGINT,
+            skipped BIGINT,
+            changed_keys BIGINT,
+            disk_bytes BIGINT,
+            raw_bytes BIGINT,
+            seconds DOUBLE,
+            rows_per_second DOUBLE,
+            peak_memory_mb DOUBLE
+        )
+    """)
+
+
+def create_parquet_files(conn):
+    """
+    Create the list of Parquet bronze files if it does not exist.
+
+    Writing Parquet is not part of the database transaction. If a
+    load failed after its COPY, or the blue/green build it ran in
+    was thrown away, its files would stay behind and the next run
+    would load the same rows again next to them. So a load writes
+    into a staging folder, lists the files here in its transaction
+    and only moves them into place once it has committed. A file
+    that is on disk but not listed was never committed and is
+    removed (see sync_parquet_files).
+
+    Files written before this list existed are listed as they are.
+    """
+    existed = table_exists(conn, "_parquet_files")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS bronze._parquet_files (
+            table_name VARCHAR,
+            file_path VARCHAR,
+            staged_path VARCHAR,
+            _ingested_at VARCHAR
+        )
+    """)
+    if existed:
+        return
+    for table_name in PARQUET_PARTITIONS:
+        file_paths = [
+            os.path.relpath(file_path, BRONZE_PARQUET_PATH)
+            for file_path in glob.glob(parquet_location(table_name))
+        ]
+        if file_paths:
+            conn.execute("""
+                INSERT INTO bronze._parquet_files
+                SELECT ?, UNNEST(?), NULL, NULL
+            """, [table_name, file_paths])
+
+
+def create_bookkeeping_tables(conn):
+    """
+    Create the bronze schema and every table that sits next to the
+    data: the manifest, rejects, deleted rows, quality profile and
+    run ledger, and the list of Parquet bronze files. dbt's
+    incremental models read bronze._deletes, so any database with
+    bronze tables needs them, whoever loaded it.
+    """
+    create_bronze_schema(conn)
+    create_manifest(conn)
+    create_rejects_table(conn)
+    create_deletes_table(conn)
+    create_quality_profile(conn)
+    create_run_ledger(conn)
+    create_parquet_files(conn)
+
+
+def file_hash(file_path, block_size=1024 * 1024):
+    """SHA-256 of the file contents, read a block at a time."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_manifest(conn, table_name):
+    """
+    Everything the manifest knows about a table's files, by path:
+    (file_size, file_mtime, content_hash, uncompressed_size).
+    """
+    return {
+        row[0]: row[1:]
+        for row in conn.execute("""
+            SELECT
+                file_path, file_size, file_mtime, content_hash,
+                uncompressed_size
+            FROM bronze._manifest
+            WHERE table_name = ?
+        """, [table_name]).fetchall()
+    }
+
+
+def check_manifest(known_files, source_file, file_path):
+    """
+    Compare a file on disk with what the manifest remembers.
+
+    Returns (status, fingerprint) where status is one of:
+      new       - never loaded before
+      changed   - loaded before, contents are different now
+      unchanged - same contents as last time
+
+    Size and modified time are checked first. The file is only
+    hashed when one of them moved, so an untouched file costs a
+    single stat call no matter how big it is.
+
+    An unchanged file keeps the uncompressed_size measured last
+    time, so reloading it (a full refresh) does not decompress a
+    gzip file again just to count it.
+    """
+    stat = os.stat(file_path)
+    fingerprint = {
+        "file_size": stat.st_size,
+        "file_mtime": stat.st_mtime,
+        "content_hash": None,
+        "uncompressed_size": None
+    }
+
+    known = known_files.get(source_file)
+
+    if known and known[0] == stat.st_size and known[1] == stat.st_mtime:
+        fingerprint["content_hash"] = known[2]
+        fingerprint["uncompressed_size"] = known[3]
+        return "unchanged", fingerprint
+
+    fingerprint["content_hash"] = file_hash(file_path)
+
+    if known is None:
+        return "new", fingerprint
+    if known[2] == fingerprint["content_hash"]:
+        # Touched but not edited, e.g. copied over with the same data
+        fingerprint["uncompressed_size"] = known[3]
+        return "unchanged", fingerprint
+    return "changed", fingerprint
+
+
+def zstd_content_size(file_path):
+    """
+    The sum of the content sizes in a zstd file's frame headers.
+    None when a frame was written without one, or the file is not
+    zstd as far as the headers go.
+
+    A file can hold several frames one after the other (zstd a b >
+    both.zst, or a writer that flushes as it goes), each with its
+    own header, and skippable frames that carry no content at all.
+    To find where a frame ends its blocks are walked: every block
+    starts with a 3-byte header that has its size, so this reads a
+    few bytes per block and decompresses nothing.
     """
-    Load a single CSV file into a bronze table.
-    
-    We use CREATE OR REPLACE so every time this runs
-    it refreshes the data. This simulates a full reload
+    total = 0
+    with open(file_path, "rb") as f:
+        while True:
+            magic = f.read(4)
+            if not magic:
+                return total
+            magic = int.from_bytes(magic, "little")
+
+            # Skippable frame: 0x184D2A50 to 0x184D2A5F, then its size
+            if magic & 0xFFFFFFF0 == 0x184D2A50:
+                f.seek(int.from_bytes(f.read(4), "little"), os.SEEK_CUR)
+                continue
+            if magic != 0xFD2FB528:
+                return None
+
+            descriptor = f.read(1)[0]
+            size_flag = descriptor >> 6
+            single_segment = descriptor >> 5 & 1
+            has_checksum = descriptor >> 2 & 1
+            field_size = [single_segment, 2, 4, 8][size_flag]
+            if field_size == 0:
+                return None
+            # The window descriptor and dictionary ID come first
+            f.seek(
+                (not single_segment) + [0, 1, 2, 4][descriptor & 3],
+                os.SEEK_CUR
+            )
+            size = int.from_bytes(f.read(field_size), "little")
+            total += size + 256 if field_size == 2 else size
+
+            # Blocks: last-block bit, 2 bits of type, 21 bits of size.
+            # Raw and compressed blocks are that many bytes long, an
+            # RLE block is the one byte it repeats
+            while True:
+                header = f.read(3)
+                if len(header) < 3:
+                    return None
+                block = int.from_bytes(header, "little")
+                block_type = block >> 1 & 3
+                if block_type == 3:
+                    return None
+                f.seek(1 if block_type == 1 else block >> 3, os.SEEK_CUR)
+                if block & 1:
+                    break
+            if has_checksum:
+                f.seek(4, os.SEEK_CUR)
+
+
+def uncompressed_size(file_path, block_size=1024 * 1024):
+    """
+    How many bytes a file holds once decompressed. None when it
+    cannot be told without a decoder we do not have.
+
+    gzip is decompressed and counted: its trailer only keeps the
+    size modulo 4 GiB, and only for the last member. zstd keeps
+    the size in each frame header when the writer knew it up front,
+    as the zstd command line does (see zstd_content_size); a
+    streamed file does not have it, and Python has no zstd decoder
+    to count with. Plain CSVs are their own size. Parquet is
+    handled in bulk by measure_files.
+    """
+    if file_path.endswith(".gz"):
+        size = 0
+        with gzip.open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                size += len(block)
+        return size
+
+    if file_path.endswith(".zst"):
+        return zstd_content_size(file_path)
+
+    return os.path.getsize(file_path)
+
+
+def measure_files(conn, table_name, ingested_at):
+    """
+    Fill in uncompressed_size in the manifest for the files of a
+    table loaded in this run that do not have it yet; a file
+    reloaded unchanged brought its size along (see check_manifest).
+    Parquet sizes come from the file footers, all files in one
+    parquet_metadata call.
+
+    Counting gzip costs about half a read of the file again, so
+    load_table_timed calls this after it stops the clock and the
+    throughput figures are the load alone.
+    """
+    source_files = [
+        row[0] for row in conn.execute("""
+            SELECT file_path
+            FROM bronze._manifest
+            WHERE table_name = ? AND ingested_at = ?
+            AND uncompressed_size IS NULL
+        """, [table_name, ingested_at]).fetchall()
+    ]
+    parquet_files = [
+        source_file for source_file in source_files
+        if source_file.endswith(".parquet")
+    ]
+    sizes = {
+        source_file: uncompressed_size(
+            os.path.join(RAW_DATA_PATH, source_file)
+        )
+        for source_file in source_files
+        if not source_file.endswith(".parquet")
+    }
+
+    if parquet_files:
+        sizes.update(conn.execute(f"""
+            SELECT
+                SUBSTR(file_name, {len(RAW_DATA_PATH) + 2}),
+                SUM(total_uncompressed_size)
+            FROM parquet_metadata(?)
+            GROUP BY file_name
+        """, [[
+            os.path.join(RAW_DATA_PATH, source_file)
+            for source_file in parquet_files
+        ]]).fetchall())
+
+    if not sizes:
+        return
+    file_sizes = pd.DataFrame({
+        "file_path": list(sizes),
+        "uncompressed_size": pd.array(list(sizes.values()), dtype="Int64")
+    })
+    conn.register("file_sizes", file_sizes)
+    conn.execute("""
+        UPDATE bronze._manifest
+        SET uncompressed_size = file_sizes.uncompressed_size
+        FROM file_sizes
+        WHERE bronze._manifest.table_name = ?
+        AND bronze._manifest.file_path = file_sizes.file_path
+    """, [table_name])
+    conn.unregister("file_sizes")
+
+
+def record_files(conn, table_name, fingerprints, row_counts, ingested_at):
+    """
+    Remember a batch of loaded files in the manifest, replacing any
+    old entries. Written as one insert so a scan of thousands of
+    small files does not turn into thousands of statements.
+    uncompressed_size is only known for files reloaded unchanged,
+    the rest are left for measure_files.
+    """
+    manifest_rows = pd.DataFrame([
+        {
+            "table_name": table_name,
+            "file_path": source_file,
+            "file_size": fingerprint["file_size"],
+            "file_mtime": fingerprint["file_mtime"],
+            "content_hash": fingerprint["content_hash"],
+            "row_count": row_counts.get(source_file, 0),
+            "uncompressed_size": fingerprint["uncompressed_size"],
+            "ingested_at": ingested_at
+        }
+        for source_file, fingerprint in fingerprints.items()
+    ])
+    manifest_rows["uncompressed_size"] = (
+        manifest_rows["uncompressed_size"].astype("Int64")
+    )
+
+    conn.execute("""
+        DELETE FROM bronze._manifest
+        WHERE table_name = ? AND list_contains(?, file_path)
+    """, [table_name, list(fingerprints)])
+    conn.register("manifest_rows", manifest_rows)
+    conn.execute("""
+        INSERT INTO bronze._manifest BY NAME
+        SELECT
+            table_name, file_path, file_size, file_mtime, content_hash,
+            row_count, uncompressed_size,
+            CAST(ingested_at AS TIMESTAMP) AS ingested_at
+        FROM manifest_rows
+    """)
+    conn.unregister("manifest_rows")
+
+
+def table_exists(conn, table_name):
+    return conn.execute("""
+        SELECT COUNT(*) FROM information_schema.tables
+        WHERE table_schema = 'bronze' AND table_name = ?
+    """, [table_name]).fetchone()[0] > 0
+
+
+def find_source_files(patterns):
+    """
+    Expand a table's glob patterns into the files on disk, as paths
+    relative to RAW_DATA_PATH. That relative path is what we store
+    in _source_file and in the manifest.
+    """
+    files = set()
+    for pattern in patterns:
+        if pattern.endswith(".csv"):
+            variants = [
+                pattern[:-len(".csv")] + extension
+                for extension in CSV_EXTENSIONS
+            ]
+        else:
+            variants = [pattern]
+        for variant in variants:
+            for file_path in glob.glob(
+                os.path.join(RAW_DATA_PATH, variant), recursive=True
+            ):
+                files.add(os.path.relpath(file_path, RAW_DATA_PATH))
+    return sorted(files)
+
+
+def is_csv(source_file):
+    return any(
+        source_file.endswith(extension) for extension in CSV_EXTENSIONS
+    )
+
+
+def load_table(conn, table_name, patterns, ingested_at, full_refresh=False,
+               storage="table"):
+    """
+    Load every file matching a table's glob patterns into its
+    bronze table in one scan per file format.
+
+    Columns and types come from bronze_schemas.py rather than
+    being guessed from the file, and rows that do not fit are
+    set aside in bronze._rejects. Every row records the file it
+    came from in _source_file.
+
+    The manifest decides which files are part of the scan:
+      new file       - append its rows
+      changed file   - drop the rows it loaded last time, then
+                       append the new version
+      removed file   - drop the rows it loaded last time
+      unchanged file - nothing to do, left out of the scan
+
+    With full_refresh we go back to the old behaviour and
+    rebuild the table from scratch with CREATE OR REPLACE,
     which is how many ingestion tools like Fivetran work.
+
+    With storage="parquet" the fact tables in PARQUET_PARTITIONS
+    are written as new Parquet files instead (see write_parquet).
+    Their old rows stay in the files, bronze._deletes marks them
+    as replaced (see parquet_rows).
+
+    Returns (rows added, files loaded, unchanged files skipped).
+    """
+    parquet = storage == "parquet" and table_name in PARQUET_PARTITIONS
+    if parquet:
+        # Finish or undo whatever an earlier load left on disk
+        sync_parquet_files(conn, table_name)
+
+    source_files = find_source_files(patterns)
+    to_load, changed, removed, skipped = plan_files(
+        conn, table_name, source_files, full_refresh
+    )
+
+    if not source_files and not removed:
+        print(f"  WARNING: no files for {table_name} found, skipping.")
+        return 0, 0, 0
+    if not to_load and not removed:
+        return 0, 0, skipped
+
+    incoming = f"incoming_{table_name}"
+
+    # Data, rejects and manifest change together or not at all
+    # (Parquet data through its list in bronze._parquet_files)
+    conn.begin()
+    scanned_csv = scan_files(conn, table_name, list(to_load), incoming)
+
+    # Old rejects go the same way as the rows they came with
+    if full_refresh:
+        conn.execute(
+            "DELETE FROM bronze._rejects WHERE table_name = ?", [table_name]
+        )
+        conn.execute(
+            "DELETE FROM bronze._manifest WHERE table_name = ?", [table_name]
+        )
+    elif changed or removed:
+        conn.execute("""
+            DELETE FROM bronze._rejects
+            WHERE table_name = ? AND list_contains(?, source_file)
+        """, [table_name, changed + removed])
+        conn.execute("""
+            DELETE FROM bronze._manifest
+            WHERE table_name = ? AND list_contains(?, file_path)
+        """, [table_name, removed])
+
+    rejected = reject_rows(
+        conn, table_name, incoming, ingested_at, scanned_csv
+    )
+    if rejected:
+        print(
+            f"  WARNING: {rejected} rows of {table_name} did not match "
+            f"the schema, see bronze._rejects."
+        )
+
+    select = bronze_rows(table_name, incoming, ingested_at)
+    current = current_rows(conn, table_name, parquet)
+    replaced = changed + removed
+
+    if current and full_refresh:
+        # e.g. rows a removed change file had inserted
+        log_dropped_keys(conn, table_name, select, ingested_at, current)
+    elif current and replaced:
+        # The new version of a file may have dropped or moved
+        # rows, and a removed file takes all of its rows with it.
+        # Incremental dbt models only see rows that arrive, so
+        # log the old ones the way apply_changes does
+        key = primary_key(table_name)
+        conn.execute(f"""
+            INSERT INTO bronze._deletes
+            SELECT
+                '{table_name}',
+                old.{key},
+                CAST(to_json(old) AS VARCHAR),
+                old._source_file,
+                '{ingested_at}'
+            FROM {current} old
+            WHERE list_contains(?, old._source_file)
+        """, [replaced])
+
+    if parquet:
+        if full_refresh:
+            # The old files go once this load has committed
+            conn.execute(
+                "DELETE FROM bronze._parquet_files WHERE table_name = ?",
+                [table_name]
+            )
+        count = write_parquet(conn, table_name, select, ingested_at)
+    elif full_refresh or not current:
+        count = conn.execute(
+            f"CREATE OR REPLACE TABLE bronze.{table_name} AS {select}"
+        ).fetchone()[0]
+    else:
+        if replaced:
+            conn.execute(
+                f"DELETE FROM bronze.{table_name} "
+                f"WHERE list_contains(?, _source_file)",
+                [replaced]
+            )
+        count = conn.execute(
+            f"INSERT INTO bronze.{table_name} BY NAME {select}"
+        ).fetchone()[0]
+
+    file_counts = dict(conn.execute(f"""
+        SELECT _source_file, COUNT(*)
+        FROM ({select})
+        GROUP BY _source_file
+    """).fetchall())
+    if to_load:
+        record_files(conn, table_name, to_load, file_counts, ingested_at)
+    conn.execute(f"DROP TABLE {incoming}")
+    conn.commit()
+    if parquet:
+        sync_parquet_files(conn, table_name)
+
+    return count, len(to_load), skipped
+
+
+def bronze_rows(table_name, incoming, ingested_at):
+    """
+    SELECT for the rows of incoming that go into bronze: every
+    required column filled, plus the _ingested_at audit column.
+    """
+    required = required_columns(table_name)
+    return f"""
+        SELECT
+            * EXCLUDE (_source_file),
+            '{ingested_at}' AS _ingested_at,
+            _source_file
+        FROM {incoming}
+        WHERE {" AND ".join(f"{column} IS NOT NULL" for column in required)}
+    """
+
+
+def current_rows(conn, table_name, parquet=False):
+    """
+    The relation holding a bronze table's rows as they stand, or
+    None when nothing has been loaded yet.
+    """
+    if parquet:
+        if not glob.glob(parquet_location(table_name)):
+            return None
+        return f"({parquet_rows(table_name)})"
+    if not table_exists(conn, table_name):
+        return None
+    return f"bronze.{table_name}"
+
+
+def log_dropped_keys(conn, table_name, select, ingested_at, current=None):
+    """
+    Before bronze.<table_name> (or the current relation) is replaced
+    by the rows of select, log the keys the new rows no longer have
+    to bronze._deletes. Incremental dbt models only see rows that
+    arrive, this is how they hear about the ones that went.
+    """
+    current = current or f"bronze.{table_name}"
+    key = primary_key(table_name)
+    conn.execute(f"""
+        INSERT INTO bronze._deletes
+        SELECT
+            '{table_name}',
+            old.{key},
+            CAST(to_json(old) AS VARCHAR),
+            old._source_file,
+            '{ingested_at}'
+        FROM {current} old
+        WHERE old.{key} NOT IN (SELECT {key} FROM ({select}))
+    """)
+
+
+def plan_files(conn, table_name, source_files, full_refresh=False):
+    """
+    Prune a table's files down to what is new or changed.
+
+    Returns (fingerprints of the files to load, the ones among
+    them that changed since last time, files in the manifest that
+    are no longer on disk, how many were skipped).
+    """
+    known_files = read_manifest(conn, table_name)
+    to_load = {}
+    changed = []
+    for source_file in source_files:
+        status, fingerprint = check_manifest(
+            known_files, source_file,
+            os.path.join(RAW_DATA_PATH, source_file)
+        )
+        if status == "unchanged" and not full_refresh:
+            if known_files[source_file][1] == fingerprint["file_mtime"]:
+                continue
+            # Touched only, keep the new mtime so next run skips the
+            # hash as well
+            conn.execute("""
+                UPDATE bronze._manifest SET file_mtime = ?
+                WHERE table_name = ? AND file_path = ?
+            """, [fingerprint["file_mtime"], table_name, source_file])
+            continue
+        to_load[source_file] = fingerprint
+        if status == "changed":
+            changed.append(source_file)
+
+    # A full refresh forgets the manifest anyway. Change files share
+    # the manifest but their rows are keyed, not tied to the file,
+    # so dropping their rows would not undo them: load_table_timed
+    # rebuilds the table instead (see removed_changes).
+    removed = [] if full_refresh else sorted(
+        source_file for source_file in set(known_files) - set(source_files)
+        if not source_file.startswith(os.path.join("cdc", ""))
+    )
+
+    return to_load, changed, removed, len(source_files) - len(to_load)
+
+
+def apply_changes(conn, table_name, patterns, ingested_at,
+                  full_refresh=False, storage="table"):
+    """
+    Apply change files to a bronze table by primary key.
+
+    A change file does not add rows the way a drop file does.
+    Every line inserts, updates or deletes the row with its key,
+    so a corrected sale is one line instead of a reloaded file.
+
+    All pending files go in as one batch. Only the last change
+    to each key counts (files in name order, lines in file
+    order), and the batch is applied as a single DELETE of every
+    key it touches plus a single INSERT of the rows that remain.
+    The work follows the size of the change, not of the table.
+
+    A change file that was edited is simply applied again. On a
+    full refresh load_table has emptied the manifest, so every
+    change file is replayed on top of the rebuilt table.
+
+    Returns (keys changed, files applied, unchanged files skipped).
     """
-    file_path = os.path.join(RAW_DATA_PATH, csv_file)
-    
-    if not os.path.exists(file_path):
-        print(f"  WARNING: {csv_file} not found, skipping.")
-        return 0
-    
-    # This is the magic of DuckDB - it can read CSV files
-    # directly with a single SQL statement
-    # read_csv_auto means DuckDB figures out the column types automatically
+    source_files = find_source_files(patterns)
+    if not source_files:
+        return 0, 0, 0
+
+    if storage == "parquet" and table_name in PARQUET_PARTITIONS:
+        print(
+            f"  WARNING: Parquet bronze is append-only, change files "
+            f"for {table_name} are not applied."
+        )
+        return 0, 0, len(source_files)
+
+    to_load, _, _, skipped = plan_files(
+        conn, table_name, source_files, full_refresh
+    )
+    if not to_load:
+        return 0, 0, skipped
+
+    key = primary_key(table_name)
+    incoming = f"changes_{table_name}"
+
+    conn.begin()
+    scanned_csv = scan_files(
+        conn, table_name, list(to_load), incoming, changes=True
+    )
+
+    conn.execute("""
+        DELETE FROM bronze._rejects
+        WHERE table_name = ? AND list_contains(?, source_file)
+    """, [table_name, list(to_load)])
+    rejected = reject_rows(
+        conn, table_name, incoming, ingested_at, scanned_csv, changes=True
+    )
+    if rejected:
+        print(
+            f"  WARNING: {rejected} changes to {table_name} did not match "
+            f"the schema, see bronze._rejects."
+        )
+
+    conn.execute(f"""
+        CREATE OR REPLACE TEMP TABLE {incoming}_latest AS
+        SELECT *
+        FROM {incoming}
+        WHERE {valid_change(table_name)}
+        QUALIFY ROW_NUMBER() OVER (
+            PARTITION BY {key}
+            ORDER BY _source_file DESC, rowid DESC
+        ) = 1
+    """)
+
+    if not table_exists(conn, table_name):
+        conn.execute(f"""
+            CREATE TABLE bronze.{table_name} AS
+            SELECT
+                * EXCLUDE (_op, _source_file),
+                CAST(NULL AS VARCHAR) AS _ingested_at,
+                _source_file
+            FROM {incoming}_latest
+            LIMIT 0
+        """)
+
+    # Incremental dbt models only see rows that arrive, so they
+    # learn here what was deleted or replaced, and what it was
+    conn.execute(f"""
+        INSERT INTO bronze._deletes
+        SELECT
+            '{table_name}',
+            old.{key},
+            CAST(to_json(old) AS VARCHAR),
+            latest._source_file,
+            '{ingested_at}'
+        FROM bronze.{table_name} old
+        JOIN {incoming}_latest latest ON old.{key} = latest.{key}
+    """)
+    conn.execute(f"""
+        DELETE FROM bronze.{table_name}
+        WHERE {key} IN (SELECT {key} FROM {incoming}_latest)
+    """)
     conn.execute(f"""
-        CREATE OR REPLACE TABLE bronze.{table_name} AS
-        SELECT 
-            *,
-            '{datetime.now().strftime("%Y-%m-%d %H:%M:%S")}' AS _ingested_at,
-            '{csv_file}' AS _source_file
-        FROM read_csv_auto('{file_path}')
-    """)
-    
-    # Count how many rows were loaded
+        INSERT INTO bronze.{table_name} BY NAME
+        SELECT
+            * EXCLUDE (_op, _source_file),
+            '{ingested_at}' AS _ingested_at,
+            _source_file
+        FROM {incoming}_latest
+        WHERE _op <> 'D'
+    """)
     count = conn.execute(
-        f"SELECT COUNT(*) FROM bronze.{table_name}"
+        f"SELECT COUNT(*) FROM {incoming}_latest"
     ).fetchone()[0]
-    
+
+    file_counts = dict(conn.execute(f"""
+        SELECT _source_file, COUNT(*)
+        FROM {incoming}
+        WHERE {valid_change(table_name)}
+        GROUP BY _source_file
+    """).fetchall())
+    record_files(conn, table_name, to_load, file_counts, ingested_at)
+    conn.execute(f"DROP TABLE {incoming}")
+    conn.execute(f"DROP TABLE {incoming}_latest")
+    conn.commit()
+
+    return count, len(to_load), skipped
+
+
+def removed_changes(conn, table_name):
+    """
+    Change files in a table's manifest that are no longer on disk,
+    e.g. after generate_data.py started a new history and cleared
+    cdc/. What they did to the table cannot be taken back key by
+    key, the rows they replaced are gone.
+    """
+    on_disk = set(find_source_files(CDC_SOURCES[table_name]))
+    return sorted(
+        source_file for source_file in read_manifest(conn, table_name)
+        if source_file.startswith(os.path.join("cdc", ""))
+        and source_file not in on_disk
+    )
+
+
+def valid_change(table_name):
+    """
+    WHERE clause for usable lines of a change file: a key, a known
+    operation, and for inserts and updates every required column.
+    """
+    key = primary_key(table_name)
+    required = [
+        column for column in required_columns(table_name) if column != key
+    ]
+    return f"""
+        {key} IS NOT NULL
+        AND list_contains({CHANGE_OPERATIONS}, _op)
+        AND (_op = 'D' OR ({" AND ".join(
+            f"{column} IS NOT NULL" for column in required
+        )}))
+    """
+
+
+def parquet_location(table_name):
+    """Glob for every file of a Parquet bronze table."""
+    return os.path.join(BRONZE_PARQUET_PATH, table_name, "*", "*.parquet")
+
+
+def parquet_rows(table_name):
+    """
+    SELECT for the current rows of a Parquet bronze table. When a
+    source file changes, its new version is added next to the old
+    rows and the old ones are logged in bronze._deletes, with the
+    run that replaced them. A row is current unless a later run
+    logged its key from its file. dbt's bronze_source macro reads
+    the files the same way.
+    """
+    key = primary_key(table_name)
+    return f"""
+        SELECT *
+        FROM read_parquet('{parquet_location(table_name)}',
+                          hive_partitioning = false) bronze_row
+        WHERE NOT EXISTS (
+            SELECT 1
+            FROM bronze._deletes deleted
+            WHERE deleted.table_name = '{table_name}'
+            AND deleted.key_value = bronze_row.{key}
+            AND deleted._source_file = bronze_row._source_file
+            AND deleted._ingested_at > bronze_row._ingested_at
+        )
+    """
+
+
+def write_parquet(conn, table_name, select, ingested_at):
+    """
+    Write a batch of rows as zstd Parquet, one folder per month.
+
+    Each run only adds new files to the months it touches, so old
+    partitions are never rewritten. A query that filters on the
+    month column only opens those folders, and the min/max stats
+    in each file let a sale_date filter skip the rest.
+
+    The files go to a staging folder of their own and are listed
+    in bronze._parquet_files, in the caller's transaction. Once it
+    has committed, sync_parquet_files moves them into place.
+    Returns how many rows were written.
+    """
+    date_column, month_column = PARQUET_PARTITIONS[table_name]
+    staging_path = os.path.join(
+        PARQUET_STAGING_PATH, f"{table_name}-{uuid.uuid4().hex}"
+    )
+    os.makedirs(PARQUET_STAGING_PATH, exist_ok=True)
+
+    count = conn.execute(f"""
+        COPY (
+            SELECT *, STRFTIME({date_column}, '%Y-%m') AS {month_column}
+            FROM ({select})
+        ) TO '{staging_path}' (
+            FORMAT parquet,
+            COMPRESSION zstd,
+            PARTITION_BY ({month_column}),
+            FILENAME_PATTERN 'part-{{uuid}}'
+        )
+    """).fetchone()[0]
+
+    # sale_month=2025-01/part-<uuid>.parquet under the table's folder
+    staged_files = [
+        os.path.relpath(staged_file, staging_path)
+        for staged_file in glob.glob(
+            os.path.join(staging_path, "*", "*.parquet")
+        )
+    ]
+    if staged_files:
+        conn.execute("""
+            INSERT INTO bronze._parquet_files
+            SELECT
+                ?,
+                ? || '/' || staged_file,
+                ? || '/' || staged_file,
+                ?
+            FROM (SELECT UNNEST(?) AS staged_file)
+        """, [
+            table_name, table_name,
+            os.path.relpath(staging_path, BRONZE_PARQUET_PATH),
+            ingested_at, staged_files
+        ])
     return count
 
 
-def verify_bronze(conn):
+def sync_parquet_files(conn, table_name):
     """
-    After loading, verify all tables exist and show row counts.
-    This is data quality checking at the ingestion layer.
+    Make a Parquet bronze table's folder match its committed list
+    in bronze._parquet_files: move listed files that are still in
+    staging into place, and delete the files nobody listed. Those
+    come from a load that rolled back, a blue/green build that was
+    thrown away, or a full refresh that replaced them.
+    Leftover staging folders of the table go too.
+    """
+    listed = conn.execute("""
+        SELECT file_path, staged_path
+        FROM bronze._parquet_files
+        WHERE table_name = ?
+    """, [table_name]).fetchall()
+
+    for file_path, staged_path in listed:
+        target = os.path.join(BRONZE_PARQUET_PATH, file_path)
+        if staged_path is None or os.path.exists(target):
+            continue
+        staged = os.path.join(BRONZE_PARQUET_PATH, staged_path)
+        if os.path.exists(staged):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(staged, target)
+
+    keep = {file_path for file_path, _ in listed}
+    for file_path in glob.glob(parquet_location(table_name)):
+        if os.path.relpath(file_path, BRONZE_PARQUET_PATH) not in keep:
+            os.remove(file_path)
+
+    for staging_path in glob.glob(
+        os.path.join(PARQUET_STAGING_PATH, f"{table_name}-*")
+    ):
+        shutil.rmtree(staging_path, ignore_errors=True)
+
+
+def scan_files(conn, table_name, source_files, incoming, changes=False):
+    """
+    Read a batch of files into a temp table with the declared
+    schema. CSVs and Parquet files each get a single multi-file
+    scan, which DuckDB spreads across threads.
+
+    CSVs are read with no type sniffing. Lines that do not cast
+    are kept aside by DuckDB in the rejects tables instead of
+    stopping the scan. Parquet files carry their own types and go
+    through cast_rows, which keeps aside the rows that do not cast
+    the same way.
+
+    Hive-style folder names (sale_date=2025-01-31) are not turned
+    into columns, the date is already inside each file.
+
+    With changes=True the files are change files and carry an
+    extra _op column in front.
+    """
+    csv_files = [
+        os.path.join(RAW_DATA_PATH, source_file)
+        for source_file in source_files if is_csv(source_file)
+    ]
+    parquet_files = [
+        os.path.join(RAW_DATA_PATH, source_file)
+        for source_file in source_files if source_file.endswith(".parquet")
+    ]
+
+    # filename comes back as the path we passed in, strip RAW_DATA_PATH
+    source_file = f"SUBSTR(filename, {len(RAW_DATA_PATH) + 2}) AS _source_file"
+
+    # Start from an empty table in the declared shape, then add
+    # each format's rows to it
+    create_incoming(conn, table_name, incoming, changes)
+
+    if csv_files:
+        conn.execute(f"""
+            INSERT INTO {incoming} BY NAME
+            SELECT * EXCLUDE (filename), {source_file}
+            FROM read_csv(
+                ?,
+                {read_csv_options(table_name, changes)},
+                filename = true,
+                hive_partitioning = false,
+                store_rejects = true,
+                rejects_table = '{incoming}_errors',
+                rejects_scan = '{incoming}_scans'
+            )
+        """, [csv_files])
+
+    if parquet_files:
+        cast_rows(conn, table_name, f"""(
+            SELECT * EXCLUDE (filename), {source_file}
+            FROM read_parquet(
+                ?,
+                filename = true,
+                hive_partitioning = false,
+                union_by_name = true
+            )
+        )""", incoming, changes, [parquet_files])
+
+    return bool(csv_files)
+
+
+def create_incoming(conn, table_name, incoming, changes=False):
+    """
+    Create the empty temp table a batch is collected in, in the
+    declared shape, and {incoming}_cast_errors for the rows
+    cast_rows sets aside.
+    """
+    conn.execute(f"""
+        CREATE OR REPLACE TEMP TABLE {incoming} AS
+        SELECT
+            {", ".join(
+                f"CAST(NULL AS {duck_type}) AS {column}"
+                for column, duck_type in declared_columns(table_name, changes)
+            )},
+            CAST(NULL AS VARCHAR) AS _source_file
+        LIMIT 0
+    """)
+    conn.execute(f"""
+        CREATE OR REPLACE TEMP TABLE {incoming}_cast_errors (
+            source_file VARCHAR,
+            column_name VARCHAR,
+            error_message VARCHAR,
+            raw_row VARCHAR
+        )
+    """)
+
+
+def cast_rows(conn, table_name, source, incoming, changes=False,
+              parameters=None):
+    """
+    Add the rows of source, a relation that is not in the declared
+    types yet (a Parquet scan) with a _source_file column, to
+    incoming.
+
+    TRY_CAST alone turns a value that does not fit, like a
+    sale_price of "abc", into a NULL nobody hears about. A row with
+    such a value goes to {incoming}_cast_errors instead, once per
+    bad column, and reject_rows moves it into bronze._rejects the
+    same as a CSV line that did not cast. Empty values stay NULL.
+    """
+    columns = declared_columns(table_name, changes)
+    failures = ", ".join(
+        f"""CASE
+            WHEN raw.{column} IS NOT NULL
+            AND TRY_CAST(raw.{column} AS {duck_type}) IS NULL
+            THEN {{'column_name': '{column}', 'duck_type': '{duck_type}'}}
+        END"""
+        for column, duck_type in columns
+    )
+
+    conn.execute(f"""
+        CREATE OR REPLACE TEMP TABLE {incoming}_cast AS
+        SELECT
+            {", ".join(
+                f"TRY_CAST(raw.{column} AS {duck_type}) AS {column}"
+                for column, duck_type in columns
+            )},
+            raw._source_file,
+            list_filter([{failures}], failure -> failure IS NOT NULL)
+                AS _failures,
+            -- Only worked out for the rows that are set aside
+            CASE
+                WHEN len(_failures) > 0 THEN CAST(to_json(raw) AS VARCHAR)
+            END AS _raw_row
+        FROM {source} raw
+    """, parameters)
+
+    conn.execute(f"""
+        INSERT INTO {incoming}_cast_errors
+        SELECT
+            _source_file,
+            failure.column_name,
+            'Could not convert value to ' || failure.duck_type,
+            _raw_row
+        FROM (
+            SELECT _source_file, _raw_row, UNNEST(_failures) AS failure
+            FROM {incoming}_cast
+        )
+    """)
+    conn.execute(f"""
+        INSERT INTO {incoming} BY NAME
+        SELECT * EXCLUDE (_failures, _raw_row)
+        FROM {incoming}_cast
+        WHERE len(_failures) = 0
+    """)
+    conn.execute(f"DROP TABLE {incoming}_cast")
+
+
+def reject_rows(conn, table_name, incoming, ingested_at, scanned_csv=True,
+                changes=False):
+    """
+    Move everything that broke the schema into bronze._rejects:
+    lines DuckDB could not cast, Parquet rows cast_rows set
+    aside, and rows with an empty required column
+    (kept as JSON since there is no raw line to show).
+    Change files also need a known _op, and a delete only
+    needs its key.
+    Returns how many rejects were recorded.
+    """
+    checks = [
+        (column, f"{column} IS NULL", f"{column} is empty")
+        for column in required_columns(table_name)
+    ]
+    if changes:
+        key = primary_key(table_name)
+        checks = [
+            (column, condition if column == key
+             else f"{condition} AND _op <> 'D'", message)
+            for column, condition, message in checks
+        ]
+        checks.append((
+            "_op",
+            f"_op IS NULL OR NOT list_contains({CHANGE_OPERATIONS}, _op)",
+            f"_op is not one of {', '.join(CHANGE_OPERATIONS)}"
+        ))
+
+    count = 0
+    if scanned_csv:
+        count += conn.execute(f"""
+            INSERT INTO bronze._rejects
+            SELECT
+                '{table_name}',
+                SUBSTR(scans.file_path, {len(RAW_DATA_PATH) + 2}),
+                errors.line,
+                errors.column_name,
+                CAST(errors.error_type AS VARCHAR),
+                errors.csv_line,
+                errors.error_message,
+                '{ingested_at}'
+            FROM {incoming}_errors errors
+            JOIN {incoming}_scans scans
+                ON errors.scan_id = scans.scan_id
+                AND errors.file_id = scans.file_id
+        """).fetchone()[0]
+        conn.execute(f"DROP TABLE {incoming}_errors")
+        conn.execute(f"DROP TABLE {incoming}_scans")
+
+    count += conn.execute(f"""
+        INSERT INTO bronze._rejects
+        SELECT
+            '{table_name}',
+            source_file,
+            NULL,
+            column_name,
+            'CAST',
+            raw_row,
+            error_message,
+            '{ingested_at}'
+        FROM {incoming}_cast_errors
+    """).fetchone()[0]
+    conn.execute(f"DROP TABLE {incoming}_cast_errors")
+
+    for column, condition, message in checks:
+        count += conn.execute(f"""
+            INSERT INTO bronze._rejects
+            SELECT
+                '{table_name}',
+                _source_file,
+                NULL,
+                '{column}',
+                'NOT NULL',
+                CAST(to_json({incoming}) AS VARCHAR),
+                '{message}',
+                '{ingested_at}'
+            FROM {incoming}
+            WHERE {condition}
+        """).fetchone()[0]
+
+    return count
+
+
+def load_table_timed(conn, table_name, patterns, ingested_at,
+                     full_refresh=False, storage="table"):
+    """
+    Run load_table, then apply_changes for tables that take change
+    files, on a cursor of its own and time it.
+
+    A cursor is DuckDB's way of sharing one database between
+    threads: same file, separate transaction per thread.
+    Returns a dict of what was loaded: rows, files, skipped,
+    changed_keys, change_files, disk_bytes (as stored, maybe
+    compressed), raw_bytes (uncompressed, None when any file's size
+    is unknown, see uncompressed_size) and seconds.
+
+    All of a table's files go through one scan, so seconds and the
+    throughput worked out from it are for the table's batch, not
+    for each file. The manifest has each file's sizes.
+    """
+    cursor = conn.cursor()
+    started = time.perf_counter()
+    changes = (0, 0)
+    try:
+        # Without a removed change file's rows the table has to be
+        # rebuilt from its files, and the remaining changes replayed
+        if table_name in CDC_SOURCES and not full_refresh:
+            removed = removed_changes(cursor, table_name)
+            if removed:
+                print(
+                    f"  {len(removed)} change files of {table_name} were "
+                    f"removed, rebuilding it from the files left."
+                )
+                full_refresh = True
+        rows, files, skipped = load_table(
+            cursor, table_name, patterns, ingested_at, full_refresh, storage
+        )
+        if table_name in CDC_SOURCES:
+            changes = apply_changes(
+                cursor, table_name, CDC_SOURCES[table_name], ingested_at,
+                full_refresh, storage
+            )[:2]
+        seconds = time.perf_counter() - started
+
+        # Every file loaded in this run is in the manifest under
+        # this run's timestamp
+        measure_files(cursor, table_name, ingested_at)
+        disk_bytes, raw_bytes = cursor.execute("""
+            SELECT
+                COALESCE(SUM(file_size), 0),
+                CASE
+                    WHEN COUNT(*) = COUNT(uncompressed_size)
+                    THEN COALESCE(SUM(uncompressed_size), 0)
+                END
+            FROM bronze._manifest
+            WHERE table_name = ? AND ingested_at = ?
+        """, [table_name, ingested_at]).fetchone()
+    finally:
+        cursor.close()
+    return {
+        "rows": rows,
+        "files": files,
+        "skipped": skipped,
+        "changed_keys": changes[0],
+        "change_files": changes[1],
+        "disk_bytes": int(disk_bytes),
+        "raw_bytes": None if raw_bytes is None else int(raw_bytes),
+        "seconds": seconds,
+        "peak_memory_mb": peak_memory_mb()
+    }
+
+
+def peak_memory_mb():
+    """
+    The most memory this process has held so far, in MB. Tables
+    load side by side in one process, so for a single table this
+    is the peak as of when it finished, not its own share.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def record_run(conn, run_id, ingested_at, results, full_refresh, storage,
+               seconds):
+    """
+    Write a run to bronze._ingest_runs, one row per table, and
+    append it to RUN_LEDGER_PATH as a single JSON line.
     """
-    print("\nBronze Layer Verification:")
-    print("-" * 40)
-    
     tables = [
-        "locations",
-        "employees", 
-        "vehicles",
-        "sales_transactions",
-        "service_jobs"
+        {
+            "table_name": table_name,
+            **stats,
+            "seconds": round(stats["seconds"], 3),
+            "rows_per_second": round(
+                (stats["rows"] + stats["changed_keys"])
+                / max(stats["seconds"], 1e-9), 1
+            ),
+            "peak_memory_mb": round(stats["peak_memory_mb"], 1)
+        }
+        for table_name, stats in results.items()
     ]
-    
-    for table in tables:
+
+    run_rows = pd.DataFrame([
+        {
+            "run_id": run_id,
+            "started_at": ingested_at,
+            "full_refresh": full_refresh,
+            "storage": storage,
+            **table
+        }
+        for table in tables
+    ])
+    conn.register("run_rows", run_rows)
+    conn.execute("""
+        INSERT INTO bronze._ingest_runs BY NAME
+        SELECT
+            run_id, CAST(started_at AS TIMESTAMP) AS started_at,
+            table_name, full_refresh, storage, rows, files, skipped,
+            changed_keys, disk_bytes, raw_bytes, seconds,
+            rows_per_second, peak_memory_mb
+        FROM run_rows
+    """)
+    conn.unregister("run_rows")
+
+    os.makedirs(os.path.dirname(RUN_LEDGER_PATH), exist_ok=True)
+    with open(RUN_LEDGER_PATH, "a") as ledger:
+        ledger.write(json.dumps({
+            "run_id": run_id,
+            "started_at": ingested_at,
+            "full_refresh": full_refresh,
+            "storage": storage,
+            "seconds": round(seconds, 3),
+            "peak_memory_mb": round(peak_memory_mb(), 1),
+            "tables": tables
+        }) + "\n")
+
+
+def profile_table(conn, table_name, relation, profiled_at):
+    """
+    Profile one bronze table in a single aggregate scan: row
+    count, distinct keys, and nulls, min and max per column.
+    Writes the result to bronze._quality_profile and returns it
+    as a DataFrame, one row per column.
+    """
+    columns = [column for column, _ in declared_columns(table_name)]
+    key = primary_key(table_name)
+
+    aggregates = [
+        "COUNT(*)",
+        f"COUNT(DISTINCT {key})"
+    ]
+    for column in columns:
+        aggregates += [
+            f"COUNT(*) - COUNT({column})",
+            f"CAST(MIN({column}) AS VARCHAR)",
+            f"CAST(MAX({column}) AS VARCHAR)"
+        ]
+    result = conn.execute(
+        f"SELECT {', '.join(aggregates)} FROM {relation}"
+    ).fetchone()
+    row_count, distinct_keys = result[:2]
+
+    # A row with several bad columns is still one rejected row
+    rejected_rows = conn.execute("""
+        SELECT COUNT(DISTINCT (source_file, line, csv_line))
+        FROM bronze._rejects
+        WHERE table_name = ? AND ingested_at = ?
+    """, [table_name, profiled_at]).fetchone()[0]
+
+    profile = pd.DataFrame([
+        {
+            "profiled_at": profiled_at,
+            "table_name": table_name,
+            "column_name": column,
+            "row_count": row_count,
+            "null_count": result[2 + i * 3],
+            "distinct_keys": distinct_keys if column == key else None,
+            "min_value": result[3 + i * 3],
+            "max_value": result[4 + i * 3],
+            "rejected_rows": rejected_rows
+        }
+        for i, column in enumerate(columns)
+    ])
+
+    conn.register("profile_rows", profile)
+    conn.execute("""
+        INSERT INTO bronze._quality_profile
+        SELECT
+            CAST(profiled_at AS TIMESTAMP), table_name, column_name,
+            row_count, null_count, CAST(distinct_keys AS BIGINT),
+            min_value, max_value, rejected_rows
+        FROM profile_rows
+    """)
+    conn.unregister("profile_rows")
+    return profile
+
+
+def quality_warnings(conn, table_name, profile):
+    """
+    What looks wrong in a table's new profile, compared with the
+    schema and with the previous profile of the same table.
+    """
+    warnings = []
+    key = primary_key(table_name)
+    row_count = int(profile["row_count"].iloc[0])
+    key_row = profile[profile["column_name"] == key].iloc[0]
+    # The profile mixes text and number columns, so a row of it comes
+    # back as floats; counts are printed as whole numbers
+    key_nulls = int(key_row["null_count"])
+    distinct_keys = int(key_row["distinct_keys"])
+
+    if distinct_keys < row_count - key_nulls:
+        warnings.append(
+            f"{row_count - key_nulls - distinct_keys} duplicate {key} values"
+        )
+
+    for column in required_columns(table_name):
+        nulls = int(profile.loc[
+            profile["column_name"] == column, "null_count"
+        ].iloc[0])
+        if nulls:
+            warnings.append(f"{nulls} empty {column} values")
+
+    rejected_rows = int(profile["rejected_rows"].iloc[0])
+    if rejected_rows:
+        warnings.append(f"{rejected_rows} rows rejected")
+
+    previous = conn.execute("""
+        SELECT row_count FROM bronze._quality_profile
+        WHERE table_name = ? AND profiled_at < ?
+        ORDER BY profiled_at DESC
+        LIMIT 1
+    """, [table_name, profile["profiled_at"].iloc[0]]).fetchone()
+    if previous and row_count < previous[0]:
+        warnings.append(f"down from {previous[0]} rows last run")
+
+    return warnings
+
+
+def verify_bronze(conn, profiled_at, storage="table"):
+    """
+    After loading, profile every table and flag anything that
+    looks off. This is data quality checking at the ingestion
+    layer, so a bad load is caught before the dbt build.
+    """
+    print("\nBronze Layer Verification:")
+    print("-" * 40)
+
+    for table in TABLE_SOURCES:
+        relation = f"bronze.{table}"
+        if storage == "parquet" and table in PARQUET_PARTITIONS:
+            relation = f"({parquet_rows(table)})"
         try:
-            count = conn.execute(
-                f"SELECT COUNT(*) FROM bronze.{table}"
-            ).fetchone()[0]
-            print(f"  bronze.{table}: {count} rows")
+            profile = profile_table(conn, table, relation, profiled_at)
         except Exception as e:
             print(f"  bronze.{table}: ERROR - {e}")
-    
+            continue
+        print(
+            f"  bronze.{table}: {profile['row_count'].iloc[0]} rows"
+        )
+        for warning in quality_warnings(conn, table, profile):
+            print(f"    WARNING: {warning}")
+
     print("-" * 40)
+    print("Column profile saved to bronze._quality_profile")
 
 
-def main():
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Load raw Kommineni Automotive files into bronze."
+    )
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="Ignore the manifest and rebuild every bronze table from scratch"
+    )
+    parser.add_argument(
+        "--parallelism",
+        type=int,
+        default=4,
+        help="How many tables to load at the same time (1 = one by one)"
+    )
+    parser.add_argument(
+        "--db-path",
+        default=None,
+        help=f"DuckDB file to load into (default {DB_PATH}, refused "
+             f"once blue_green.py has published a version)"
+    )
+    parser.add_argument(
+        "--storage",
+        choices=["table", "parquet"],
+        default="table",
+        help="Keep sales and service jobs as DuckDB tables, or as "
+             "month-partitioned Parquet under data/bronze"
+    )
+    return parser.parse_args()
+
+
+def run_ingestion(db_path=DB_PATH, full_refresh=False, parallelism=4,
+                  storage="table"):
+    """
+    Load every bronze table into the database at db_path.
+    blue_green.py calls this with a fresh versioned file.
+    """
     print("Kommineni Automotive - Bronze Ingestion Starting...")
-    print(f"Database: {DB_PATH}")
+    print(f"Database: {db_path}")
     print(f"Source:   {RAW_DATA_PATH}")
+    print(f"Mode:     {'full refresh' if full_refresh else 'incremental'}")
+    print(f"Storage:  {storage}")
     print("")
-    
+
     # Connect to DuckDB
-    conn = get_connection()
-    
-    # Create bronze schema
-    create_bronze_schema(conn)
-    
-    # Define which CSV maps to which table name
-    tables_to_load = {
-        "locations":          "locations.csv",
-        "employees":          "employees.csv",
-        "vehicles":           "vehicles.csv",
-        "sales_transactions": "sales_transactions.csv",
-        "service_jobs":       "service_jobs.csv"
-    }
-    
-    # Load each table
-    print("Loading tables into bronze layer...")
-    for table_name, csv_file in tables_to_load.items():
-        count = load_table(conn, table_name, csv_file)
-        print(f"  Loaded bronze.{table_name}: {count} rows")
-    
+    conn = get_connection(db_path)
+
+    # Create bronze schema, the manifest of loaded files, the
+    # table for rows that do not fit the schema and the other
+    # bookkeeping tables (deleted keys, profile, run ledger)
+    create_bookkeeping_tables(conn)
+
+    # Every file loaded in this run shares one timestamp
+    now = datetime.now()
+    ingested_at = now.strftime("%Y-%m-%d %H:%M:%S")
+    run_id = now.strftime("%Y%m%dT%H%M%S%f")
+
+    # Load the tables side by side. Each one is an independent scan,
+    # so the whole run takes about as long as the biggest table.
+    print(
+        f"Loading tables into bronze layer "
+        f"({parallelism} at a time)..."
+    )
+    started = time.perf_counter()
+    table_seconds = 0.0
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=parallelism) as pool:
+        futures = {
+            pool.submit(
+                load_table_timed, conn, table_name, patterns,
+                ingested_at, full_refresh, storage
+            ): table_name
+            for table_name, patterns in TABLE_SOURCES.items()
+        }
+        for future in as_completed(futures):
+            stats = future.result()
+            results[futures[future]] = stats
+            table_seconds += stats["seconds"]
+            changes = (
+                f", {stats['changed_keys']} keys changed from "
+                f"{stats['change_files']} change files"
+                if stats["change_files"] else ""
+            )
+            print(
+                f"  Loaded bronze.{futures[future]}: {stats['rows']} new "
+                f"rows from {stats['files']} files "
+                f"({stats['skipped']} unchanged skipped){changes} "
+                f"in {stats['seconds']:.2f}s"
+            )
+            if stats["disk_bytes"]:
+                # One scan for all of the table's files, so this is
+                # the batch's throughput; ingest_report.py --files
+                # lists each file's sizes
+                if stats["raw_bytes"] is None:
+                    raw = (
+                        "uncompressed size unknown (zstd without a "
+                        "content size)"
+                    )
+                else:
+                    raw = (
+                        f"{stats['raw_bytes'] / 1e6:.1f} MB uncompressed "
+                        f"at {stats['raw_bytes'] / 1e6 / stats['seconds']:.1f}"
+                        f" MB/s"
+                    )
+                print(
+                    f"    {stats['disk_bytes'] / 1e6:.1f} MB on disk at "
+                    f"{stats['disk_bytes'] / 1e6 / stats['seconds']:.1f} "
+                    f"MB/s, {raw}"
+                )
+
+    seconds = time.perf_counter() - started
+    print(
+        f"Loaded {len(TABLE_SOURCES)} tables in {seconds:.2f}s "
+        f"({table_seconds:.2f}s if loaded one by one)"
+    )
+    record_run(
+        conn, run_id, ingested_at, results, full_refresh, storage, seconds
+    )
+    print(f"Run {run_id} recorded in bronze._ingest_runs")
+
     # Verify everything loaded correctly
-    verify_bronze(conn)
-    
+    verify_bronze(conn, ingested_at, storage)
+
     # Close the connection
     conn.close()
-    
+
     print("\nBronze ingestion complete!")
-    print(f"Database saved at: {DB_PATH}")
+    print(f"Database saved at: {db_path}")
+
+
+def main():
+    args = parse_args()
+    run_ingestion(
+        working_db_path(args.db_path), args.full_refresh, args.parallelism,
+        args.storage
+    )
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
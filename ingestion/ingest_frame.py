@@ -0,0 +1,164 @@
+"""
+ingest_frame.py
+Hands in-memory data over to bronze.
+
+ingest_bronze.py only reads files. A service that already holds the
+rows in a pandas DataFrame or an Arrow table can pass them here
+instead of writing and formatting a CSV itself. There are two ways
+in:
+
+ingest_frame appends the rows to bronze right away, on a connection
+the caller owns. DuckDB reads the object straight from memory, and
+the rows are cast, checked and stamped by the same code a file load
+goes through. Hand it the connection of the database being built,
+e.g. the versioned file blue_green.py is about to publish, or the
+generator's --to-duckdb run. Not the published database: the
+dashboard keeps it open read-only and the next blue/green build
+replaces it, so rows written there wait on the readers or are lost
+at the next swap.
+
+    from ingest_frame import ingest_frame
+    conn = duckdb.connect(version_path)
+    ingest_frame(conn, "sales_transactions", sales_df, "generator:batch-42")
+
+stage_frame writes the rows to one Parquet file in
+data/raw/frames/<table>/ instead, typed and compressed, with no CSV
+formatting or parsing on either side. As a drop file the frame goes
+the same way as every other file: the manifest loads it once on the
+next ingest run, a full refresh loads it again, and the scheduler
+sees it in the raw fingerprint and rebuilds on its next cycle. Use
+it when nothing is being built right now.
+
+    from ingest_frame import stage_frame
+    stage_frame("sales_transactions", sales_df, "pricing-service:batch-42")
+"""
+
+import os
+import re
+from datetime import datetime
+import duckdb
+from bronze_schemas import declared_columns
+from ingest_bronze import (
+    RAW_DATA_PATH, bronze_rows, cast_rows, create_bookkeeping_tables,
+    create_incoming, log_dropped_keys, reject_rows, table_exists
+)
+
+FRAMES_PATH = os.path.join(RAW_DATA_PATH, "frames")
+
+
+def check_columns(conn, relation, table_name, source_label):
+    """Raise ValueError if relation lacks any of the table's columns."""
+    present = {
+        row[0] for row in conn.execute(f"DESCRIBE {relation}").fetchall()
+    }
+    missing = [
+        column for column, _ in declared_columns(table_name)
+        if column not in present
+    ]
+    if missing:
+        raise ValueError(
+            f"{source_label} is missing {table_name} columns: "
+            f"{', '.join(missing)}"
+        )
+
+
+def ingest_frame(conn, table_name, frame, source_label, ingested_at=None,
+                 replace=False):
+    """
+    Append a pandas DataFrame or Arrow table to bronze.<table_name>
+    on conn, in one transaction.
+
+    The frame needs the table's columns from bronze_schemas.py, in
+    any order. It goes through cast_rows like a Parquet file does:
+    values are cast to the declared types, and a row with a value
+    that does not cast, or an empty required column, goes to
+    bronze._rejects instead. Every row gets _ingested_at (now,
+    unless given) and "frame:<source_label>" as its _source_file.
+
+    replace=True starts the table fresh, like a full refresh in
+    load_table, and logs the keys it drops to bronze._deletes.
+    Returns (rows added, rows rejected).
+    """
+    if ingested_at is None:
+        ingested_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    source_file = f"frame:{source_label}"
+    relation = f"frame_{table_name}"
+    incoming = f"incoming_frame_{table_name}"
+
+    if not table_exists(conn, "_deletes"):
+        create_bookkeeping_tables(conn)
+
+    conn.register(relation, frame)
+    try:
+        check_columns(conn, relation, table_name, source_label)
+
+        conn.begin()
+        try:
+            create_incoming(conn, table_name, incoming)
+            cast_rows(conn, table_name, f"""(
+                SELECT *, '{source_file}' AS _source_file FROM {relation}
+            )""", incoming)
+            rejected = reject_rows(
+                conn, table_name, incoming, ingested_at, scanned_csv=False
+            )
+
+            select = bronze_rows(table_name, incoming, ingested_at)
+            if replace or not table_exists(conn, table_name):
+                if table_exists(conn, table_name):
+                    log_dropped_keys(conn, table_name, select, ingested_at)
+                count = conn.execute(
+                    f"CREATE OR REPLACE TABLE bronze.{table_name} AS {select}"
+                ).fetchone()[0]
+            else:
+                count = conn.execute(
+                    f"INSERT INTO bronze.{table_name} BY NAME {select}"
+                ).fetchone()[0]
+
+            conn.execute(f"DROP TABLE {incoming}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    finally:
+        conn.unregister(relation)
+
+    return count, rejected
+
+
+def stage_frame(table_name, frame, source_label, frames_path=FRAMES_PATH):
+    """
+    Stage a pandas DataFrame or Arrow table for bronze.<table_name>
+    as a Parquet drop file.
+
+    The frame needs the table's columns from bronze_schemas.py, in
+    any order. It is written as it is; the next ingest run casts it
+    to the declared types, and rejects rows the same as a line from
+    any other file. source_label becomes part of the file name, and
+    so of _source_file.
+
+    The file is written under a temporary name and renamed when it
+    is complete, so an ingest run that starts meanwhile never reads
+    half of it.
+    Returns the path of the staged file.
+    """
+    conn = duckdb.connect()
+    try:
+        conn.register("frame_source", frame)
+        check_columns(conn, "frame_source", table_name, source_label)
+
+        # e.g. pricing-service-batch-42-20250914T101500123456.parquet
+        label = re.sub(r"[^A-Za-z0-9_.-]+", "-", source_label).strip("-")
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        table_dir = os.path.join(frames_path, table_name)
+        file_path = os.path.join(table_dir, f"{label}-{stamp}.parquet")
+        os.makedirs(table_dir, exist_ok=True)
+
+        conn.execute(f"""
+            COPY frame_source TO '{file_path}.tmp'
+            (FORMAT PARQUET, COMPRESSION ZSTD)
+        """)
+        os.replace(f"{file_path}.tmp", file_path)
+    finally:
+        conn.close()
+
+    return file_path
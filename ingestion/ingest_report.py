@@ -0,0 +1,174 @@
+"""
+ingest_report.py
+Shows how bronze ingestion has been doing across runs, read from
+the bronze._ingest_runs ledger every ingest_bronze.py run writes.
+
+The question it answers is whether ingest is getting slower as
+history grows: throughput per table over time, and how long the
+runs that had (almost) nothing new took as the number of known
+files went up.
+
+Throughput is per table: a run reads all of a table's new files in
+one scan, so there is no time for a single file. --files lists the
+sizes of each file the latest run loaded instead.
+"""
+
+import argparse
+import duckdb
+import pandas as pd
+from blue_green import published_db_path
+
+
+def load_runs(conn, runs=10, table_name=None):
+    """Ledger rows for the last few runs, oldest first."""
+    return conn.execute("""
+        WITH recent AS (
+            SELECT DISTINCT run_id
+            FROM bronze._ingest_runs
+            ORDER BY run_id DESC
+            LIMIT ?
+        )
+        SELECT *
+        FROM bronze._ingest_runs
+        WHERE run_id IN (SELECT run_id FROM recent)
+        AND (? IS NULL OR table_name = ?)
+        ORDER BY run_id, table_name
+    """, [runs, table_name, table_name]).df()
+
+
+def run_summary(runs):
+    """One line per run: totals across its tables."""
+    summary = runs.groupby(["run_id", "started_at"], as_index=False).agg(
+        full_refresh=("full_refresh", "first"),
+        rows=("rows", "sum"),
+        changed_keys=("changed_keys", "sum"),
+        files=("files", "sum"),
+        skipped=("skipped", "sum"),
+        mb_read=("disk_bytes", lambda b: round(b.sum() / 1e6, 1)),
+        mb_uncompressed=("raw_bytes", lambda b: (
+            None if b.isna().any() else round(b.sum() / 1e6, 1)
+        )),
+        slowest_table_s=("seconds", "max"),
+        peak_memory_mb=("peak_memory_mb", "max")
+    )
+    return summary.drop(columns="run_id")
+
+
+def latest_files(conn, table_name=None):
+    """
+    Every file the latest run loaded, with its size on disk and
+    uncompressed (NULL when the file does not say, see
+    uncompressed_size in ingest_bronze.py).
+    """
+    return conn.execute("""
+        SELECT
+            table_name,
+            file_path,
+            row_count AS rows,
+            ROUND(file_size / 1e6, 2) AS mb_on_disk,
+            ROUND(uncompressed_size / 1e6, 2) AS mb_uncompressed,
+            ROUND(uncompressed_size / NULLIF(file_size, 0), 1) AS ratio
+        FROM bronze._manifest
+        WHERE ingested_at = (SELECT MAX(started_at) FROM bronze._ingest_runs)
+        AND (? IS NULL OR table_name = ?)
+        ORDER BY table_name, file_path
+    """, [table_name, table_name]).df()
+
+
+def table_trends(runs):
+    """
+    Per table: latest throughput against the median of the earlier
+    runs of the same kind (full refresh or incremental), counting
+    only runs that actually loaded rows. A five-row incremental run
+    is all fixed cost, comparing it with a full load says nothing.
+    """
+    trends = []
+    for table_name, table_runs in runs.groupby("table_name"):
+        touched = table_runs["rows"] + table_runs["changed_keys"] > 0
+        loaded = table_runs[touched]
+        idle = table_runs[~touched]
+        trend = {
+            "table_name": table_name,
+            "latest_rows_per_s": None,
+            "median_before": None,
+            "change": None,
+            "idle_run_s_first": None,
+            "idle_run_s_last": None
+        }
+        if len(loaded):
+            latest = loaded["rows_per_second"].iloc[-1]
+            trend["latest_rows_per_s"] = round(latest)
+            same_kind = loaded[
+                loaded["full_refresh"] == loaded["full_refresh"].iloc[-1]
+            ]
+            if len(same_kind) > 1:
+                before = same_kind["rows_per_second"].iloc[:-1].median()
+                trend["median_before"] = round(before)
+                trend["change"] = f"{(latest / before - 1) * 100:+.0f}%"
+        if len(idle):
+            trend["idle_run_s_first"] = round(idle["seconds"].iloc[0], 3)
+            trend["idle_run_s_last"] = round(idle["seconds"].iloc[-1], 3)
+        trends.append(trend)
+    return pd.DataFrame(trends)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Report bronze ingestion throughput across runs."
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=10,
+        help="How many of the latest runs to include"
+    )
+    parser.add_argument(
+        "--table",
+        help="Only show this bronze table"
+    )
+    parser.add_argument(
+        "--files",
+        action="store_true",
+        help="Also list the sizes of every file the latest run loaded"
+    )
+    parser.add_argument(
+        "--db-path",
+        default=None,
+        help="Database to read (default: the published one)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    db_path = args.db_path or published_db_path()
+    conn = duckdb.connect(db_path, read_only=True)
+    runs = load_runs(conn, args.runs, args.table)
+    files = latest_files(conn, args.table) if args.files else None
+    conn.close()
+
+    if runs.empty:
+        print(f"No ingest runs recorded in {db_path} yet.")
+        return
+
+    with pd.option_context("display.width", 200,
+                           "display.max_columns", None):
+        print(f"Last {runs['run_id'].nunique()} ingest runs ({db_path})")
+        print("-" * 40)
+        print(run_summary(runs).to_string(index=False))
+        if runs["raw_bytes"].isna().any():
+            print(
+                "mb_uncompressed is empty for runs that read zstd files "
+                "without a content size in their header"
+            )
+        print("\nThroughput per table")
+        print("-" * 40)
+        print(table_trends(runs).to_string(index=False))
+        if files is not None:
+            print("\nFiles loaded in the latest run")
+            print("-" * 40)
+            print(files.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+scheduler.py
+Keeps the warehouse fresh: ingest -> dbt staging -> dbt marts on a
+fixed cadence, built and published the blue/green way.
+
+Each stage fingerprints its inputs and is skipped when they are the
+same as at its last successful run:
+  ingest  - the raw files (path, size, modified time)
+  staging - the ingest fingerprint plus the staging models
+  marts   - the staging fingerprint plus the mart models and
+            today's date
+so a refresh every few minutes costs a directory listing when
+nothing has changed, and editing one mart only rebuilds the marts.
+
+DataFrames handed over with stage_frame (ingest_frame.py) are staged
+as Parquet files in data/raw/frames/, so they change the ingest
+fingerprint like any other drop file and are built on the next cycle.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+from datetime import date, datetime
+from apscheduler.schedulers.blocking import BlockingScheduler
+from blue_green import (
+    DBT_PROJECT_DIR, KEEP_VERSIONS, prune_versions, publish, run_dbt,
+    start_version
+)
+from ingest_bronze import (
+    CDC_SOURCES, RAW_DATA_PATH, TABLE_SOURCES, find_source_files,
+    run_ingestion
+)
+
+STATE_PATH = "../.scheduler_state.json"
+
+# Stages in run order, each with the dbt selector it builds
+# (None for ingestion) and the model files its fingerprint covers
+STAGES = [
+    ("ingest", None, []),
+    ("staging", "staging", [
+        "dbt_project.yml",
+        "macros/**/*.sql",
+        "models/staging/**/*"
+    ]),
+    ("marts", "marts", ["models/marts/**/*"])
+]
+
+
+def log(message):
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}")
+
+
+def raw_fingerprint(storage="table"):
+    """
+    One hash over every raw file's path, size and modified time.
+    Only stat calls, the same shortcut the manifest uses before
+    it hashes a file.
+    """
+    digest = hashlib.sha256(storage.encode())
+    for sources in [TABLE_SOURCES, CDC_SOURCES]:
+        for table_name, patterns in sorted(sources.items()):
+            for source_file in find_source_files(patterns):
+                stat = os.stat(os.path.join(RAW_DATA_PATH, source_file))
+                digest.update(
+                    f"{table_name}|{source_file}|{stat.st_size}|"
+                    f"{stat.st_mtime}\n".encode()
+                )
+    return digest.hexdigest()
+
+
+def models_fingerprint(upstream, patterns):
+    """Hash of the upstream stage's fingerprint and a stage's model files."""
+    digest = hashlib.sha256(upstream.encode())
+    for pattern in patterns:
+        for file_path in sorted(glob.glob(
+            os.path.join(DBT_PROJECT_DIR, pattern), recursive=True
+        )):
+            if os.path.isfile(file_path):
+                digest.update(file_path.encode())
+                with open(file_path, "rb") as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def stage_fingerprints(storage="table"):
+    """The current input fingerprint of every stage, by name."""
+    fingerprints = {}
+    upstream = raw_fingerprint(storage)
+    for stage, _, patterns in STAGES:
+        if patterns:
+            upstream = models_fingerprint(upstream, patterns)
+        if stage == "marts":
+            # The marts are built as of today (as_of_date() is
+            # CURRENT_DATE), so a new day rebuilds them even without
+            # new data: days elapsed, the open month and week move on
+            upstream = hashlib.sha256(
+                f"{upstream}|{date.today().isoformat()}".encode()
+            ).hexdigest()
+        fingerprints[stage] = upstream
+    return fingerprints
+
+
+def load_state():
+    if not os.path.exists(STATE_PATH):
+        return {"fingerprints": {}, "last_run": {}}
+    with open(STATE_PATH) as state_file:
+        return json.load(state_file)
+
+
+def save_state(state):
+    with open(f"{STATE_PATH}.tmp", "w") as state_file:
+        json.dump(state, state_file, indent=2)
+    os.replace(f"{STATE_PATH}.tmp", STATE_PATH)
+
+
+def run_cycle(storage="table", parallelism=4, keep=KEEP_VERSIONS):
+    """
+    One refresh. Works out which stages have new inputs and, if
+    any do, builds a new version with just those stages (plus
+    everything after the first one that runs) and publishes it.
+    """
+    state = load_state()
+    fingerprints = stage_fingerprints(storage)
+
+    to_run = []
+    for stage, _, _ in STAGES:
+        if to_run or fingerprints[stage] != state["fingerprints"].get(stage):
+            to_run.append(stage)
+
+    if not to_run:
+        log("No changes, nothing to build.")
+        return
+
+    version_path = start_version()
+    log(f"Building {', '.join(to_run)} into {version_path}")
+    durations = {}
+    started = time.perf_counter()
+
+    try:
+        for stage, selector, _ in STAGES:
+            if stage not in to_run:
+                log(f"  {stage}: inputs unchanged, skipped")
+                continue
+            stage_started = time.perf_counter()
+            if selector is None:
+                run_ingestion(version_path, parallelism=parallelism,
+                              storage=storage)
+            else:
+                run_dbt(version_path, "build", "--select", selector,
+                        storage=storage)
+            durations[stage] = round(time.perf_counter() - stage_started, 2)
+            log(f"  {stage}: {durations[stage]}s")
+    except BaseException:
+        if os.path.exists(version_path):
+            os.remove(version_path)
+        log("Build failed, readers stay on the published version.")
+        raise
+
+    publish(version_path)
+    prune_versions(keep)
+
+    state["fingerprints"] = fingerprints
+    state["last_run"] = {
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "stages": durations,
+        "seconds": round(time.perf_counter() - started, 2)
+    }
+    save_state(state)
+    log(f"Published in {state['last_run']['seconds']}s")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Refresh the warehouse on a schedule, skipping "
+                    "stages whose inputs have not changed."
+    )
+    parser.add_argument(
+        "--every-minutes",
+        type=float,
+        default=5,
+        help="Minutes between refreshes"
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Run a single refresh and exit"
+    )
+    parser.add_argument(
+        "--parallelism",
+        type=int,
+        default=4,
+        help="How many bronze tables to load at the same time"
+    )
+    parser.add_argument(
+        "--storage",
+        choices=["table", "parquet"],
+        default="table",
+        help="Bronze storage for sales and service jobs (see ingest_bronze)"
+    )
+    parser.add_argument(
+        "--keep",
+        type=int,
+        default=KEEP_VERSIONS,
+        help="How many database versions to keep on disk"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    cycle_args = [args.storage, args.parallelism, args.keep]
+
+    if args.once:
+        run_cycle(*cycle_args)
+        return
+
+    # One refresh at a time: a run that comes due while the last one
+    # is still going is skipped, and missed runs collapse into one
+    scheduler = BlockingScheduler()
+    scheduler.add_job(
+        run_cycle, "interval", args=cycle_args,
+        minutes=args.every_minutes,
+        next_run_time=datetime.now(),
+        max_instances=1,
+        coalesce=True
+    )
+    log(f"Refreshing every {args.every_minutes:g} minutes, Ctrl+C to stop.")
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+
+
+if __name__ == "__main__":
+    main()
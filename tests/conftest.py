@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# The scripts import their neighbours by module name, the way they
+# are run from their own folder
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "data_generator"))
+sys.path.insert(0, os.path.join(ROOT, "ingestion"))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    An empty project layout to run the scripts in. They use paths
+    relative to their folder (../data/raw, ../kommineni_automotive
+    .duckdb), so the tests run from a folder next to data/.
+    """
+    (tmp_path / "data" / "raw").mkdir(parents=True)
+    (tmp_path / "scripts").mkdir()
+    monkeypatch.chdir(tmp_path / "scripts")
+    return tmp_path
+
+
+def run_script(monkeypatch, module, *args):
+    """Run a script's main() with these command line arguments."""
+    monkeypatch.setattr(sys, "argv", [module.__name__, *args])
+    module.main()
@@ -0,0 +1,86 @@
+from datetime import datetime
+
+import duckdb
+import numpy as np
+
+import generate_data
+import ingest_bronze
+from conftest import run_script
+
+
+def test_new_history_replaces_emitted_vehicles(workdir, monkeypatch):
+    # A history, live batches with vehicle changes in cdc/, both
+    # ingested, then a new history over the top
+    run_script(monkeypatch, generate_data, "--format", "csv")
+    ingest_bronze.run_ingestion()
+    run_script(
+        monkeypatch, generate_data, "--emit", "--format", "csv",
+        "--duration", "1", "--batch-seconds", "0.25",
+        "--events-per-second", "200"
+    )
+    assert list((workdir / "data" / "raw" / "cdc" / "vehicles").iterdir())
+    ingest_bronze.run_ingestion()
+
+    run_script(monkeypatch, generate_data, "--format", "csv")
+    assert not (workdir / "data" / "raw" / "cdc").exists()
+    ingest_bronze.run_ingestion()
+
+    conn = duckdb.connect(str(workdir / "kommineni_automotive.duckdb"))
+    rows, vehicle_ids = conn.execute("""
+        SELECT COUNT(*), COUNT(DISTINCT vehicle_id) FROM bronze.vehicles
+    """).fetchone()
+    generated = conn.execute(f"""
+        SELECT COUNT(*)
+        FROM read_csv('{workdir / "data" / "raw" / "vehicles.csv"}')
+    """).fetchone()[0]
+    assert rows == vehicle_ids == generated
+
+
+def test_regional_profile_is_split_into_shards():
+    profile = generate_data.SCALE_PROFILES["regional"]
+    stores = generate_data.plan_stores(profile)
+    as_of = datetime(2025, 12, 31)
+    employees = generate_data.generate_employees(as_of, stores)
+    vehicles = generate_data.generate_vehicles(stores)
+    sales_volume, jobs_volume = generate_data.profile_volumes(
+        profile, employees
+    )
+
+    shards = generate_data.plan_shards(
+        employees, vehicles, 60, 30, 42, as_of, sales_volume, jobs_volume
+    )
+
+    assert len(shards) > 1
+    location_ids = [
+        location_id for shard in shards for location_id in shard["location_ids"]
+    ]
+    assert len(location_ids) == len(set(location_ids)) == 40
+
+
+def test_no_car_is_sold_while_on_hold():
+    rng = np.random.default_rng(7)
+    stores = generate_data.plan_stores(generate_data.SCALE_PROFILES["small"])
+    vehicles = generate_data.generate_vehicles(stores, rng)
+    opened_on = datetime(2025, 1, 1).toordinal()
+    inventory = generate_data.open_inventory(vehicles, opened_on=opened_on)
+    on_hold = set(vehicles.loc[vehicles["status"] == "reserved", "vehicle_id"])
+
+    # Ten sales a day for 60 days, all at the first location
+    days = np.repeat(np.arange(opened_on, opened_on + 60), 10)
+    first_slot, slot_count, _ = generate_data.find_lots(
+        inventory, np.full(len(days), vehicles["location_id"].iloc[0])
+    )
+    sold, kept = generate_data.sell_from_lots(
+        inventory, first_slot, slot_count, days, rng
+    )
+
+    assert (sold["available_from"] <= days[kept]).all()
+    assert (sold["available_from"] > days[kept] - generate_data.HOLD_DAYS).any()
+
+    # Cars reserved in the opening stock only sell once the hold is over
+    sold_ids = np.asarray(generate_data.format_ids(
+        "VEH", sold["vehicle_number"], 4
+    ))
+    released = days[kept] >= opened_on + generate_data.HOLD_DAYS
+    assert not on_hold & set(sold_ids[~released])
+    assert on_hold & set(sold_ids[released])
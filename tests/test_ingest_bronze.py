@@ -0,0 +1,211 @@
+import glob
+import gzip
+import os
+
+import duckdb
+import pytest
+
+import ingest_bronze
+from conftest import run_script
+
+SALES_HEADER = (
+    "transaction_id,vehicle_id,employee_id,location_id,sale_price,"
+    "sale_date,financing_approved\n"
+)
+
+
+def write_sales(workdir, *prices):
+    """Write data/raw/sales_transactions.csv, one sale per (id, price)."""
+    lines = [
+        f"{transaction_id},VEH0001,EMP001,LOC001,{price},"
+        f"2025-01-15 10:00:00,true\n"
+        for transaction_id, price in prices
+    ]
+    (workdir / "data" / "raw" / "sales_transactions.csv").write_text(
+        SALES_HEADER + "".join(lines)
+    )
+
+
+def load_sales(conn, ingested_at):
+    cursor = conn.cursor()
+    try:
+        return ingest_bronze.load_table(
+            cursor, "sales_transactions",
+            ingest_bronze.TABLE_SOURCES["sales_transactions"],
+            ingested_at, storage="parquet"
+        )
+    finally:
+        cursor.close()
+
+
+@pytest.fixture
+def conn(workdir):
+    conn = duckdb.connect(str(workdir / "kommineni_automotive.duckdb"))
+    ingest_bronze.create_bookkeeping_tables(conn)
+    yield conn
+    conn.close()
+
+
+def parquet_files():
+    return sorted(glob.glob(ingest_bronze.parquet_location("sales_transactions")))
+
+
+def test_reloaded_file_replaces_its_parquet_rows(workdir, conn):
+    write_sales(workdir, ("TXN00001", 30000), ("TXN00002", 31000),
+                ("TXN00003", 32000))
+    load_sales(conn, "2025-01-01 00:00:00")
+
+    # A corrected price, a sale taken out, a sale added
+    write_sales(workdir, ("TXN00001", 29500), ("TXN00002", 31000),
+                ("TXN00004", 33000))
+    load_sales(conn, "2025-01-02 00:00:00")
+
+    # Both versions are on disk, only the second one is current
+    assert conn.execute(f"""
+        SELECT COUNT(*)
+        FROM read_parquet('{ingest_bronze.parquet_location("sales_transactions")}')
+    """).fetchone()[0] == 6
+    assert conn.execute(f"""
+        SELECT transaction_id, sale_price
+        FROM ({ingest_bronze.parquet_rows("sales_transactions")})
+        ORDER BY 1
+    """).fetchall() == [
+        ("TXN00001", 29500.0), ("TXN00002", 31000.0), ("TXN00004", 33000.0)
+    ]
+    assert conn.execute("""
+        SELECT key_value FROM bronze._deletes ORDER BY 1
+    """).fetchall() == [("TXN00001",), ("TXN00002",), ("TXN00003",)]
+
+    assert not glob.glob(os.path.join(ingest_bronze.PARQUET_STAGING_PATH, "*"))
+
+
+def test_failed_parquet_load_leaves_no_files(workdir, conn, monkeypatch):
+    write_sales(workdir, ("TXN00001", 30000), ("TXN00002", 31000))
+
+    def fail(*args):
+        raise RuntimeError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(ingest_bronze, "record_files", fail)
+        with pytest.raises(RuntimeError):
+            load_sales(conn, "2025-01-01 00:00:00")
+    assert parquet_files() == []
+
+    # The retry loads the file once, and what the failed load
+    # staged is cleared
+    load_sales(conn, "2025-01-01 00:00:01")
+    assert conn.execute(f"""
+        SELECT COUNT(*)
+        FROM read_parquet('{ingest_bronze.parquet_location("sales_transactions")}')
+    """).fetchone()[0] == 2
+    assert not glob.glob(os.path.join(ingest_bronze.PARQUET_STAGING_PATH, "*"))
+
+
+def test_files_of_a_discarded_build_are_removed(workdir, conn):
+    write_sales(workdir, ("TXN00001", 30000))
+    load_sales(conn, "2025-01-01 00:00:00")
+    published = workdir / "published.duckdb"
+    conn.execute(f"ATTACH '{published}' AS published")
+    conn.execute("COPY FROM DATABASE kommineni_automotive TO published")
+    conn.execute("DETACH published")
+
+    # A build loads a new file into its copy and is thrown away
+    write_sales(workdir, ("TXN00001", 30000), ("TXN00002", 31000))
+    load_sales(conn, "2025-01-02 00:00:00")
+    assert len(parquet_files()) == 2
+
+    # The next build starts from the published database again
+    rebuilt = duckdb.connect(str(published))
+    load_sales(rebuilt, "2025-01-03 00:00:00")
+    assert rebuilt.execute(f"""
+        SELECT COUNT(*)
+        FROM read_parquet('{ingest_bronze.parquet_location("sales_transactions")}')
+    """).fetchone()[0] == 3
+    assert rebuilt.execute(f"""
+        SELECT COUNT(*), COUNT(DISTINCT transaction_id)
+        FROM ({ingest_bronze.parquet_rows("sales_transactions")})
+    """).fetchone() == (2, 2)
+    rebuilt.close()
+
+
+def test_plain_run_is_refused_once_a_version_is_published(workdir, monkeypatch):
+    write_sales(workdir, ("TXN00001", 30000))
+    (workdir / "kommineni_automotive.current").write_text(
+        "db_versions/kommineni_automotive-20250101T000000000000.duckdb"
+    )
+
+    with pytest.raises(SystemExit, match="blue_green.py"):
+        run_script(monkeypatch, ingest_bronze)
+    assert not (workdir / "kommineni_automotive.duckdb").exists()
+
+    # An explicit database file is still built
+    run_script(monkeypatch, ingest_bronze, "--db-path", "../scratch.duckdb")
+    with duckdb.connect(str(workdir / "scratch.duckdb")) as scratch:
+        assert scratch.execute(
+            "SELECT COUNT(*) FROM bronze.sales_transactions"
+        ).fetchone()[0] == 1
+
+
+def zstd_frame(data, content_size=True):
+    """One zstd frame holding data as a raw block (no compression)."""
+    if content_size:
+        # Single segment, 4-byte content size
+        header = bytes([0xA0]) + len(data).to_bytes(4, "little")
+    else:
+        # Window descriptor only, no content size
+        header = bytes([0x00, 0x58])
+    block = (len(data) << 3 | 1).to_bytes(3, "little")
+    return b"\x28\xb5\x2f\xfd" + header + block + data
+
+
+def test_zstd_size_adds_up_every_frame(workdir):
+    sale = "TXN{},VEH0001,EMP001,LOC001,30000,2025-01-15 10:00:00,true\n"
+    first = SALES_HEADER + sale.format("00001")
+    second = "".join(sale.format(f"0000{number}") for number in range(2, 7))
+    skippable = (
+        (0x184D2A53).to_bytes(4, "little") + (3).to_bytes(4, "little")
+        + b"abc"
+    )
+    file_path = workdir / "data" / "raw" / "sales_transactions.csv.zst"
+    file_path.write_bytes(
+        zstd_frame(first.encode()) + skippable + zstd_frame(second.encode())
+    )
+
+    assert ingest_bronze.uncompressed_size(str(file_path)) == (
+        len(first) + len(second)
+    )
+    # The walk lands on real frame boundaries: DuckDB reads both frames
+    assert duckdb.sql(
+        f"SELECT COUNT(*) FROM read_csv('{file_path}')"
+    ).fetchone()[0] == 6
+
+    file_path.write_bytes(
+        zstd_frame(first.encode()) + zstd_frame(second.encode(), False)
+    )
+    assert ingest_bronze.uncompressed_size(str(file_path)) is None
+
+
+def test_full_refresh_keeps_measured_sizes(workdir, conn, monkeypatch):
+    sales = (
+        SALES_HEADER
+        + "TXN00001,VEH0001,EMP001,LOC001,30000,2025-01-15 10:00:00,true\n"
+    )
+    file_path = workdir / "data" / "raw" / "sales_transactions.csv.gz"
+    with gzip.open(file_path, "wt") as f:
+        f.write(sales)
+    patterns = ingest_bronze.TABLE_SOURCES["sales_transactions"]
+    ingest_bronze.load_table_timed(
+        conn, "sales_transactions", patterns, "2025-01-01 00:00:00"
+    )
+
+    def fail(*args):
+        raise AssertionError("measured again")
+
+    # The file did not change, its size comes from the manifest
+    monkeypatch.setattr(ingest_bronze, "uncompressed_size", fail)
+    stats = ingest_bronze.load_table_timed(
+        conn, "sales_transactions", patterns, "2025-01-02 00:00:00",
+        full_refresh=True
+    )
+    assert stats["files"] == 1
+    assert stats["raw_bytes"] == len(sales)
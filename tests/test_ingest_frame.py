@@ -0,0 +1,34 @@
+import duckdb
+import pandas as pd
+
+from ingest_frame import ingest_frame
+
+
+def test_frame_rows_are_cast_and_rejected_like_a_file(workdir):
+    conn = duckdb.connect(str(workdir / "kommineni_automotive.duckdb"))
+    vehicles = pd.DataFrame({
+        "vehicle_id": ["VEH0001", "VEH0002", None],
+        "make": ["Toyota", "Honda", "Ford"],
+        "model": ["Camry", "Civic", "F-150"],
+        "year": ["2024", "not a year", "2023"],
+        "list_price": [31000, 27000, 45000],
+        "status": ["available"] * 3,
+        "location_id": ["LOC001"] * 3
+    })
+
+    rows, rejected = ingest_frame(conn, "vehicles", vehicles, "test")
+
+    assert (rows, rejected) == (1, 2)
+    assert conn.execute("""
+        SELECT vehicle_id, year, _source_file FROM bronze.vehicles
+    """).fetchall() == [("VEH0001", 2024, "frame:test")]
+    assert conn.execute("""
+        SELECT column_name FROM bronze._rejects ORDER BY 1
+    """).fetchall() == [("vehicle_id",), ("year",)]
+
+    # Starting over logs the key that went for the incremental models
+    ingest_frame(conn, "vehicles", vehicles.iloc[1:2].assign(year=2025),
+                 "test", replace=True)
+    assert conn.execute("""
+        SELECT key_value FROM bronze._deletes
+    """).fetchall() == [("VEH0001",)]